@@ -0,0 +1,31 @@
+"""tasks keyset index
+
+Revision ID: 5b1f0c2a7d34
+Revises: def1de534032
+Create Date: 2026-10-18 09:00:12.418503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0c2a7d34"
+down_revision: Union[str, None] = "def1de534032"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "created_at_id_index",
+        "tasks",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("created_at_id_index", table_name="tasks")
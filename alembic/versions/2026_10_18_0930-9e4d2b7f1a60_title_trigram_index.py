@@ -0,0 +1,37 @@
+"""title trigram index
+
+Revision ID: 9e4d2b7f1a60
+Revises: 5b1f0c2a7d34
+Create Date: 2026-10-18 09:30:41.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4d2b7f1a60"
+down_revision: Union[str, None] = "5b1f0c2a7d34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "title_trgm_index",
+        "tasks",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    # A btree index cannot serve `ILIKE '%...%'`, it only slows down writes.
+    op.drop_index("title_index", table_name="tasks")
+
+
+def downgrade() -> None:
+    op.create_index("title_index", "tasks", ["title"], unique=False)
+    op.drop_index("title_trgm_index", table_name="tasks")
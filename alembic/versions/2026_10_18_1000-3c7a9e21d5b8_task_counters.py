@@ -0,0 +1,120 @@
+"""task counters
+
+Revision ID: 3c7a9e21d5b8
+Revises: 9e4d2b7f1a60
+Create Date: 2026-10-18 10:00:27.530194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7a9e21d5b8"
+down_revision: Union[str, None] = "9e4d2b7f1a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNT_TASKS_FUNCTION = """CREATE OR REPLACE FUNCTION count_tasks() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        WITH deltas AS (SELECT status, author_id, assignee_id, 1 AS delta FROM new_rows)
+        INSERT INTO task_counters AS counter (status, role, user_id, count)
+        SELECT status, role, user_id, sum(delta)
+        FROM (
+            SELECT status, 'AUTHOR'::task_role AS role, author_id AS user_id, delta FROM deltas
+            UNION ALL
+            SELECT status, 'ASSIGNEE'::task_role, assignee_id, delta FROM deltas WHERE assignee_id IS NOT NULL
+        ) AS changes
+        GROUP BY status, role, user_id
+        HAVING sum(delta) <> 0
+        ORDER BY status, role, user_id
+        ON CONFLICT (status, role, user_id) DO UPDATE SET count = counter.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        WITH deltas AS (SELECT status, author_id, assignee_id, -1 AS delta FROM old_rows)
+        INSERT INTO task_counters AS counter (status, role, user_id, count)
+        SELECT status, role, user_id, sum(delta)
+        FROM (
+            SELECT status, 'AUTHOR'::task_role AS role, author_id AS user_id, delta FROM deltas
+            UNION ALL
+            SELECT status, 'ASSIGNEE'::task_role, assignee_id, delta FROM deltas WHERE assignee_id IS NOT NULL
+        ) AS changes
+        GROUP BY status, role, user_id
+        HAVING sum(delta) <> 0
+        ORDER BY status, role, user_id
+        ON CONFLICT (status, role, user_id) DO UPDATE SET count = counter.count + EXCLUDED.count;
+    ELSIF TG_OP = 'UPDATE' THEN
+        WITH deltas AS (
+            SELECT status, author_id, assignee_id, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, author_id, assignee_id, -1 FROM old_rows
+        )
+        INSERT INTO task_counters AS counter (status, role, user_id, count)
+        SELECT status, role, user_id, sum(delta)
+        FROM (
+            SELECT status, 'AUTHOR'::task_role AS role, author_id AS user_id, delta FROM deltas
+            UNION ALL
+            SELECT status, 'ASSIGNEE'::task_role, assignee_id, delta FROM deltas WHERE assignee_id IS NOT NULL
+        ) AS changes
+        GROUP BY status, role, user_id
+        HAVING sum(delta) <> 0
+        ORDER BY status, role, user_id
+        ON CONFLICT (status, role, user_id) DO UPDATE SET count = counter.count + EXCLUDED.count;
+    ELSE
+        DELETE FROM task_counters;
+    END IF;
+    RETURN NULL;
+END
+$$"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_counters",
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="task_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("role", sa.Enum("AUTHOR", "ASSIGNEE", name="task_role"), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("status", "role", "user_id"),
+    )
+    # The triggers lock `tasks` against writes, so the backfill below counts exactly the rows they will see change.
+    op.execute(COUNT_TASKS_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER count_inserted_tasks AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()"
+    )
+    op.execute(
+        "CREATE TRIGGER count_updated_tasks AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()"
+    )
+    op.execute(
+        "CREATE TRIGGER count_deleted_tasks AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()"
+    )
+    op.execute(
+        "CREATE TRIGGER count_truncated_tasks AFTER TRUNCATE ON tasks FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()"
+    )
+    op.execute(
+        """
+        INSERT INTO task_counters (status, role, user_id, count)
+        SELECT status, 'AUTHOR'::task_role, author_id, count(*) FROM tasks GROUP BY status, author_id
+        UNION ALL
+        SELECT status, 'ASSIGNEE'::task_role, assignee_id, count(*) FROM tasks
+        WHERE assignee_id IS NOT NULL GROUP BY status, assignee_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER count_truncated_tasks ON tasks")
+    op.execute("DROP TRIGGER count_deleted_tasks ON tasks")
+    op.execute("DROP TRIGGER count_updated_tasks ON tasks")
+    op.execute("DROP TRIGGER count_inserted_tasks ON tasks")
+    op.execute("DROP FUNCTION count_tasks()")
+    op.drop_table("task_counters")
+    sa.Enum(name="task_role").drop(op.get_bind())
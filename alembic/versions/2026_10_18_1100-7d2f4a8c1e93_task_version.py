@@ -0,0 +1,41 @@
+"""task version
+
+Revision ID: 7d2f4a8c1e93
+Revises: 3c7a9e21d5b8
+Create Date: 2026-10-18 11:00:12.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2f4a8c1e93"
+down_revision: Union[str, None] = "3c7a9e21d5b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BUMP_TASK_VERSION_FUNCTION = """CREATE OR REPLACE FUNCTION bump_task_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$"""
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, the existing rows are not rewritten.
+    op.add_column("tasks", sa.Column("version", sa.BigInteger(), server_default=sa.text("1"), nullable=False))
+    op.execute(BUMP_TASK_VERSION_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER bump_task_version BEFORE UPDATE ON tasks FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) EXECUTE FUNCTION bump_task_version()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER bump_task_version ON tasks")
+    op.execute("DROP FUNCTION bump_task_version()")
+    op.drop_column("tasks", "version")
@@ -0,0 +1,51 @@
+"""user task indexes
+
+Revision ID: b8e5c3f17a42
+Revises: 7d2f4a8c1e93
+Create Date: 2026-10-18 12:00:41.316052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e5c3f17a42"
+down_revision: Union[str, None] = "7d2f4a8c1e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "author_id_created_at_id_index",
+        "tasks",
+        ["author_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "assignee_id_created_at_id_index",
+        "tasks",
+        ["assignee_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "watchers_user_id_task_id_index",
+        "watchers",
+        ["user_id", "task_id"],
+        unique=False,
+    )
+    op.create_index(
+        "executors_user_id_task_id_index",
+        "executors",
+        ["user_id", "task_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("executors_user_id_task_id_index", table_name="executors")
+    op.drop_index("watchers_user_id_task_id_index", table_name="watchers")
+    op.drop_index("assignee_id_created_at_id_index", table_name="tasks")
+    op.drop_index("author_id_created_at_id_index", table_name="tasks")
@@ -0,0 +1,37 @@
+"""task filter indexes
+
+Revision ID: e1a9d6b2c845
+Revises: b8e5c3f17a42
+Create Date: 2026-10-18 13:00:08.662931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a9d6b2c845"
+down_revision: Union[str, None] = "b8e5c3f17a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "status_created_at_id_index",
+        "tasks",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "author_id_status_created_at_id_index",
+        "tasks",
+        ["author_id", "status", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("author_id_status_created_at_id_index", table_name="tasks")
+    op.drop_index("status_created_at_id_index", table_name="tasks")
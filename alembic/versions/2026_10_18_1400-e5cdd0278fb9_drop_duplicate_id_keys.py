@@ -0,0 +1,29 @@
+"""drop duplicate id keys
+
+Revision ID: e5cdd0278fb9
+Revises: e1a9d6b2c845
+Create Date: 2026-10-18 14:00:12.604518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5cdd0278fb9"
+down_revision: Union[str, None] = "e1a9d6b2c845"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # duplicate: users_id_key, same as users_pkey
+    op.drop_constraint("users_id_key", "users", type_="unique")
+    # duplicate: tasks_id_key, same as tasks_pkey
+    op.drop_constraint("tasks_id_key", "tasks", type_="unique")
+
+
+def downgrade() -> None:
+    op.create_unique_constraint("tasks_id_key", "tasks", ["id"])
+    op.create_unique_constraint("users_id_key", "users", ["id"])
@@ -0,0 +1 @@
+"""The package contains performance benchmarks that run against a real PostgreSQL database."""
@@ -0,0 +1,112 @@
+"""Benchmarks the latency under overload with and without the admission control.
+
+The endpoint holds one of `--pool` connections of a simulated pool for `--hold` milliseconds, so the service
+takes `pool / hold` requests per second. Requests arrive at `--overload` times that rate for `--seconds`
+without waiting for the previous ones, as the clients of a real burst do. The health check needs
+a connection as well and is probed every 50 ms.
+
+Without the admission control every request waits for a connection and the latency grows with the queue.
+With it the limit is below the pool size, the admitted requests keep a bounded p99, the rest are refused
+at once and the health check always finds a connection.
+
+Usage: python -m bench.admission --pool 12 --hold 20 --overload 2 --seconds 3
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.status import HTTP_200_OK
+
+from bench.utils import print_table, summarize
+from src.middlewares import AdmissionMiddleware
+from src.middlewares.admission import READ_LANE, WRITE_LANE
+from src.utils.admission import AdmissionQueue
+
+HEALTH_PROBE_INTERVAL = 0.05
+
+
+def build_app(pool: int, hold: float, middleware: list[Middleware]) -> Starlette:
+    connections = asyncio.Semaphore(pool)
+
+    async def _work(_: Request) -> JSONResponse:
+        async with connections:
+            await asyncio.sleep(hold)
+        return JSONResponse({})
+
+    return Starlette(routes=[Route('/work', _work), Route('/healthz', _work)], middleware=middleware)
+
+
+async def run(app: Starlette, rate: float, seconds: float) -> tuple[list[float], list[float], int]:
+    """Returns the latencies of the successful requests and of the health checks, in ms, and the refusals."""
+    latencies: list[float] = []
+    health: list[float] = []
+    refused = 0
+
+    async def _request(client: AsyncClient, path: str, samples: list[float]) -> None:
+        nonlocal refused
+        started = time.perf_counter()
+        response = await client.get(path)
+        if response.status_code == HTTP_200_OK:
+            samples.append((time.perf_counter() - started) * 1000)
+        else:
+            refused += 1
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+        requests = []
+        started = time.perf_counter()
+        sent = probes = 0
+        while (elapsed := time.perf_counter() - started) < seconds:
+            while sent < elapsed * rate:
+                requests.append(asyncio.create_task(_request(client, '/work', latencies)))
+                sent += 1
+            if probes * HEALTH_PROBE_INTERVAL <= elapsed:
+                requests.append(asyncio.create_task(_request(client, '/healthz', health)))
+                probes += 1
+            await asyncio.sleep(0.001)
+        await asyncio.gather(*requests)
+    return latencies, health, refused
+
+
+async def main(pool: int, hold: float, overload: float, seconds: float) -> None:
+    limit = pool * 5 // 6
+    stacks = {
+        'none': [],
+        'admission': [Middleware(
+            AdmissionMiddleware,
+            lanes={READ_LANE: AdmissionQueue(limit, limit), WRITE_LANE: AdmissionQueue(limit, limit)},
+            queue_timeout=0.5,
+            exempt_paths=('/healthz',),
+        )],
+    }
+    rate = overload * pool / (hold / 1000)
+    rows = []
+    for name, middleware in stacks.items():
+        latencies, health, refused = await run(build_app(pool, hold / 1000, middleware), rate, seconds)
+        stats, health_stats = summarize(latencies), summarize(health)
+        rows.append([
+            name,
+            len(latencies),
+            refused,
+            f'{stats["p50"]:.1f}',
+            f'{stats["p99"]:.1f}',
+            f'{health_stats["p99"]:.1f}',
+        ])
+    print(f'{rate:.0f} requests/s offered, {pool / (hold / 1000):.0f} requests/s capacity\n')  # noqa: T201
+    print_table(['admission', 'served', 'refused', 'p50 ms', 'p99 ms', 'healthz p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pool', type=int, default=12)
+    parser.add_argument('--hold', type=float, default=20)
+    parser.add_argument('--overload', type=float, default=2)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.pool, args.hold, args.overload, args.seconds))
@@ -0,0 +1,129 @@
+"""Benchmarks rows per second and peak Python memory of the bulk insert strategies.
+
+Strategies:
+    - values: one `INSERT ... VALUES` statement per chunk of rows, the implementation used before;
+    - executemany: one prepared INSERT executed for every row;
+    - copy: binary `COPY ... FROM STDIN`;
+    - auto: `SqlAlchemyRepository.bulk_add`, which picks executemany or copy by the row count.
+
+Every insert runs in its own transaction that is rolled back afterwards, so the table does not grow.
+Memory is measured with tracemalloc in a separate run, since tracing slows the code down.
+
+Usage: python -m bench.bulk_insert --sizes 10 100 1000 10000 50000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bench.utils import create_bench_engine, delete_bench_users, print_table, seed_bench_tasks
+from src.config import settings
+from src.database.db import build_connect_args
+from src.models import TaskModel
+from src.repositories import TaskRepository
+from src.utils.enums import Status
+
+BENCH_USER_ID = uuid.UUID('00000000-0000-4000-8000-00000000b007')
+MAX_QUERY_PARAMS = 32767
+
+Strategy = Callable[[AsyncSession, list[dict[str, Any]]], Awaitable[None]]
+
+
+async def insert_values(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    chunk_size = MAX_QUERY_PARAMS // len(rows[0])
+    for start in range(0, len(rows), chunk_size):
+        await session.execute(insert(TaskModel).values(rows[start:start + chunk_size]))
+
+
+async def insert_executemany(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    await session.execute(insert(TaskModel), rows)
+
+
+async def insert_copy(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    await TaskRepository(session)._copy_records(rows)  # noqa: SLF001
+
+
+async def insert_auto(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    await TaskRepository(session).bulk_add(values=rows)
+
+
+STRATEGIES: dict[str, Strategy] = {
+    'values': insert_values,
+    'executemany': insert_executemany,
+    'copy': insert_copy,
+    'auto': insert_auto,
+}
+
+
+def make_rows(size: int) -> list[dict[str, Any]]:
+    return [
+        {
+            'id': uuid.uuid4(),
+            'title': f'Bench task {n}',
+            'description': 'Created by the bulk insert benchmark',
+            'status': Status.TODO,
+            'author_id': BENCH_USER_ID,
+            'assignee_id': None,
+        }
+        for n in range(size)
+    ]
+
+
+async def run_once(session_maker: async_sessionmaker, strategy: Strategy, rows: list[dict[str, Any]]) -> float:
+    async with session_maker() as session:
+        start = time.perf_counter()
+        await strategy(session, rows)
+        await session.flush()
+        elapsed = time.perf_counter() - start
+        await session.rollback()
+    return elapsed
+
+
+async def peak_memory(session_maker: async_sessionmaker, strategy: Strategy, rows: list[dict[str, Any]]) -> float:
+    tracemalloc.start()
+    await run_once(session_maker, strategy, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    connect_args = build_connect_args(
+        pgbouncer=settings.DB_PGBOUNCER,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+    )
+    engine = create_bench_engine(connect_args=connect_args)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    await seed_bench_tasks(BENCH_USER_ID, 0, session_maker)
+
+    table = []
+    try:
+        for size in sizes:
+            rows = make_rows(size)
+            for name, strategy in STRATEGIES.items():
+                await run_once(session_maker, strategy, rows)  # warmup
+                elapsed = statistics.median([await run_once(session_maker, strategy, rows) for _ in range(repeat)])
+                memory = await peak_memory(session_maker, strategy, rows)
+                table.append([size, name, size / elapsed, elapsed * 1000, memory])
+    finally:
+        await delete_bench_users([BENCH_USER_ID], session_maker)
+        await engine.dispose()
+
+    print_table(['rows', 'strategy', 'rows/s', 'median ms', 'peak MiB'], table)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
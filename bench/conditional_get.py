@@ -0,0 +1,67 @@
+"""Benchmarks the conditional reads of tasks against the unconditional ones.
+
+A polling client sends `If-None-Match` with the ETag it got before. For a single task only the version
+is read then, for a page the rows are read but the body is neither serialized nor sent.
+The task cache is disabled, so every `GET /tasks/{id}` reaches the database.
+
+Usage: python -m bench.conditional_get --tasks 10000 --limit 100 --repeat 2000
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+
+from bench.utils import delete_bench_users, measure, print_table, seed_bench_tasks, summarize
+from src.main import app
+from src.utils.cache import task_cache
+
+BENCH_USER_ID = uuid.UUID('00000000-0000-4000-8000-00000000b014')
+URL = '/api/v1/tasks'
+
+
+async def main(tasks: int, limit: int, repeat: int) -> None:
+    task_cache.maxsize = 0
+    task_ids = await seed_bench_tasks(
+        BENCH_USER_ID,
+        tasks,
+        description="repeat('Description ', 10)",
+        created_at="TIMESTAMP '2000-01-01' + n * INTERVAL '1 millisecond'",
+    )
+    rows = []
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+            page_etag = (await client.get(f'{URL}/', params={'limit': limit})).headers['ETag']
+            endpoints = {
+                'GET /tasks/{id}': lambda: client.get(f'{URL}/{random.choice(task_ids)}'),  # noqa: S311
+                # Every task starts with version 1.
+                'GET /tasks/{id} 304': lambda: client.get(
+                    f'{URL}/{random.choice(task_ids)}',  # noqa: S311
+                    headers={'If-None-Match': '"1"'},
+                ),
+                f'GET /tasks/?limit={limit}': lambda: client.get(f'{URL}/', params={'limit': limit}),
+                f'GET /tasks/?limit={limit} 304': lambda: client.get(
+                    f'{URL}/',
+                    params={'limit': limit},
+                    headers={'If-None-Match': page_etag},
+                ),
+            }
+            for name, request in endpoints.items():
+                response = await request()
+                stats = summarize(await measure(request, repeat, warmup=50))
+                rows.append([name, response.status_code, len(response.content), stats['p50'], stats['p95']])
+    finally:
+        await delete_bench_users([BENCH_USER_ID])
+
+    print_table(['endpoint', 'status', 'body bytes', 'p50 ms', 'p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.limit, args.repeat))
@@ -0,0 +1,326 @@
+"""Load test of the HTTP endpoints with a mix of requests and a comparison with a stored baseline.
+
+`--concurrency` clients send requests one after another for `--duration` seconds, each picking the endpoint
+by the weights of `--mix`. The application is driven in-process through the ASGI transport, or over a socket
+of uvicorn started in a subprocess with `--workers` workers. The database from the settings is seeded with
+`--users` users and `--tasks` tasks, which are deleted afterwards.
+
+For every endpoint the throughput, the latency percentiles, the errors and the number of SQL statements
+per request (from the `Server-Timing` header) are reported and written to `--output` as JSON. With
+`--baseline` the results are compared with a previous output: a higher median of an endpoint, fewer requests
+per second or a higher p99 of all requests by more than `--threshold`, or more statements per request,
+are regressions and the exit code is 1.
+The stored baseline was recorded with the default options and the ASGI transport, record a new one
+with `--output bench/baselines/load.json` on the machine that runs the comparison.
+
+With `--overload` the mix is run twice, with and without the admission control, by more clients than
+the pools have connections. The requests refused with 503 are counted apart, the latency percentiles
+are those of the served requests. `--output` and `--baseline` do not apply then.
+
+Usage: python -m bench.load --transport asgi --concurrency 16 --duration 10 --baseline bench/baselines/load.json
+       python -m bench.load --overload --concurrency 400 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess  # noqa: S404
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient, Limits, Response, TransportError
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+
+from bench.utils import delete_bench_users, percentile, print_table, seed_bench_tasks
+from src.config import settings
+from src.utils.constans import SERVER_TIMING_HEADER
+
+URL = '/api/v1'
+QUERIES = re.compile(r'desc="(\d+) queries"')
+DEFAULT_MIX = 'get_task=50,list_tasks=20,filter_tasks=10,user_tasks=10,stats=5,create_task=5'
+SERVER_START_TIMEOUT = 30
+
+
+@dataclass
+class Dataset:
+    user_ids: list[uuid.UUID]
+    task_ids: list[uuid.UUID]
+
+
+@dataclass
+class Samples:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    rejected: int = 0
+    errors: int = 0
+
+
+Scenario = Callable[[AsyncClient, Dataset, random.Random], Any]
+
+SCENARIOS: dict[str, Scenario] = {
+    'get_task': lambda client, data, rnd: client.get(f'{URL}/tasks/{rnd.choice(data.task_ids)}'),
+    'list_tasks': lambda client, _, __: client.get(f'{URL}/tasks/', params={'limit': 20}),
+    'filter_tasks': lambda client, data, rnd: client.get(
+        f'{URL}/tasks/',
+        params={'status': 'todo', 'author_id': str(rnd.choice(data.user_ids)), 'limit': 20},
+    ),
+    'user_tasks': lambda client, data, rnd: client.get(
+        f'{URL}/user/{rnd.choice(data.user_ids)}/tasks',
+        params={'limit': 20},
+    ),
+    'stats': lambda client, _, __: client.get(f'{URL}/tasks/stats'),
+    'create_task': lambda client, data, rnd: client.post(f'{URL}/tasks/', json={
+        'title': f'Load task {rnd.random()}',
+        'status': 'todo',
+        'author_id': str(rnd.choice(data.user_ids)),
+    }),
+}
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parses `name=weight,...`, the names are the keys of `SCENARIOS`."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in SCENARIOS:
+            err_msg = f'Unknown scenario {name.strip()!r}, expected one of {", ".join(SCENARIOS)}'
+            raise argparse.ArgumentTypeError(err_msg)
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def seed(users: int, tasks: int) -> Dataset:
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    task_ids = await seed_bench_tasks(
+        user_ids,
+        tasks,
+        status="(ARRAY['TODO', 'IN_PROGRESS', 'DONE'])[1 + n % 3]::task_status",
+    )
+    return Dataset(user_ids, task_ids)
+
+
+async def run(client: AsyncClient, data: Dataset, mix: dict[str, int], concurrency: int, duration: float,
+              seed_value: int) -> tuple[dict[str, Samples], float]:
+    """Runs the clients and returns the samples by scenario and the elapsed time in seconds."""
+    samples = {name: Samples() for name in mix}
+    names, weights = list(mix), list(mix.values())
+
+    async def _client(number: int) -> None:
+        rnd = random.Random(seed_value + number)  # noqa: S311
+        while time.perf_counter() < deadline:
+            name = rnd.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response: Response = await SCENARIOS[name](client, data, rnd)
+            except TransportError:  # the server dropped the connection under the overload
+                samples[name].errors += 1
+                continue
+            latency = (time.perf_counter() - started) * 1000
+            if response.is_success:
+                samples[name].latencies.append(latency)
+                match = QUERIES.search(response.headers.get(SERVER_TIMING_HEADER, ''))
+                samples[name].queries.append(int(match.group(1)) if match else 0)
+            elif response.status_code == HTTP_503_SERVICE_UNAVAILABLE:
+                samples[name].rejected += 1
+                # As a well-behaved client does, instead of retrying at once.
+                await asyncio.sleep(float(response.headers.get('Retry-After', 0)))
+            else:
+                samples[name].errors += 1
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(number) for number in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarize_samples(samples: Samples, elapsed: float) -> dict[str, float]:
+    latencies = samples.latencies or [0.0]
+    return {
+        'requests': len(samples.latencies),
+        'rejected': samples.rejected,
+        'errors': samples.errors,
+        'rps': len(samples.latencies) / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'queries': sum(samples.queries) / len(samples.queries) if samples.queries else 0.0,
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Returns the regressions of the results against the baseline.
+
+    The tail of an endpoint with a small share of the mix rests on a few samples, so the endpoints are compared
+    by the median and the number of statements, the throughput and the p99 of all requests together.
+    """
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        if current['p50'] > previous['p50'] * (1 + threshold):
+            regressions.append(f'{name}: p50 {current["p50"]:.1f} ms, was {previous["p50"]:.1f} ms')
+        # The number of statements does not depend on the machine, any increase is a regression.
+        if current['queries'] > previous['queries'] + 0.01:
+            regressions.append(f'{name}: {current["queries"]:.2f} statements/request, was {previous["queries"]:.2f}')
+    current, previous = results['total'], baseline['total']
+    if current['rps'] < previous['rps'] * (1 - threshold):
+        regressions.append(f'total: {current["rps"]:.0f} requests/s, was {previous["rps"]:.0f}')
+    if current['p99'] > previous['p99'] * (1 + threshold):
+        regressions.append(f'total: p99 {current["p99"]:.1f} ms, was {previous["p99"]:.1f} ms')
+    return regressions
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, *, admission: bool) -> subprocess.Popen:
+    """Starts uvicorn in a subprocess, with the environment and so the database of this process."""
+    return subprocess.Popen(  # noqa: S603
+        [sys.executable, '-m', 'uvicorn', 'src.main:app', '--port', str(port), '--workers', str(workers),
+         '--log-level', 'warning', '--no-access-log'],
+        env={**os.environ, 'ADMISSION_ENABLED': str(admission).lower()},
+    )
+
+
+async def wait_until_ready(client: AsyncClient) -> None:
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get('/api/healthz/')).is_success:
+                return
+        except TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    err_msg = f'uvicorn did not start in {SERVER_START_TIMEOUT} seconds'
+    raise RuntimeError(err_msg)
+
+
+async def run_app(
+        args: argparse.Namespace,
+        data: Dataset,
+        *,
+        admission: bool,
+) -> tuple[dict[str, Samples], float]:
+    """Warms up and measures the application, served as `--transport` says, with or without the admission control."""
+    server = None
+    try:
+        if args.transport == 'uvicorn':
+            port = _free_port()
+            server = start_server(port, args.workers, admission=admission)
+            # Every client has its own connection, instead of queueing beyond the 100 of the default limits.
+            client = AsyncClient(
+                base_url=f'http://127.0.0.1:{port}', timeout=60, limits=Limits(max_connections=args.concurrency),
+            )
+        else:
+            from src.main import app, create_fast_api_app  # noqa: PLC0415
+
+            if admission != settings.ADMISSION_ENABLED:
+                settings.ADMISSION_ENABLED = admission
+                app = create_fast_api_app()
+            # A failed request is counted as an error as over a socket, instead of stopping the clients.
+            transport = ASGITransport(app=app, raise_app_exceptions=False)
+            client = AsyncClient(transport=transport, base_url='http://bench', timeout=60)
+        async with client:
+            if server is not None:
+                await wait_until_ready(client)
+            await run(client, data, args.mix, args.concurrency, args.warmup, args.seed)
+            return await run(client, data, args.mix, args.concurrency, args.duration, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def total_samples(samples: dict[str, Samples]) -> Samples:
+    return Samples(
+        latencies=[latency for item in samples.values() for latency in item.latencies],
+        queries=[queries for item in samples.values() for queries in item.queries],
+        rejected=sum(item.rejected for item in samples.values()),
+        errors=sum(item.errors for item in samples.values()),
+    )
+
+
+async def overload(args: argparse.Namespace, data: Dataset) -> int:
+    rows = []
+    for admission in (True, False):
+        samples, elapsed = await run_app(args, data, admission=admission)
+        total = summarize_samples(total_samples(samples), elapsed)
+        del total['queries']
+        rows.append(['on' if admission else 'off', *total.values()])
+    print_table(['admission', 'served', 'rejected', 'errors', 'rps', 'p50 ms', 'p95 ms', 'p99 ms'], rows)
+    return 0
+
+
+async def main(args: argparse.Namespace) -> int:
+    await delete_bench_users()  # after an interrupted run
+    data = await seed(args.users, args.tasks)
+    try:
+        if args.overload:
+            return await overload(args, data)
+        samples, elapsed = await run_app(args, data, admission=settings.ADMISSION_ENABLED)
+    finally:
+        await delete_bench_users(data.user_ids)
+
+    scenarios = {name: summarize_samples(scenario_samples, elapsed) for name, scenario_samples in samples.items()}
+    total = total_samples(samples)
+    results = {
+        'options': {
+            'transport': args.transport,
+            'workers': args.workers,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'mix': args.mix,
+            'users': args.users,
+            'tasks': args.tasks,
+        },
+        'scenarios': scenarios,
+        'total': summarize_samples(total, elapsed),
+    }
+    print_table(
+        ['endpoint', 'requests', 'rejected', 'errors', 'rps', 'p50 ms', 'p95 ms', 'p99 ms', 'queries'],
+        [[name, *values.values()] for name, values in {**scenarios, 'total': results['total']}.items()],
+    )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline['options'] != results['options']:
+            print(f'The baseline was recorded with other options: {baseline["options"]}')  # noqa: T201
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')  # noqa: T201
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transport', choices=('asgi', 'uvicorn'), default='asgi')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn workers')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    parser.add_argument('--warmup', type=float, default=2, help='seconds')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.3, help='allowed relative change')
+    parser.add_argument('--overload', action='store_true', help='compare the latency with and without admission')
+    sys.exit(asyncio.run(main(parser.parse_args())))
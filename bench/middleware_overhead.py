@@ -0,0 +1,65 @@
+"""Benchmarks the overhead of the metrics and instrumentation middlewares on a request.
+
+An endpoint doing no work is called as an ASGI application, without an HTTP client, with and without
+the middlewares, so the difference is the whole cost of collecting the metrics. The cost of a histogram
+observation is measured alone as well.
+
+Usage: python -m bench.middleware_overhead --repeat 20000
+"""
+
+import argparse
+import asyncio
+import timeit
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.types import Message
+
+from bench.utils import measure, print_table, summarize
+from src.middlewares import InstrumentationMiddleware, MetricsMiddleware
+from src.utils.metrics import Histogram
+
+STACKS = {
+    'none': [],
+    'metrics': [Middleware(MetricsMiddleware)],
+    'instrumentation': [Middleware(InstrumentationMiddleware)],
+    'metrics + instrumentation': [Middleware(MetricsMiddleware), Middleware(InstrumentationMiddleware)],
+}
+
+
+def _ok(_: object) -> PlainTextResponse:
+    return PlainTextResponse('ok')
+
+
+async def _receive() -> Message:  # noqa: RUF029
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def _send(_: Message) -> None:
+    pass
+
+
+async def main(repeat: int) -> None:
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': '/items/1', 'raw_path': b'/items/1', 'root_path': '',
+        'query_string': b'', 'headers': [], 'scheme': 'http', 'server': ('bench', 80), 'http_version': '1.1',
+    }
+    rows = []
+    for name, middleware in STACKS.items():
+        app = Starlette(routes=[Route('/items/{item_id}', _ok)], middleware=middleware)
+        stats = summarize(await measure(lambda app=app: app(dict(scope), _receive, _send), repeat, warmup=1000))
+        rows.append([name, f'{stats["p50"] * 1000:.1f}', f'{stats["p95"] * 1000:.1f}'])
+    print_table(['middlewares', 'p50 us', 'p95 us'], rows)
+
+    histogram = Histogram('bench_seconds', 'Bench.', ('method', 'route', 'status'))
+    seconds = timeit.timeit(lambda: histogram.observe(0.012, 'GET', '/items/{item_id}', '200'), number=repeat * 10)
+    print(f'\nhistogram observation: {seconds / (repeat * 10) * 1e9:.0f} ns')  # noqa: T201
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
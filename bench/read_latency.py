@@ -0,0 +1,49 @@
+"""Benchmarks the latency of the read endpoints through the whole application stack.
+
+Requests are sent one by one through an in-process ASGI transport, so the numbers contain
+the application and database time without the network between the client and the server.
+The task cache is disabled, so every `GET /tasks/{id}` reaches the database.
+
+Usage: python -m bench.read_latency --tasks 10000 --repeat 2000
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+
+from bench.utils import delete_bench_users, measure, print_table, seed_bench_tasks, summarize
+from src.main import app
+from src.utils.cache import task_cache
+
+BENCH_USER_ID = uuid.UUID('00000000-0000-4000-8000-00000000b010')
+URL = '/api/v1/tasks'
+
+
+async def main(tasks: int, repeat: int) -> None:
+    task_cache.maxsize = 0
+    task_ids = await seed_bench_tasks(BENCH_USER_ID, tasks)
+    rows = []
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+            endpoints = {
+                'GET /tasks/{id}': lambda: client.get(f'{URL}/{random.choice(task_ids)}'),  # noqa: S311
+                'GET /tasks/?limit=20': lambda: client.get(f'{URL}/', params={'limit': 20}),
+            }
+            for name, request in endpoints.items():
+                stats = summarize(await measure(request, repeat, warmup=50))
+                rows.append([name, stats['p50'], stats['p95'], stats['p99']])
+    finally:
+        await delete_bench_users([BENCH_USER_ID])
+
+    print_table(['endpoint', 'p50 ms', 'p95 ms', 'p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.repeat))
@@ -0,0 +1,118 @@
+"""Micro-benchmarks the serialization of a page of tasks, from ORM objects to the response body.
+
+Paths:
+    - validated: the rows are validated into the schemas, then FastAPI validates the response model
+      again and ORJSONResponse renders it, the implementation used before;
+    - constructed: the rows are converted with `model_construct`, FastAPI still validates the response;
+    - trusted: the rows are converted with `model_construct` and TrustedJSONResponse renders them
+      with the pydantic serializer, nothing is validated.
+
+No database is involved, the tasks are built in memory, optionally with 3 watchers and 2 executors each.
+
+Usage: python -m bench.serialization --sizes 100 1000 5000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import datetime
+import uuid
+from collections.abc import Awaitable, Callable
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from bench.utils import measure, print_table, summarize
+from src.models import TaskModel, UserModel
+from src.schemas import MultiTaskResponse, SparseTaskDB
+from src.utils.constans import TASK_FIELDS, TASK_RELATIONSHIPS
+from src.utils.enums import Status
+from src.utils.responses import TrustedJSONResponse
+
+RESPONSE_FIELD = create_response_field(name='bench', type_=MultiTaskResponse)
+
+Path = Callable[[list[TaskModel], frozenset[str]], Awaitable[bytes]]
+
+
+def make_tasks(size: int, *, with_relationships: bool) -> list[TaskModel]:
+    users = [
+        UserModel(id=uuid.uuid4(), full_name=f'User {n}', email=f'user-{n}@example.com')
+        for n in range(5)
+    ]
+    created_at = datetime.datetime(2024, 1, 1)  # noqa: DTZ001
+    tasks = []
+    for n in range(size):
+        task = TaskModel(
+            id=uuid.uuid4(),
+            title=f'Task {n}',
+            description='Description ' * 10,
+            status=Status.TODO,
+            created_at=created_at + datetime.timedelta(milliseconds=n),
+            author_id=users[0].id,
+            assignee_id=users[1].id,
+            version=1,
+        )
+        if with_relationships:
+            task.watchers = users[2:]
+            task.executors = users[:2]
+        tasks.append(task)
+    return tasks
+
+
+async def validated(tasks: list[TaskModel], fields: frozenset[str]) -> bytes:
+    payload = [SparseTaskDB(**task.to_sparse_schema(fields).model_dump(exclude_unset=True)) for task in tasks]
+    content = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content=MultiTaskResponse(payload=payload, next_cursor=None),
+        exclude_unset=True,
+        is_coroutine=True,
+    )
+    return ORJSONResponse(content).body
+
+
+async def constructed(tasks: list[TaskModel], fields: frozenset[str]) -> bytes:
+    payload = [task.to_sparse_schema(fields) for task in tasks]
+    content = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content=MultiTaskResponse(payload=payload, next_cursor=None),
+        exclude_unset=True,
+        is_coroutine=True,
+    )
+    return ORJSONResponse(content).body
+
+
+async def trusted(tasks: list[TaskModel], fields: frozenset[str]) -> bytes:  # noqa: RUF029
+    payload = [task.to_sparse_schema(fields) for task in tasks]
+    return TrustedJSONResponse(MultiTaskResponse(payload=payload, next_cursor=None)).body
+
+
+PATHS: dict[str, Path] = {
+    'validated': validated,
+    'constructed': constructed,
+    'trusted': trusted,
+}
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    rows = []
+    for with_relationships in (False, True):
+        fields = TASK_FIELDS | TASK_RELATIONSHIPS if with_relationships else TASK_FIELDS
+        for size in sizes:
+            tasks = make_tasks(size, with_relationships=with_relationships)
+            bodies = set()
+            for name, path in PATHS.items():
+                bodies.add(await path(tasks, fields))
+                samples = await measure(lambda path=path, tasks=tasks, fields=fields: path(tasks, fields), repeat)
+                stats = summarize(samples)
+                rows.append([size, 'yes' if with_relationships else 'no', name, stats['p50'], stats['p95']])
+            assert len(bodies) == 1, 'the paths render different bodies'
+
+    print_table(['rows', 'relationships', 'path', 'p50 ms', 'p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,89 @@
+"""Benchmarks the page of tasks with different `fields` and `include` options.
+
+For every variant the number of SQL statements per request, the size of the response body
+and the latency are measured through an in-process ASGI transport.
+The seeded tasks are dated back, so that they fill the first page, and each of them has
+watchers and executors, so that loading the relationships has a real cost.
+`include=watchers,executors` with all fields is what every page cost before the options were added.
+
+Usage: python -m bench.sparse_fields --tasks 10000 --limit 100 --repeat 300
+"""
+
+import argparse
+import asyncio
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+
+from bench.utils import delete_bench_users, measure, print_table, seed_bench_tasks, summarize
+from src.database.db import async_session_maker, engines
+from src.main import app
+
+BENCH_USER_IDS = [uuid.UUID(f'00000000-0000-4000-8000-0000000b011{n}') for n in range(4)]
+URL = '/api/v1/tasks/'
+
+VARIANTS = {
+    'all fields + watchers,executors': {'include': 'watchers,executors'},
+    'all fields': {},
+    'fields=title,status': {'fields': 'title,status'},
+    'fields=title + include=watchers': {'fields': 'title', 'include': 'watchers'},
+}
+
+
+async def seed(tasks: int) -> None:
+    """Adds the tasks of the first bench user, watched by the others and executed by the first two."""
+    await seed_bench_tasks(
+        BENCH_USER_IDS[0],
+        tasks,
+        description="repeat('Description ', 10)",
+        created_at="TIMESTAMP '2000-01-01' + n * INTERVAL '1 millisecond'",
+    )
+    await seed_bench_tasks(BENCH_USER_IDS[1:], 0)
+    async with async_session_maker() as session:
+        for table, user_ids in (('watchers', BENCH_USER_IDS[1:]), ('executors', BENCH_USER_IDS[:2])):
+            query = f'INSERT INTO {table} (task_id, user_id) SELECT id, :user_id FROM tasks WHERE author_id = :author'
+            await session.execute(
+                text(query),
+                [{'user_id': user_id, 'author': BENCH_USER_IDS[0]} for user_id in user_ids],
+            )
+        await session.commit()
+
+
+async def main(tasks: int, limit: int, repeat: int) -> None:
+    await seed(tasks)
+    statements = 0
+
+    def count(*_: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    rows = []
+    # Pages run on the reporting pool, the statements of every pool are counted.
+    for engine in engines.values():
+        event.listen(engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://bench') as client:
+            for name, options in VARIANTS.items():
+                params = {**options, 'limit': limit}
+                statements = 0
+                response = await client.get(URL, params=params)
+                per_request, size = statements, len(response.content)
+                samples = await measure(lambda params=params: client.get(URL, params=params), repeat, warmup=20)
+                stats = summarize(samples)
+                rows.append([name, per_request, size / 1024, stats['p50'], stats['p95']])
+    finally:
+        for engine in engines.values():
+            event.remove(engine.sync_engine, 'before_cursor_execute', count)
+        await delete_bench_users(BENCH_USER_IDS)
+
+    print_table(['variant', 'statements', 'body KiB', 'p50 ms', 'p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.limit, args.repeat))
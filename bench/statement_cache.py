@@ -0,0 +1,90 @@
+"""Benchmarks `get_by_id` and `get_all` throughput with and without prepared statement caching.
+
+Modes:
+    - pgbouncer: unique statement names, nothing cached (`DB_PGBOUNCER=true`);
+    - direct: statements prepared once per connection and reused (`DB_PGBOUNCER=false`);
+    - legacy: unique statement names with the default SQLAlchemy cache, the configuration used before.
+
+Each operation runs in its own transaction, the same way a `UnitOfWork` does.
+
+Usage: python -m bench.statement_cache --tasks 10000 --concurrency 10 --seconds 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bench.utils import create_bench_engine, delete_bench_users, print_table, seed_bench_tasks
+from src.database.db import build_connect_args
+from src.repositories import TaskRepository
+from src.schemas.tasks import FilterTaskRequest
+
+BENCH_USER_ID = uuid.UUID('00000000-0000-4000-8000-00000000b004')
+MODES: dict[str, dict[str, Any]] = {
+    'pgbouncer': build_connect_args(pgbouncer=True, statement_cache_size=0),
+    'direct': build_connect_args(pgbouncer=False, statement_cache_size=500),
+    'legacy': {'prepared_statement_name_func': lambda: f'__asyncpg_{uuid.uuid4()}__'},
+}
+
+
+async def throughput(
+        session_maker: async_sessionmaker,
+        operation: Callable[[TaskRepository], Awaitable[Any]],
+        concurrency: int,
+        seconds: float,
+) -> float:
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def worker() -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            async with session_maker() as session:
+                await operation(TaskRepository(session))
+                await session.commit()
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / seconds
+
+
+async def main(tasks: int, concurrency: int, seconds: float) -> None:
+    setup_engine = create_bench_engine()
+    setup_maker = async_sessionmaker(setup_engine, class_=AsyncSession, expire_on_commit=False)
+    task_ids = await seed_bench_tasks(BENCH_USER_ID, tasks, setup_maker)
+
+    task_filter = FilterTaskRequest()
+    operations = {
+        'get_by_id': lambda repo: repo.get_by_filter_one_or_none(id=random.choice(task_ids)),  # noqa: S311
+        'get_all': lambda repo: repo.get_all(task_filter, limit=100),
+    }
+
+    rows = []
+    try:
+        for mode, connect_args in MODES.items():
+            engine = create_bench_engine(pool_size=concurrency, connect_args=connect_args)
+            session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for name, operation in operations.items():
+                await throughput(session_maker, operation, concurrency, seconds=1)  # warm up the pool
+                rows.append([mode, name, await throughput(session_maker, operation, concurrency, seconds)])
+            await engine.dispose()
+    finally:
+        await delete_bench_users([BENCH_USER_ID], setup_maker)
+        await setup_engine.dispose()
+
+    print_table(['mode', 'operation', 'ops/s'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10_000, help='number of tasks to seed')
+    parser.add_argument('--concurrency', type=int, default=10, help='number of concurrent workers')
+    parser.add_argument('--seconds', type=float, default=10, help='measurement time per operation and mode')
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.concurrency, args.seconds))
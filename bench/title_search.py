@@ -0,0 +1,121 @@
+"""Benchmarks substring search over task titles with and without the trigram index.
+
+The benchmark fills a scratch table shaped like `tasks` (title plus the keyset index) and runs the page query
+produced by `TaskRepository.get_all` for several search terms in three setups:
+    - btree: the former `title_index`, which cannot serve `ILIKE '%...%'`;
+    - trgm generic: `title_trgm_index` with the default plan cache mode of prepared statements;
+    - trgm custom: `title_trgm_index` with `plan_cache_mode = force_custom_plan`, as the repository runs it.
+
+Usage: python -m bench.title_search --rows 1000000
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from bench.utils import create_bench_engine, measure, print_table, summarize
+
+TABLE = 'bench_title_search'
+WORDS = (
+    'fix', 'add', 'update', 'remove', 'refactor', 'login', 'page', 'report', 'export', 'import',
+    'billing', 'invoice', 'search', 'cache', 'timeout', 'button', 'layout', 'mobile', 'api', 'docs',
+)
+SEARCH_TERMS = (
+    'invoice',  # frequent word
+    'voic',  # frequent substring
+    'billing export',  # rare phrase
+    'a1b2c',  # almost never matches
+)
+# Same predicate and ordering as `TaskRepository.get_all` renders for a title filter.
+SEARCH_QUERY = text(f"""
+    SELECT id FROM {TABLE}
+    WHERE title ILIKE '%' || :term || '%' ESCAPE '/'
+    ORDER BY created_at, id
+    LIMIT 101
+""")
+
+
+async def fill_table(conn: AsyncConnection, rows: int) -> None:
+    words = ', '.join(f"'{word}'" for word in WORDS)
+    await conn.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+    await conn.execute(text(f"""
+        CREATE TABLE {TABLE} (
+            id bigint PRIMARY KEY,
+            title varchar(255) NOT NULL,
+            created_at timestamp NOT NULL
+        )
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO {TABLE} (id, title, created_at)
+        SELECT n,
+               concat_ws(' ', w[1 + (n * 7) % {len(WORDS)}], w[1 + (n * 13) % {len(WORDS)}],
+                              w[1 + (n * 31) % {len(WORDS)}], left(md5(n::text), 8)),
+               TIMESTAMP '2024-01-01' + n * INTERVAL '1 second'
+        FROM generate_series(1, :rows) AS n, (SELECT ARRAY[{words}] AS w) AS words
+    """), {'rows': rows})
+    await conn.execute(text(f'CREATE INDEX {TABLE}_keyset ON {TABLE} (created_at, id)'))
+
+
+async def run_searches(conn: AsyncConnection, repeat: int, *, custom_plan: bool) -> dict[str, dict[str, float]]:
+    async def search(term: str) -> None:
+        async with conn.begin():
+            if custom_plan:
+                await conn.execute(text('SET LOCAL plan_cache_mode = force_custom_plan'))
+            await conn.execute(SEARCH_QUERY, {'term': term})
+
+    return {
+        term: summarize(await measure(lambda term=term: search(term), repeat=repeat))
+        for term in SEARCH_TERMS
+    }
+
+
+async def rebuild_index(conn: AsyncConnection, drop: str, create: str) -> None:
+    async with conn.begin():
+        await conn.execute(text(f'DROP INDEX IF EXISTS {drop}'))
+        await conn.execute(text(create))
+        await conn.execute(text(f'ANALYZE {TABLE}'))
+
+
+async def main(rows: int, repeat: int) -> None:
+    engine = create_bench_engine()
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            await fill_table(conn, rows)
+
+        await rebuild_index(conn, f'{TABLE}_trgm', f'CREATE INDEX {TABLE}_btree ON {TABLE} (title)')
+        btree = await run_searches(conn, repeat, custom_plan=False)
+
+        await rebuild_index(
+            conn,
+            f'{TABLE}_btree',
+            f'CREATE INDEX {TABLE}_trgm ON {TABLE} USING gin (title gin_trgm_ops)',
+        )
+        generic = await run_searches(conn, repeat, custom_plan=False)
+        custom = await run_searches(conn, repeat, custom_plan=True)
+
+        async with conn.begin():
+            await conn.execute(text(f'DROP TABLE {TABLE}'))
+    await engine.dispose()
+
+    print_table(
+        [
+            'term', 'btree p50', 'btree p95',
+            'trgm generic p50', 'trgm generic p95', 'trgm custom p50', 'trgm custom p95',
+        ],
+        [
+            [term, btree[term]['p50'], btree[term]['p95'], generic[term]['p50'], generic[term]['p95'],
+             custom[term]['p50'], custom[term]['p95']]
+            for term in SEARCH_TERMS
+        ],
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of rows in the scratch table')
+    parser.add_argument('--repeat', type=int, default=20, help='number of measured runs per search term')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
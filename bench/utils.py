@@ -0,0 +1,110 @@
+"""Contains helper functions for benchmarks."""
+
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from src.config import settings
+from src.database.db import async_session_maker
+
+# Bench users are recognized by the domain of the email, their tasks are deleted with them.
+BENCH_EMAIL_DOMAIN = 'bench.example'
+
+
+def create_bench_engine(**kwargs: Any) -> AsyncEngine:
+    """Returns an engine connected to the database from the settings."""
+    return create_async_engine(settings.DB_URL, echo=False, future=True, **kwargs)
+
+
+async def seed_bench_tasks(
+        user_ids: uuid.UUID | Sequence[uuid.UUID],
+        tasks: int,
+        session_maker: async_sessionmaker = async_session_maker,
+        **columns: str,
+) -> list[uuid.UUID]:
+    """Adds the bench users and `tasks` tasks authored by them in turn, returns the IDs of the tasks.
+
+    `columns` are SQL expressions of other task columns over the number `n` of the task,
+    e.g. `created_at="TIMESTAMP '2000-01-01' + n * INTERVAL '1 millisecond'"`.
+    """
+    user_ids = [user_ids] if isinstance(user_ids, uuid.UUID) else list(user_ids)
+    columns = {'title': "'Bench task ' || n", 'status': "'TODO'", **columns}
+    async with session_maker() as session:
+        await session.execute(
+            text("""
+                INSERT INTO users (id, full_name, email)
+                SELECT id, 'Bench user', id || '@' || :domain FROM unnest(CAST(:user_ids AS uuid[])) AS id
+            """),
+            {'user_ids': user_ids, 'domain': BENCH_EMAIL_DOMAIN},
+        )
+        result = await session.execute(
+            text(f"""
+                INSERT INTO tasks (id, author_id, {', '.join(columns)})
+                SELECT gen_random_uuid(), user_ids[1 + n % cardinality(user_ids)], {', '.join(columns.values())}
+                FROM generate_series(1, :tasks) AS n, CAST(:user_ids AS uuid[]) AS user_ids
+                RETURNING id
+            """),
+            {'user_ids': user_ids, 'tasks': tasks},
+        )
+        task_ids = list(result.scalars())
+        await session.commit()
+    return task_ids
+
+
+async def delete_bench_users(
+        user_ids: Iterable[uuid.UUID] | None = None,
+        session_maker: async_sessionmaker = async_session_maker,
+) -> None:
+    """Deletes the bench users with their tasks, all of them if no IDs are given, e.g. after an interrupted run."""
+    async with session_maker() as session:
+        if user_ids is None:
+            await session.execute(
+                text('DELETE FROM users WHERE email LIKE :pattern'),
+                {'pattern': f'%@{BENCH_EMAIL_DOMAIN}'},
+            )
+        else:
+            await session.execute(text('DELETE FROM users WHERE id = ANY(:ids)'), {'ids': list(user_ids)})
+        await session.commit()
+
+
+async def measure(func: Callable[[], Awaitable[Any]], repeat: int, warmup: int = 3) -> list[float]:
+    """Runs the coroutine function several times and returns the durations in milliseconds."""
+    for _ in range(warmup):
+        await func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Returns the percentile of the samples using the nearest-rank method."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Returns the median and tail latencies of the samples."""
+    return {
+        'p50': statistics.median(samples),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+    }
+
+
+def print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    """Prints the results as a plain-text table."""
+    cells = [[f'{cell:.2f}' if isinstance(cell, float) else str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(item)) for item in column) for column in zip(headers, *cells, strict=False)]
+    print('  '.join(header.ljust(width) for header, width in zip(headers, widths, strict=True)))  # noqa: T201
+    for row in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)))  # noqa: T201
@@ -5,16 +5,20 @@ __all__ = [
 import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
 from src.api.v1.routers import v1_task_router, v1_user_router
-from src.database.db import get_async_session
+from src.database.db import engines, get_async_session, replica_engine
 from src.metadata import ERRORS_MAP
+from src.schemas.monitoring import CacheStatsResponse
 from src.schemas.response import BaseResponse
+from src.utils.cache import task_cache
 from src.utils.constans import Tags
+from src.utils.metrics import PROMETHEUS_MEDIA_TYPE, render, update_pool_gauges
 
 router = APIRouter()
 router.include_router(v1_user_router, prefix='/v1')
@@ -44,3 +48,31 @@ async def health_check(
     ])
 
     return BaseResponse()
+
+
+@router.get(
+    path='/cache/stats/',
+    tags=[Tags.MONITORING],
+    status_code=HTTP_200_OK,
+)
+def cache_stats() -> CacheStatsResponse:
+    """Get hit, miss and eviction counters of the in-process caches."""
+    return CacheStatsResponse(payload={'tasks': task_cache.stats()})
+
+
+@router.get(
+    path='/metrics/',
+    tags=[Tags.MONITORING],
+    status_code=HTTP_200_OK,
+    response_class=PlainTextResponse,
+)
+async def metrics() -> PlainTextResponse:  # noqa: RUF029
+    """Get the request, transaction and connection pool metrics of this process in the Prometheus text format.
+
+    The metrics are read on the event loop thread, which is the only one updating them.
+    """
+    named_engines = {pool.value: engine for pool, engine in engines.items()}
+    if replica_engine is not None:
+        named_engines['replica'] = replica_engine
+    update_pool_gauges(named_engines)
+    return PlainTextResponse(render(), media_type=PROMETHEUS_MEDIA_TYPE)
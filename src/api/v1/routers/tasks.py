@@ -1,26 +1,45 @@
 """The module contains base routes for working with tasks."""
 
-from fastapi import APIRouter, Depends
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
     HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
 )
 
 from src.api.v1.services.task import TaskService
+from src.schemas.membership import MembershipChangeRequest, MembershipChangeResponse, MembershipCounts
+from src.schemas.pagination import PaginationRequest
 from src.schemas.response import BaseErrorResponse
 from src.schemas.tasks import (
+    BatchUpdateTaskItem,
+    BatchUpdateTaskResponse,
+    BulkCreateTaskResponse,
     CreateTaskRequest,
     FilterTaskRequest,
     MultiTaskResponse,
+    SparseTaskDB,
+    SparseTaskResponse,
     TaskDB,
+    TaskFieldsRequest,
     TaskResponse,
+    TaskStats,
+    TaskStatsResponse,
     UpdateTaskRequest,
 )
-from src.utils.constans import Tags
+from src.utils.constans import BATCH_UPDATE_MAX_SIZE, BULK_CREATE_MAX_SIZE, NDJSON_MEDIA_TYPE, Tags
+from src.utils.enums import Membership, Status
+from src.utils.etag import etag_matches, not_modified, version_etag
+from src.utils.responses import TrustedJSONResponse
+from src.utils.service import pool_extra
 
 router = APIRouter(prefix='/tasks', tags=[Tags.TASKS_V1])
 
@@ -48,6 +67,41 @@ async def create_task(
     return TaskResponse(payload=created_task)
 
 
+@router.post(
+    path='/bulk',
+    status_code=HTTP_201_CREATED,
+    responses={
+        HTTP_201_CREATED: {
+            'model': BulkCreateTaskResponse,
+            'description': 'Valid tasks created, the rest are listed in `errors`.',
+        },
+    },
+    # The items are validated by the service, so that an invalid one does not reject the others,
+    # but they are documented as the tasks they must be.
+    openapi_extra={
+        **pool_extra(TaskService.bulk_create),
+        'requestBody': {
+            'content': {
+                'application/json': {
+                    'schema': {'items': {'$ref': '#/components/schemas/CreateTaskRequest'}},
+                },
+            },
+        },
+    },
+)
+async def create_tasks_bulk(
+        tasks: list[dict[str, Any]] = Body(..., max_length=BULK_CREATE_MAX_SIZE),
+        service: TaskService = Depends(),
+) -> BulkCreateTaskResponse:
+    """Create many tasks in one transaction.
+
+    Every task is validated separately, so that invalid ones are reported by their position
+    in `errors` while the others are still created.
+    """
+    created_ids, errors = await service.bulk_create(tasks)
+    return BulkCreateTaskResponse(payload=created_ids, errors=errors)
+
+
 @router.get(
     path='/',
     status_code=HTTP_200_OK,
@@ -55,16 +109,94 @@ async def create_task(
         HTTP_200_OK: {
             'model': MultiTaskResponse,
             'description': 'Tasks got successfully.',
+            'content': {NDJSON_MEDIA_TYPE: {}},
+        },
+        HTTP_304_NOT_MODIFIED: {
+            'description': 'The page matches `If-None-Match`.',
+        },
+        HTTP_400_BAD_REQUEST: {
+            'model': BaseErrorResponse,
+            'description': 'Invalid pagination cursor or unknown task fields.',
         },
     },
+    openapi_extra=pool_extra(TaskService.get_all),
 )
 async def get_tasks(
         task_filter: FilterTaskRequest = Depends(FilterTaskRequest),
+        pagination: PaginationRequest = Depends(PaginationRequest),
+        projection: TaskFieldsRequest = Depends(TaskFieldsRequest),
+        accept: str | None = Header(None),
+        if_none_match: str | None = Header(None),
         service: TaskService = Depends(),
 ) -> MultiTaskResponse:
-    """Get tasks with filtering."""
-    tasks: list[TaskDB] = await service.get_all(task_filter)
-    return MultiTaskResponse(payload=tasks)
+    """Get a page of tasks with filtering.
+
+    Only the fields listed in `fields` are returned, relationships are loaded only if listed in `include`.
+    Pages without relationships carry an ETag, a page matching `If-None-Match` is answered with 304.
+    With `Accept: application/x-ndjson` all matching tasks are streamed one per line instead,
+    `limit` is ignored and `after` may be used to resume an interrupted stream.
+    """
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            service.stream_all(task_filter, projection, pagination.after),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    tasks, next_cursor, etag = await service.get_all(task_filter, pagination, projection)
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return TrustedJSONResponse(
+        MultiTaskResponse(payload=tasks, next_cursor=next_cursor),
+        headers={'ETag': etag} if etag else None,
+    )
+
+
+@router.get(
+    path='/stats',
+    status_code=HTTP_200_OK,
+    responses={
+        HTTP_200_OK: {
+            'model': TaskStatsResponse,
+            'description': 'Task statistics got successfully.',
+        },
+    },
+    openapi_extra=pool_extra(TaskService.get_stats),
+)
+async def get_task_stats(
+        service: TaskService = Depends(),
+) -> TaskStatsResponse:
+    """Get the number of tasks per status, per author and per assignee.
+
+    The numbers are read from counters kept up to date in the same transactions as the tasks,
+    so the cost does not depend on the number of tasks.
+    """
+    stats: TaskStats = await service.get_stats()
+    return TaskStatsResponse(payload=stats)
+
+
+@router.patch(
+    path='/batch',
+    status_code=HTTP_200_OK,
+    responses={
+        HTTP_200_OK: {
+            'model': BatchUpdateTaskResponse,
+            'description': 'Existing tasks updated, the rest are listed in `not_found`.',
+        },
+        HTTP_400_BAD_REQUEST: {
+            'model': BaseErrorResponse,
+            'description': 'Invalid input data or a task occurs more than once.',
+        },
+    },
+)
+async def update_tasks_batch(
+        tasks: list[BatchUpdateTaskItem] = Body(..., max_length=BATCH_UPDATE_MAX_SIZE),
+        service: TaskService = Depends(),
+) -> BatchUpdateTaskResponse:
+    """Update many tasks in one transaction.
+
+    Each item holds the task ID and the fields to be changed, the sets of fields may differ between items.
+    """
+    updated_tasks, not_found = await service.batch_update(tasks)
+    return BatchUpdateTaskResponse(payload=updated_tasks, not_found=not_found)
 
 
 @router.get(
@@ -72,9 +204,16 @@ async def get_tasks(
     status_code=HTTP_200_OK,
     responses={
         HTTP_200_OK: {
-            'model': TaskResponse,
+            'model': SparseTaskResponse,
             'description': 'Task got successfully.',
         },
+        HTTP_304_NOT_MODIFIED: {
+            'description': 'The task matches `If-None-Match`.',
+        },
+        HTTP_400_BAD_REQUEST: {
+            'model': BaseErrorResponse,
+            'description': 'Unknown task fields.',
+        },
         HTTP_404_NOT_FOUND: {
             'model': BaseErrorResponse,
             'description': 'Task not found.',
@@ -83,11 +222,20 @@ async def get_tasks(
 )
 async def get_task(
         task_id: UUID4,
+        projection: TaskFieldsRequest = Depends(TaskFieldsRequest),
+        if_none_match: str | None = Header(None),
         service: TaskService = Depends(),
-) -> TaskResponse:
-    """Delete user."""
-    task: TaskDB = await service.get_by_id(task_id)
-    return TaskResponse(payload=task)
+) -> SparseTaskResponse:
+    """Get task with the fields listed in `fields` and the relationships listed in `include`.
+
+    The ETag is the version of the task, it is absent with `include`. If it matches `If-None-Match`,
+    304 is returned after reading the version alone.
+    """
+    task: SparseTaskDB | None
+    task, etag = await service.get_by_id(task_id, projection, if_none_match)
+    if task is None:
+        return not_modified(etag)
+    return TrustedJSONResponse(SparseTaskResponse(payload=task), headers={'ETag': etag} if etag else None)
 
 
 @router.patch(
@@ -106,18 +254,62 @@ async def get_task(
             'model': BaseErrorResponse,
             'description': 'Invalid input data.',
         },
+        HTTP_412_PRECONDITION_FAILED: {
+            'model': BaseErrorResponse,
+            'description': 'The task does not match `If-Match` or `expected_status`.',
+        },
     },
 )
 async def update_task(
         task_id: UUID4,
         task: UpdateTaskRequest,
+        response: Response,
+        if_match: str | None = Header(None),
+        expected_status: Status | None = Query(
+            None,
+            description='Status the task must have, e.g. to take a `todo` task into work only once',
+        ),
         service: TaskService = Depends(),
 ) -> TaskResponse:
-    """Update task."""
-    updated_task: TaskDB = await service.update(task_id, task)
+    """Update task.
+
+    With `If-Match` the task is updated only if its ETag is still listed, with `expected_status` only if it
+    still has that status, otherwise 412 is returned. Both are checked by the update itself, without locking.
+    """
+    updated_task: TaskDB = await service.update(task_id, task, if_match, expected_status)
+    response.headers['ETag'] = version_etag(updated_task.version)
     return TaskResponse(payload=updated_task)
 
 
+@router.patch(
+    path='/{task_id}/{membership}',
+    status_code=HTTP_200_OK,
+    responses={
+        HTTP_200_OK: {
+            'model': MembershipChangeResponse,
+            'description': 'Watchers or executors changed successfully.',
+        },
+        HTTP_404_NOT_FOUND: {
+            'model': BaseErrorResponse,
+            'description': 'Task or user not found.',
+        },
+    },
+)
+async def change_task_members(
+        task_id: UUID4,
+        membership: Membership,
+        change: MembershipChangeRequest,
+        service: TaskService = Depends(),
+) -> MembershipChangeResponse:
+    """Add and remove many watchers or executors of the task at once.
+
+    Users already present are not added again and absent ones are not removed, the response holds
+    the number of the users actually added and removed and the number of the users afterwards.
+    """
+    counts: MembershipCounts = await service.change_members(task_id, membership, change)
+    return MembershipChangeResponse(payload=counts)
+
+
 @router.delete(
     path='/{task_id}',
     status_code=HTTP_204_NO_CONTENT,
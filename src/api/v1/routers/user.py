@@ -1,17 +1,32 @@
 """The module contains base routes for working with user."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from pydantic import UUID4
-from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+)
 
+from src.api.v1.services.task import TaskService
 from src.api.v1.services.user import UserService
+from src.schemas.membership import MembershipChangeRequest, MembershipChangeResponse, MembershipCounts
+from src.schemas.pagination import PaginationRequest
 from src.schemas.response import BaseErrorResponse
+from src.schemas.tasks import MultiTaskResponse, TaskFieldsRequest
 from src.schemas.user import (
     CreateUserRequest,
     CreateUserResponse,
     UserDB,
 )
 from src.utils.constans import Tags
+from src.utils.enums import Membership, UserTaskRole
+from src.utils.etag import etag_matches, not_modified
+from src.utils.responses import TrustedJSONResponse
+from src.utils.service import pool_extra
 
 router = APIRouter(prefix='/user', tags=[Tags.USER_V1])
 
@@ -39,6 +54,74 @@ async def create_user(
     return CreateUserResponse(payload=created_user)
 
 
+@router.get(
+    path='/{user_id}/tasks',
+    status_code=HTTP_200_OK,
+    responses={
+        HTTP_200_OK: {
+            'model': MultiTaskResponse,
+            'description': 'Tasks of the user got successfully.',
+        },
+        HTTP_304_NOT_MODIFIED: {
+            'description': 'The page matches `If-None-Match`.',
+        },
+        HTTP_400_BAD_REQUEST: {
+            'model': BaseErrorResponse,
+            'description': 'Invalid pagination cursor or unknown task fields.',
+        },
+    },
+    openapi_extra=pool_extra(TaskService.get_user_tasks),
+)
+async def get_user_tasks(
+        user_id: UUID4,
+        role: UserTaskRole | None = Query(None, description='Role of the user in the tasks, any role by default'),
+        pagination: PaginationRequest = Depends(PaginationRequest),
+        projection: TaskFieldsRequest = Depends(TaskFieldsRequest),
+        if_none_match: str | None = Header(None),
+        service: TaskService = Depends(),
+) -> MultiTaskResponse:
+    """Get a page of the tasks the user authors, is assigned to, watches or executes.
+
+    Pages, `fields`, `include` and ETags work as for the list of all tasks.
+    """
+    tasks, next_cursor, etag = await service.get_user_tasks(user_id, role, pagination, projection)
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return TrustedJSONResponse(
+        MultiTaskResponse(payload=tasks, next_cursor=next_cursor),
+        headers={'ETag': etag} if etag else None,
+    )
+
+
+@router.patch(
+    path='/{user_id}/{membership}',
+    status_code=HTTP_200_OK,
+    responses={
+        HTTP_200_OK: {
+            'model': MembershipChangeResponse,
+            'description': 'Tasks of the user changed successfully.',
+        },
+        HTTP_404_NOT_FOUND: {
+            'model': BaseErrorResponse,
+            'description': 'User or task not found.',
+        },
+    },
+)
+async def change_user_tasks(
+        user_id: UUID4,
+        membership: Membership,
+        change: MembershipChangeRequest,
+        service: UserService = Depends(),
+) -> MembershipChangeResponse:
+    """Make the user a watcher or an executor of many tasks at once, or stop being one.
+
+    `add` and `remove` hold task IDs, the response holds the number of the tasks actually added and removed
+    and the number of the tasks the user watches or executes afterwards.
+    """
+    counts: MembershipCounts = await service.change_tasks(user_id, membership, change)
+    return MembershipChangeResponse(payload=counts)
+
+
 @router.delete(
     path='/{user_id}',
     status_code=HTTP_204_NO_CONTENT,
@@ -1,17 +1,72 @@
-from typing import TYPE_CHECKING
+import functools
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from fastapi import HTTPException
-from pydantic import UUID4
-from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
+from pydantic import UUID4, ValidationError
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_412_PRECONDITION_FAILED
 
-from src.repositories.task import NoTaskError, TaskError
-from src.schemas.tasks import CreateTaskRequest, FilterTaskRequest, TaskDB, UpdateTaskRequest
+from src.repositories.membership import MEMBERSHIP_REPOS, MembershipError
+from src.repositories.task import NoTaskError, TaskConflictError, TaskError
+from src.schemas.membership import MembershipChangeRequest, MembershipCounts
+from src.schemas.pagination import PaginationRequest
+from src.schemas.tasks import (
+    BatchUpdateTaskItem,
+    BulkTaskError,
+    CreateTaskRequest,
+    FilterTaskRequest,
+    SparseTaskDB,
+    TaskDB,
+    TaskFieldsRequest,
+    TaskStats,
+    UpdateTaskRequest,
+    UserTaskStats,
+)
+from src.utils.cache import task_cache
+from src.utils.consistency import consistency_state
+from src.utils.constans import (
+    BULK_CREATE_CHUNK_SIZE,
+    DUPLICATE_TASK_IDS_ERROR,
+    INVALID_CURSOR_ERROR,
+    TASK_FIELDS,
+    TASK_PRECONDITION_FAILED_ERROR,
+    TASK_RELATIONSHIPS,
+    UNKNOWN_TASK_FIELDS_ERROR,
+)
+from src.utils.enums import Membership, Pool, Status, TaskRole, UserTaskRole
+from src.utils.etag import digest_etag, etag_matches, if_match_versions, version_etag
+from src.utils.pagination import Cursor, InvalidCursorError, decode_cursor, encode_cursor
+from src.utils.repository import SqlAlchemyRepository
 from src.utils.service import BaseService, transaction_mode
 
 if TYPE_CHECKING:
     from src.models import TaskModel
 
 
+_TASK_USER_KEYS = ('author_id', 'assignee_id')
+
+
+class _Projection(NamedTuple):
+    """Task columns and relationships requested by the client."""
+
+    fields: frozenset[str] | None
+    include: frozenset[str]
+
+    @property
+    def returned(self) -> frozenset[str]:
+        """Fields of the response, the ID is always returned."""
+        return frozenset({'id'}) | (TASK_FIELDS if self.fields is None else self.fields) | self.include
+
+
+def _split_names(value: str) -> frozenset[str]:
+    return frozenset(name for name in map(str.strip, value.split(',')) if name)
+
+
+_ALL_FIELDS = _Projection(fields=None, include=frozenset())
+
+
 class TaskService(BaseService):
     _repo: str = 'task'
 
@@ -24,31 +79,310 @@ class TaskService(BaseService):
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail='Wrong data provided.')
         return created_task.to_schema()
 
-    @transaction_mode
-    async def get_by_id(self, task_id: UUID4) -> TaskDB | None:
-        """Get task by ID."""
-        task = await self.uow.task.get_by_filter_one_or_none(id=task_id)
+    @transaction_mode(pool=Pool.BULK)
+    async def bulk_create(self, items: Sequence[dict[str, Any]]) -> tuple[list[UUID4], list[BulkTaskError]]:
+        """Create tasks in chunks, the tasks that cannot be created are reported instead of failing the batch."""
+        rows, errors = self._validate_bulk_items(items)
+
+        user_ids = {row[key] for _, row in rows for key in _TASK_USER_KEYS if row[key]}
+        existing_user_ids = await self.uow.user.get_existing_ids(user_ids)
+        valid_rows = []
+        for index, row in rows:
+            if all(row[key] is None or row[key] in existing_user_ids for key in _TASK_USER_KEYS):
+                valid_rows.append((index, row))
+            else:
+                errors.append(BulkTaskError(index=index, details='User not found.'))
+
+        created: list[UUID4] = []
+        for start in range(0, len(valid_rows), BULK_CREATE_CHUNK_SIZE):
+            chunk = valid_rows[start:start + BULK_CREATE_CHUNK_SIZE]
+            created.extend(await self._insert_chunk(chunk, errors))
+
+        errors.sort(key=lambda error: error.index)
+        return created, errors
+
+    @staticmethod
+    def _validate_bulk_items(
+            items: Sequence[dict[str, Any]],
+    ) -> tuple[list[tuple[int, dict[str, Any]]], list[BulkTaskError]]:
+        """Validate the items of a bulk request and give every valid task its ID."""
+        rows, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                task = CreateTaskRequest.model_validate(item)
+            except ValidationError as e:
+                details = e.errors(include_url=False, include_context=False, include_input=False)
+                errors.append(BulkTaskError(index=index, details=details))
+            else:
+                rows.append((index, {'id': uuid.uuid4(), **task.model_dump()}))
+        return rows, errors
+
+    async def _insert_chunk(
+            self,
+            chunk: list[tuple[int, dict[str, Any]]],
+            errors: list[BulkTaskError],
+    ) -> list[UUID4]:
+        """Insert a chunk of tasks at once, falling back to one by one inserts to find the failing tasks."""
+        try:
+            async with self.uow.savepoint():
+                await self.uow.task.bulk_add(values=[row for _, row in chunk])
+        except SqlAlchemyRepository.IntegrityError:
+            pass
+        else:
+            return [row['id'] for _, row in chunk]
+
+        created = []
+        for index, row in chunk:
+            try:
+                async with self.uow.savepoint():
+                    await self.uow.task.add_one(**row)
+            except SqlAlchemyRepository.IntegrityError:
+                errors.append(BulkTaskError(index=index, details='Wrong data provided.'))
+            else:
+                created.append(row['id'])
+        return created
+
+    async def get_by_id(
+            self,
+            task_id: UUID4,
+            projection: TaskFieldsRequest,
+            if_none_match: str | None = None,
+    ) -> tuple[SparseTaskDB | None, str | None]:
+        """Get task by ID with the requested fields and its ETag.
+
+        Tasks without relationships are served from the cache if possible, the cache holds all their columns
+        and is filled from the primary only. Requests that must observe their writes bypass it.
+        With `If-None-Match` only the version of the task is read first, if the client holds the current one
+        None is returned instead of the task. Tasks with relationships have no ETag, since adding a watcher
+        or an executor does not change the version of the task.
+        """
+        requested = self._parse_projection(projection)
+        if requested.include:
+            # Relationships change without the task row being updated, so they are never cached.
+            return await self._get_by_id(task_id, requested), None
+
+        version = None
+        if if_none_match:
+            version = await self._get_version(task_id)
+            if etag_matches(if_none_match, etag := version_etag(version)):
+                return None, etag
+
+        # The entry may predate the writes of the client in another worker, whose invalidation is not seen here.
+        state = consistency_state.get()
+        task = task_cache.get(task_id) if state is None or state.required_lsn is None else None
+        if task is None or (version is not None and task.version != version):
+            marker = task_cache.read_marker()
+            task, on_replica = await self._get_cacheable(task_id)
+            if not on_replica:
+                task_cache.set(task_id, task, marker=marker)
+        etag = version_etag(task.version)
+        if requested.fields is None:
+            return task, etag
+        return SparseTaskDB.model_construct(**task.model_dump(include=requested.returned)), etag
+
+    @transaction_mode(read_only=True)
+    async def _get_version(self, task_id: UUID4) -> int:
+        version = await self.uow.task.get_version(task_id)
+        self.check_existence(obj=version, details='Task not found.')
+        return version
+
+    @transaction_mode(read_only=True)
+    async def _get_cacheable(self, task_id: UUID4) -> tuple[SparseTaskDB, bool]:
+        """Reads all the columns of the task and whether they come from the replica, which must not be cached.
+
+        A row of the lagging replica may be older than a write the cache was just invalidated for.
+        """
+        task = await self._get_by_id(task_id, _ALL_FIELDS)
+        return task, self.uow.on_replica
+
+    @transaction_mode(read_only=True)
+    async def _get_by_id(self, task_id: UUID4, requested: _Projection) -> SparseTaskDB:
+        task = await self.uow.task.get_by_id(task_id, requested.fields, requested.include)
         self.check_existence(obj=task, details='Task not found.')
-        return task.to_schema()
+        return task.to_sparse_schema(requested.returned)
 
-    @transaction_mode
-    async def get_all(self, task_filter: FilterTaskRequest) -> list[TaskDB]:
-        """Get tasks with filtering."""
-        tasks: list[TaskModel] = await self.uow.task.get_all(task_filter)
-        return [task.to_schema() for task in tasks]
+    @transaction_mode(read_only=True, pool=Pool.REPORTING)
+    async def get_all(
+            self,
+            task_filter: FilterTaskRequest,
+            pagination: PaginationRequest,
+            projection: TaskFieldsRequest,
+    ) -> tuple[list[SparseTaskDB], str | None, str | None]:
+        """Get a page of tasks with filtering, the cursor of the next page and the ETag of the page.
+
+        The ETag is derived from the IDs and versions of the tasks on the page,
+        pages with relationships have none.
+        """
+        requested = self._parse_projection(projection)
+        after = self._decode_cursor(pagination.after)
+        tasks: list[TaskModel] = await self.uow.task.get_all(
+            task_filter,
+            pagination.limit,
+            after,
+            requested.fields,
+            requested.include,
+        )
+        return self._page(tasks, pagination.limit, requested)
+
+    @transaction_mode(read_only=True, pool=Pool.REPORTING)
+    async def get_user_tasks(
+            self,
+            user_id: UUID4,
+            role: UserTaskRole | None,
+            pagination: PaginationRequest,
+            projection: TaskFieldsRequest,
+    ) -> tuple[list[SparseTaskDB], str | None, str | None]:
+        """Get a page of the tasks the user has the role in, with the cursor of the next page and the ETag."""
+        requested = self._parse_projection(projection)
+        after = self._decode_cursor(pagination.after)
+        tasks: list[TaskModel] = await self.uow.task.get_by_user(
+            user_id,
+            role,
+            pagination.limit,
+            after,
+            requested.fields,
+            requested.include,
+        )
+        return self._page(tasks, pagination.limit, requested)
+
+    @staticmethod
+    def _page(
+            tasks: list['TaskModel'],
+            limit: int,
+            requested: _Projection,
+    ) -> tuple[list[SparseTaskDB], str | None, str | None]:
+        """Cut the extra task off the page, encode the cursor of the next page and derive the ETag of the page."""
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+        etag = None
+        if not requested.include:
+            etag = digest_etag([*(f'{task.id}:{task.version}' for task in tasks), next_cursor or ''])
+        return [task.to_sparse_schema(requested.returned) for task in tasks], next_cursor, etag
+
+    def stream_all(
+            self,
+            task_filter: FilterTaskRequest,
+            projection: TaskFieldsRequest,
+            after: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream all tasks with filtering as NDJSON chunks.
+
+        The projection and the cursor are checked before the stream starts,
+        so that bad ones are reported with a proper status.
+        """
+        return self._stream_all(task_filter, self._parse_projection(projection), self._decode_cursor(after))
+
+    @transaction_mode(read_only=True, pool=Pool.REPORTING)
+    async def _stream_all(
+            self,
+            task_filter: FilterTaskRequest,
+            requested: _Projection,
+            after: Cursor | None,
+    ) -> AsyncIterator[str]:
+        returned = requested.returned
+        async for tasks in self.uow.task.stream_all(task_filter, after, requested.fields, requested.include):
+            yield ''.join(f'{task.to_sparse_schema(returned).model_dump_json(exclude_unset=True)}\n' for task in tasks)
+
+    @transaction_mode(read_only=True, pool=Pool.REPORTING)
+    async def get_stats(self) -> TaskStats:
+        """Get the number of tasks per status, per author and per assignee from the task counters."""
+        by_status = dict.fromkeys(Status, 0)
+        by_user: dict[TaskRole, defaultdict[UUID4, dict[Status, int]]] = {role: defaultdict(dict) for role in TaskRole}
+        for status, role, user_id, count in await self.uow.task.get_counters():
+            by_user[role][user_id][status] = count
+            if role is TaskRole.AUTHOR:
+                # Every task has exactly one author, so the author counters add up to all tasks.
+                by_status[status] += count
+        author_stats, assignee_stats = (
+            [UserTaskStats(user_id=user_id, counts=counts) for user_id, counts in by_user[role].items()]
+            for role in (TaskRole.AUTHOR, TaskRole.ASSIGNEE)
+        )
+        return TaskStats(by_status=by_status, by_author=author_stats, by_assignee=assignee_stats)
 
     @transaction_mode
-    async def update(self, task_id: UUID4, update_data: UpdateTaskRequest) -> TaskDB:
-        """Update task."""
+    async def update(
+            self,
+            task_id: UUID4,
+            update_data: UpdateTaskRequest,
+            if_match: str | None = None,
+            expected_status: Status | None = None,
+    ) -> TaskDB:
+        """Update task, only if it still has a version listed in `If-Match` and the expected status, when given."""
+        expected_versions = if_match_versions(if_match) if if_match else None
         try:
-            updated_task = await self.uow.task.update(task_id, update_data)
+            updated_task = await self.uow.task.update(task_id, update_data, expected_versions, expected_status)
         except NoTaskError:
             raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail='Task not found.')
+        except TaskConflictError:
+            raise HTTPException(status_code=HTTP_412_PRECONDITION_FAILED, detail=TASK_PRECONDITION_FAILED_ERROR)
         except TaskError:
             raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail='Wrong data provided.')
+        self.uow.after_commit(functools.partial(task_cache.invalidate, task_id))
         return updated_task.to_schema()
 
+    @transaction_mode
+    async def batch_update(self, items: Sequence[BatchUpdateTaskItem]) -> tuple[list[TaskDB], list[UUID4]]:
+        """Update many tasks at once, returns the updated tasks and IDs of the tasks that do not exist."""
+        task_ids = [item.id for item in items]
+        if len(set(task_ids)) != len(task_ids):
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=DUPLICATE_TASK_IDS_ERROR)
+        try:
+            updated_tasks = {task.id: task for task in await self.uow.task.batch_update(items)}
+        except TaskError:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail='Wrong data provided.')
+
+        for task_id in updated_tasks:
+            self.uow.after_commit(functools.partial(task_cache.invalidate, task_id))
+        payload = [updated_tasks[task_id].to_schema() for task_id in task_ids if task_id in updated_tasks]
+        not_found = [task_id for task_id in task_ids if task_id not in updated_tasks]
+        return payload, not_found
+
+    @transaction_mode
+    async def change_members(
+            self,
+            task_id: UUID4,
+            membership: Membership,
+            change: MembershipChangeRequest,
+    ) -> MembershipCounts:
+        """Add and remove watchers or executors of the task, returns the counts without loading the users.
+
+        The version of the task is not changed, memberships are not part of its ETag or cache entry.
+        """
+        repo = getattr(self.uow, MEMBERSHIP_REPOS[membership])
+        removed = await repo.remove_users(task_id, change.remove)
+        try:
+            added = await repo.add_users(task_id, change.add)
+        except MembershipError:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail='Task or user not found.')
+        return MembershipCounts(added=added, removed=removed, total=await repo.count_users(task_id))
+
     @transaction_mode
     async def delete(self, task_id: UUID4) -> None:
         """Delete task by ID."""
         await self.uow.task.delete_by_filter(id=task_id)
+        self.uow.after_commit(functools.partial(task_cache.invalidate, task_id))
+
+    @staticmethod
+    def _parse_projection(projection: TaskFieldsRequest) -> _Projection:
+        """Parse the comma-separated task fields and relationships received from the client."""
+        fields = _split_names(projection.fields) if projection.fields is not None else None
+        include = _split_names(projection.include) if projection.include is not None else frozenset()
+        unknown = (fields or frozenset()) - TASK_FIELDS | include - TASK_RELATIONSHIPS
+        if unknown:
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail=UNKNOWN_TASK_FIELDS_ERROR.format(', '.join(sorted(unknown))),
+            )
+        return _Projection(fields=fields, include=include)
+
+    @staticmethod
+    def _decode_cursor(cursor: str | None) -> Cursor | None:
+        """Decode the pagination cursor received from the client."""
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR_ERROR)
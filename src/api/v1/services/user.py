@@ -2,10 +2,14 @@ from typing import TYPE_CHECKING
 
 from fastapi import HTTPException
 from pydantic import UUID4
-from starlette.status import HTTP_400_BAD_REQUEST
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
+from src.repositories.membership import MEMBERSHIP_REPOS, MembershipError
 from src.repositories.user import CreateUserError
+from src.schemas.membership import MembershipChangeRequest, MembershipCounts
 from src.schemas.user import CreateUserRequest, UserDB
+from src.utils.cache import task_cache
+from src.utils.enums import Membership
 from src.utils.service import BaseService, transaction_mode
 
 if TYPE_CHECKING:
@@ -27,7 +31,25 @@ class UserService(BaseService):
             )
         return created_user.to_schema()
 
+    @transaction_mode
+    async def change_tasks(
+            self,
+            user_id: UUID4,
+            membership: Membership,
+            change: MembershipChangeRequest,
+    ) -> MembershipCounts:
+        """Make the user a watcher or an executor of some tasks and not of others, returns the counts."""
+        repo = getattr(self.uow, MEMBERSHIP_REPOS[membership])
+        removed = await repo.remove_tasks(user_id, change.remove)
+        try:
+            added = await repo.add_tasks(user_id, change.add)
+        except MembershipError:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail='User or task not found.')
+        return MembershipCounts(added=added, removed=removed, total=await repo.count_tasks(user_id))
+
     @transaction_mode
     async def delete_user(self, user_id: UUID4) -> None:
         """Delete user by ID."""
         await self.uow.user.delete_by_filter(id=user_id)
+        # Tasks of the user are changed by the cascades, which cannot be tracked by ID.
+        self.uow.after_commit(task_cache.clear)
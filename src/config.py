@@ -16,5 +16,61 @@ class Settings:
 
     DB_URL: str = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
+    # Optional streaming replica of the same database, used for read-only transactions.
+    DB_REPLICA_HOST: str | None = os.environ.get('DB_REPLICA_HOST')
+    DB_REPLICA_PORT: int = os.environ.get('DB_REPLICA_PORT', DB_PORT)
+    DB_REPLICA_URL: str | None = (
+        f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}'
+        if DB_REPLICA_HOST else None
+    )
+    # Connections of the replica pool kept open and opened above them, shared by all the read-only transactions.
+    DB_REPLICA_POOL_SIZE: int = int(os.environ.get('DB_REPLICA_POOL_SIZE', 50))
+    DB_REPLICA_MAX_OVERFLOW: int = int(os.environ.get('DB_REPLICA_MAX_OVERFLOW', 100))
+
+    # `true` when connections go through PgBouncer in transaction mode, `false` for direct PostgreSQL connections.
+    DB_PGBOUNCER: bool = os.environ.get('DB_PGBOUNCER', 'true').lower() == 'true'
+    DB_STATEMENT_CACHE_SIZE: int = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 500))
+
+    # Connection pools of the primary by workload: connections kept open, connections opened above them
+    # and the statement timeout in milliseconds (0 for none). Single tasks and writes use the interactive pool,
+    # lists and statistics the reporting one, bulk requests the bulk one.
+    DB_INTERACTIVE_POOL_SIZE: int = int(os.environ.get('DB_INTERACTIVE_POOL_SIZE', 30))
+    DB_INTERACTIVE_MAX_OVERFLOW: int = int(os.environ.get('DB_INTERACTIVE_MAX_OVERFLOW', 80))
+    DB_INTERACTIVE_STATEMENT_TIMEOUT: int = int(os.environ.get('DB_INTERACTIVE_STATEMENT_TIMEOUT', 5_000))
+    DB_REPORTING_POOL_SIZE: int = int(os.environ.get('DB_REPORTING_POOL_SIZE', 10))
+    DB_REPORTING_MAX_OVERFLOW: int = int(os.environ.get('DB_REPORTING_MAX_OVERFLOW', 30))
+    DB_REPORTING_STATEMENT_TIMEOUT: int = int(os.environ.get('DB_REPORTING_STATEMENT_TIMEOUT', 60_000))
+    DB_BULK_POOL_SIZE: int = int(os.environ.get('DB_BULK_POOL_SIZE', 5))
+    DB_BULK_MAX_OVERFLOW: int = int(os.environ.get('DB_BULK_MAX_OVERFLOW', 5))
+    DB_BULK_STATEMENT_TIMEOUT: int = int(os.environ.get('DB_BULK_STATEMENT_TIMEOUT', 300_000))
+
+    # Size and lifetime (in seconds) of the in-process cache of single tasks, the size of 0 disables the cache.
+    TASK_CACHE_SIZE: int = int(os.environ.get('TASK_CACHE_SIZE', 10_000))
+    TASK_CACHE_TTL: float = float(os.environ.get('TASK_CACHE_TTL', 30))
+
+    # A statement run more times than this in one request is logged as a likely N+1 query.
+    SQL_REPEAT_THRESHOLD: int = int(os.environ.get('SQL_REPEAT_THRESHOLD', 10))
+
+    # Requests processed at once and waiting for admission, by lane. Each lane stays below the pool it uses,
+    # so the admitted requests never wait for a connection: reads and writes of single tasks share
+    # the interactive pool (110 connections, reads 80 + writes 20 leave some for the health check),
+    # lists, streams and statistics use the reporting pool (40) and bulk requests the bulk pool (10).
+    # With a replica the reads and the reporting reads take its pool instead (150, 80 + 30), and the writes
+    # and bulk requests take a second interactive connection for the WAL position (20 + 20 + 8).
+    # The middleware logs a warning at startup when the limits exceed the pools. The timeout is in seconds.
+    ADMISSION_READ_LIMIT: int = int(os.environ.get('ADMISSION_READ_LIMIT', 80))
+    ADMISSION_READ_QUEUE: int = int(os.environ.get('ADMISSION_READ_QUEUE', 80))
+    ADMISSION_WRITE_LIMIT: int = int(os.environ.get('ADMISSION_WRITE_LIMIT', 20))
+    ADMISSION_WRITE_QUEUE: int = int(os.environ.get('ADMISSION_WRITE_QUEUE', 20))
+    ADMISSION_REPORTING_LIMIT: int = int(os.environ.get('ADMISSION_REPORTING_LIMIT', 30))
+    ADMISSION_REPORTING_QUEUE: int = int(os.environ.get('ADMISSION_REPORTING_QUEUE', 30))
+    ADMISSION_BULK_LIMIT: int = int(os.environ.get('ADMISSION_BULK_LIMIT', 8))
+    ADMISSION_BULK_QUEUE: int = int(os.environ.get('ADMISSION_BULK_QUEUE', 8))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 1))
+    # Seconds a refused client is asked to wait before retrying.
+    ADMISSION_RETRY_AFTER: int = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+    # `false` turns the admission control off, e.g. to measure the service under overload without it.
+    ADMISSION_ENABLED: bool = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+
 
 settings = Settings()
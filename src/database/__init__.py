@@ -1,13 +1,25 @@
 __all__ = [
     'async_engine',
+    'async_read_only_session_maker',
     'async_session_maker',
+    'engines',
     'get_async_connection',
     'get_async_session',
+    'read_only_session_makers',
+    'replica_engine',
+    'replica_session_maker',
+    'session_makers',
 ]
 
 from src.database.db import (
     async_engine,
+    async_read_only_session_maker,
     async_session_maker,
+    engines,
     get_async_connection,
     get_async_session,
+    read_only_session_makers,
+    replica_engine,
+    replica_session_maker,
+    session_makers,
 )
@@ -1,28 +1,140 @@
 from collections.abc import AsyncGenerator
+from typing import Any
 from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from src.config import settings
+from src.utils.enums import Pool
+from src.utils.instrumentation import InstrumentedPool, instrument_engine
 
-async_engine = create_async_engine(
-    url=settings.DB_URL,
-    echo=False,
-    future=True,
-    pool_size=50,
-    max_overflow=100,
-    connect_args={
-        'prepared_statement_name_func': lambda:  f'__asyncpg_{uuid4()}__',
-    },
-)
-
-async_session_maker = async_sessionmaker(
-    bind=async_engine,
+
+def build_connect_args(*, pgbouncer: bool, statement_cache_size: int) -> dict[str, Any]:
+    """Returns asyncpg connection arguments for the way the database is reached.
+
+    PgBouncer in transaction mode may run consecutive statements on different server connections,
+    so a statement prepared on one of them cannot be reused: every statement gets a unique name and
+    nothing is cached. With direct connections statements are prepared once per connection and reused.
+    """
+    if pgbouncer:
+        return {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid4()}__',
+        }
+    return {
+        'prepared_statement_cache_size': statement_cache_size,
+    }
+
+
+def limit_statement_time(engine: AsyncEngine, statement_timeout: int) -> None:
+    """Cancels the statements of the engine running longer than `statement_timeout` milliseconds.
+
+    The timeout is set with `SET LOCAL` when a transaction begins, so it ends with the transaction
+    and works behind PgBouncer in transaction mode as well, which does not pass startup parameters on.
+    It is sent through the DBAPI cursor, so that it is not counted among the statements of the request.
+    """
+    statement = f'SET LOCAL statement_timeout = {statement_timeout:d}'
+
+    def _set_timeout(connection: Connection) -> None:
+        connection.connection.cursor().execute(statement)
+
+    event.listen(engine.sync_engine, 'begin', _set_timeout)
+
+
+def create_engine(url: str, name: str, pool_size: int, max_overflow: int, statement_timeout: int = 0) -> AsyncEngine:
+    """Returns an instrumented engine, its pool is named `name` in the logs and the metrics.
+
+    The statements are cancelled after `statement_timeout` milliseconds, 0 for no limit.
+    """
+    engine = create_async_engine(
+        url=url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args=build_connect_args(
+            pgbouncer=settings.DB_PGBOUNCER,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        ),
+    )
+    if statement_timeout:
+        limit_statement_time(engine, statement_timeout)
+    instrument_engine(engine)
+    return engine
+
+
+# Every workload has its own pool of the primary, so a long list scan or a bulk insert
+# cannot take the connections of the short interactive requests.
+engines: dict[Pool, AsyncEngine] = {
+    Pool.INTERACTIVE: create_engine(
+        settings.DB_URL,
+        Pool.INTERACTIVE.value,
+        settings.DB_INTERACTIVE_POOL_SIZE,
+        settings.DB_INTERACTIVE_MAX_OVERFLOW,
+        settings.DB_INTERACTIVE_STATEMENT_TIMEOUT,
+    ),
+    Pool.REPORTING: create_engine(
+        settings.DB_URL,
+        Pool.REPORTING.value,
+        settings.DB_REPORTING_POOL_SIZE,
+        settings.DB_REPORTING_MAX_OVERFLOW,
+        settings.DB_REPORTING_STATEMENT_TIMEOUT,
+    ),
+    Pool.BULK: create_engine(
+        settings.DB_URL,
+        Pool.BULK.value,
+        settings.DB_BULK_POOL_SIZE,
+        settings.DB_BULK_MAX_OVERFLOW,
+        settings.DB_BULK_STATEMENT_TIMEOUT,
+    ),
+}
+
+async_engine = engines[Pool.INTERACTIVE]
+
+session_makers = {
+    pool: async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+    for pool, engine in engines.items()
+}
+
+# Transactions of these sessions start with `BEGIN READ ONLY`, so a stray write fails instead of being committed.
+read_only_session_makers = {
+    pool: async_sessionmaker(
+        bind=engine.execution_options(postgresql_readonly=True),
+        class_=AsyncSession,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+    for pool, engine in engines.items()
+}
+
+async_session_maker = session_makers[Pool.INTERACTIVE]
+async_read_only_session_maker = read_only_session_makers[Pool.INTERACTIVE]
+
+replica_engine = create_engine(
+    settings.DB_REPLICA_URL,
+    'replica',
+    settings.DB_REPLICA_POOL_SIZE,
+    settings.DB_REPLICA_MAX_OVERFLOW,
+) if settings.DB_REPLICA_URL else None
+
+replica_session_maker = async_sessionmaker(
+    bind=replica_engine,
     class_=AsyncSession,
     autoflush=False,
     autocommit=False,
     expire_on_commit=False,
-)
+) if replica_engine else None
 
 
 async def get_async_connection() -> AsyncGenerator[AsyncConnection, None]:
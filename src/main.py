@@ -5,7 +5,10 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import ORJSONResponse
 
 from src.api import router
+from src.config import settings
 from src.metadata import DESCRIPTION, TAG_METADATA, TITLE, VERSION
+from src.middlewares import AdmissionMiddleware, ConsistencyMiddleware, InstrumentationMiddleware, MetricsMiddleware
+from src.middlewares.admission import route_pools
 from src.schemas.response import BaseErrorResponse
 
 
@@ -33,6 +36,16 @@ def create_fast_api_app() -> FastAPI:
         )
 
     fastapi_app.include_router(router, prefix='/api')
+    fastapi_app.add_middleware(ConsistencyMiddleware)
+    fastapi_app.add_middleware(InstrumentationMiddleware)
+    if settings.ADMISSION_ENABLED:
+        fastapi_app.add_middleware(
+            AdmissionMiddleware,
+            # The routes declare the pools of the service methods they call.
+            route_pools=route_pools(fastapi_app.routes),
+            exempt_paths=('/api/healthz/', '/api/metrics/'),
+        )
+    fastapi_app.add_middleware(MetricsMiddleware)
     return fastapi_app
 
 
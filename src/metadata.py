@@ -5,6 +5,10 @@ TAG_METADATA = [
         'name': Tags.HEALTHZ,
         'description': 'Standard health check.',
     },
+    {
+        'name': Tags.MONITORING,
+        'description': 'Runtime statistics of the service.',
+    },
     {
         'name': Tags.USER_V1,
         'description': 'Operation with user v1.',
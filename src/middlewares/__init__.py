@@ -0,0 +1,11 @@
+__all__ = [
+    'AdmissionMiddleware',
+    'ConsistencyMiddleware',
+    'InstrumentationMiddleware',
+    'MetricsMiddleware',
+]
+
+from src.middlewares.admission import AdmissionMiddleware
+from src.middlewares.consistency import ConsistencyMiddleware
+from src.middlewares.instrumentation import InstrumentationMiddleware
+from src.middlewares.metrics import MetricsMiddleware
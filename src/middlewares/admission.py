@@ -0,0 +1,141 @@
+"""The module contains the middleware that sheds the load the database pools cannot take."""
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+from fastapi.responses import ORJSONResponse
+from loguru import logger
+from starlette.routing import BaseRoute, compile_path
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.schemas.response import BaseErrorResponse
+from src.utils.admission import AdmissionQueue
+from src.utils.enums import Pool
+from src.utils.metrics import REQUESTS_REJECTED
+from src.utils.service import POOL_EXTRA
+
+if TYPE_CHECKING:
+    import re
+
+READ_LANE = 'read'
+WRITE_LANE = 'write'
+REPORTING_LANE = Pool.REPORTING.value
+BULK_LANE = Pool.BULK.value
+
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+
+OVERLOADED = 'Service is overloaded, retry later'
+
+REPLICA = 'replica'
+
+
+def default_lanes() -> dict[str, AdmissionQueue]:
+    return {
+        READ_LANE: AdmissionQueue(settings.ADMISSION_READ_LIMIT, settings.ADMISSION_READ_QUEUE),
+        WRITE_LANE: AdmissionQueue(settings.ADMISSION_WRITE_LIMIT, settings.ADMISSION_WRITE_QUEUE),
+        REPORTING_LANE: AdmissionQueue(settings.ADMISSION_REPORTING_LIMIT, settings.ADMISSION_REPORTING_QUEUE),
+        BULK_LANE: AdmissionQueue(settings.ADMISSION_BULK_LIMIT, settings.ADMISSION_BULK_QUEUE),
+    }
+
+
+def oversubscribed_pools(lanes: Mapping[str, AdmissionQueue], *, replica: bool) -> dict[str, tuple[int, int]]:
+    """Returns the pools the admitted requests can exhaust, with the connections they may take and the pool has.
+
+    Read-only transactions use the replica when there is one, and then every write takes
+    another interactive connection after the commit to read the WAL position of the primary.
+    An interactive connection is kept for the exempt paths, e.g. the health check.
+    """
+    capacity = {
+        Pool.INTERACTIVE.value: settings.DB_INTERACTIVE_POOL_SIZE + settings.DB_INTERACTIVE_MAX_OVERFLOW - 1,
+        Pool.REPORTING.value: settings.DB_REPORTING_POOL_SIZE + settings.DB_REPORTING_MAX_OVERFLOW,
+        Pool.BULK.value: settings.DB_BULK_POOL_SIZE + settings.DB_BULK_MAX_OVERFLOW,
+        REPLICA: settings.DB_REPLICA_POOL_SIZE + settings.DB_REPLICA_MAX_OVERFLOW,
+    }
+    demand: Counter[str] = Counter()
+    demand[REPLICA if replica else Pool.INTERACTIVE.value] += lanes[READ_LANE].limit
+    demand[Pool.INTERACTIVE.value] += lanes[WRITE_LANE].limit
+    demand[REPLICA if replica else Pool.REPORTING.value] += lanes[REPORTING_LANE].limit
+    demand[Pool.BULK.value] += lanes[BULK_LANE].limit
+    if replica:
+        demand[Pool.INTERACTIVE.value] += lanes[WRITE_LANE].limit + lanes[BULK_LANE].limit
+    return {pool: (needed, capacity[pool]) for pool, needed in demand.items() if needed > capacity[pool]}
+
+
+def route_pools(routes: Iterable[BaseRoute]) -> dict[tuple[str, str], Pool]:
+    """Returns the pools the routes declare with `pool_extra`, by the method and the path template."""
+    pools = {}
+    for route in routes:
+        extra = getattr(route, 'openapi_extra', None) or {}
+        if POOL_EXTRA in extra:
+            for method in route.methods:
+                pools[method, route.path] = Pool(extra[POOL_EXTRA])
+    return pools
+
+
+class AdmissionMiddleware:
+    """Admits the requests through bounded queues, one per workload, and refuses the rest with 503.
+
+    The lane of a request is the pool its route uses: routes of `route_pools` go to the lane of their pool,
+    the other ones to the read or the write lane of the interactive pool by the method. A refused request
+    gets `Retry-After` at once instead of waiting for a connection. The exempt paths, e.g. the health check,
+    are never queued, and as the limits are below the pool sizes a connection is left for them.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            lanes: Mapping[str, AdmissionQueue] | None = None,
+            route_pools: Mapping[tuple[str, str], Pool] | None = None,
+            queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+            retry_after: int = settings.ADMISSION_RETRY_AFTER,
+            exempt_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        if lanes is None:
+            lanes = default_lanes()
+            oversubscribed = oversubscribed_pools(lanes, replica=settings.DB_REPLICA_URL is not None)
+            for pool, (needed, available) in oversubscribed.items():
+                logger.warning(f'Admission limits let {needed} requests wait for {available} {pool} connections')
+        self.lanes = lanes
+        # The templates are compiled as the router does, e.g. `/tasks/{task_id}` matches `/tasks/<any ID>`.
+        self.route_lanes: list[tuple[str, re.Pattern[str], str]] = [
+            (method, compile_path(path)[0], pool.value)
+            for (method, path), pool in (route_pools or {}).items()
+            if pool is not Pool.INTERACTIVE
+        ]
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        lane = self._lane(scope)
+        queue = self.lanes[lane]
+        if not await queue.acquire(self.queue_timeout):
+            REQUESTS_REJECTED.inc(lane)
+            await self._overloaded()(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            queue.release()
+
+    def _lane(self, scope: Scope) -> str:
+        method, path = scope['method'], scope['path']
+        for route_method, pattern, lane in self.route_lanes:
+            if route_method == method and pattern.match(path):
+                return lane
+        return WRITE_LANE if method in WRITE_METHODS else READ_LANE
+
+    def _overloaded(self) -> ORJSONResponse:
+        return ORJSONResponse(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            content=BaseErrorResponse(status=HTTP_503_SERVICE_UNAVAILABLE, details=OVERLOADED).model_dump(),
+            headers={'Retry-After': str(self.retry_after)},
+        )
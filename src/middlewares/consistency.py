@@ -0,0 +1,35 @@
+"""The module contains the middleware that carries the replica consistency token between requests."""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.consistency import ConsistencyState, consistency_state, format_lsn, parse_lsn
+from src.utils.constans import DB_LSN_HEADER
+
+
+class ConsistencyMiddleware:
+    """Reads the LSN of the previous writes of the client and returns the LSN of the writes of this request.
+
+    It is a plain ASGI middleware, so that the state set here is visible to the endpoint and to streamed responses.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        state = ConsistencyState(client_lsn=parse_lsn(Headers(scope=scope).get(DB_LSN_HEADER)))
+
+        async def send_with_lsn(message: Message) -> None:
+            if message['type'] == 'http.response.start' and state.written_lsn is not None:
+                MutableHeaders(scope=message).append(DB_LSN_HEADER, format_lsn(state.required_lsn))
+            await send(message)
+
+        token = consistency_state.set(state)
+        try:
+            await self.app(scope, receive, send_with_lsn)
+        finally:
+            consistency_state.reset(token)
@@ -0,0 +1,41 @@
+"""The module contains the middleware that reports the database work of each request."""
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.utils.constans import SERVER_TIMING_HEADER
+from src.utils.instrumentation import RequestTimings, request_timings
+
+
+class InstrumentationMiddleware:
+    """Returns the database statistics of the request in the `Server-Timing` header.
+
+    A statement that runs more times than the threshold in one request is logged as a likely N+1 query.
+    For a streamed response the header carries the work done before the response started.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = settings.SQL_REPEAT_THRESHOLD) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+
+        async def send_with_timings(message: Message) -> None:
+            if message['type'] == 'http.response.start' and timings.queries:
+                MutableHeaders(scope=message).append(SERVER_TIMING_HEADER, timings.server_timing())
+            await send(message)
+
+        token = request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            request_timings.reset(token)
+            for statement, count in timings.repeated_statements(self.repeat_threshold):
+                logger.warning(f'{scope["method"]} {scope["path"]} ran the same statement {count} times: {statement}')
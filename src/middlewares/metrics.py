@@ -0,0 +1,48 @@
+"""The module contains the middleware that measures the latency of the requests."""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class MetricsMiddleware:
+    """Counts the requests in flight and observes their duration by method, route template and status.
+
+    The route template, not the path, keeps the number of series bounded, the paths matching no route
+    share one series.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = '500'
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = str(message['status'])
+            await send(message)
+
+        started = perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope shared with the middlewares.
+            route = scope.get('route')
+            REQUEST_DURATION.observe(
+                perf_counter() - started,
+                scope['method'],
+                getattr(route, 'path', UNMATCHED_ROUTE),
+                status,
+            )
@@ -1,6 +1,7 @@
 __all__ = [
     'BaseModel',
     'Executors',
+    'TaskCounterModel',
     'TaskModel',
     'UserModel',
     'Watcher',
@@ -9,5 +10,6 @@ __all__ = [
 from src.models.base import BaseModel
 from src.models.executors import Executors
 from src.models.task import TaskModel
+from src.models.task_counter import TaskCounterModel
 from src.models.user import UserModel
 from src.models.watchers import Watcher
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import BaseModel
@@ -8,6 +8,8 @@ from src.models import BaseModel
 
 class Executors(BaseModel):
     __tablename__ = 'executors'
+    # Lookups by user, as on `watchers`.
+    __table_args__ = (Index('executors_user_id_task_id_index', 'user_id', 'task_id'),)
 
     task_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey('tasks.id', ondelete='CASCADE', onupdate='CASCADE'),
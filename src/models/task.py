@@ -1,12 +1,14 @@
 import uuid
+from collections.abc import Iterable
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import Enum, ForeignKey, Index, String, text
+from sqlalchemy import DDL, BigInteger, Enum, ForeignKey, Index, String, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models import BaseModel
-from src.schemas.tasks import TaskDB
+from src.schemas.tasks import SparseTaskDB, TaskDB
+from src.utils.constans import TASK_RELATIONSHIPS
 from src.utils.enums import Status
 
 if TYPE_CHECKING:
@@ -16,10 +18,17 @@ if TYPE_CHECKING:
 class TaskModel(BaseModel):
     __tablename__ = 'tasks'
     __table_args__ = (
-        Index('title_index', 'title'),
+        Index('title_trgm_index', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('created_at_id_index', 'created_at', 'id'),
+        # Serve the foreign keys and the pages of the tasks of a user.
+        Index('author_id_created_at_id_index', 'author_id', 'created_at', 'id'),
+        Index('assignee_id_created_at_id_index', 'assignee_id', 'created_at', 'id'),
+        # Serve the pages filtered by status, the equality columns go before the keyset ones.
+        Index('status_created_at_id_index', 'status', 'created_at', 'id'),
+        Index('author_id_status_created_at_id_index', 'author_id', 'status', 'created_at', 'id'),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4, unique=True)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(nullable=True)
     status: Mapped[Status] = mapped_column(Enum(Status, name='task_status'), nullable=False)
@@ -32,6 +41,7 @@ class TaskModel(BaseModel):
         ForeignKey('users.id', ondelete='CASCADE', onupdate='CASCADE'),
         nullable=True,
     )
+    version: Mapped[int] = mapped_column(BigInteger, server_default=text('1'), nullable=False)
 
     watchers: Mapped[list['UserModel']] = relationship(
         back_populates='watching_tasks',
@@ -43,4 +53,39 @@ class TaskModel(BaseModel):
     )
 
     def to_schema(self) -> TaskDB:
-        return TaskDB(**self.__dict__)
+        """Converts the loaded attributes without validation, rows read from the database are trusted."""
+        return TaskDB.model_construct(**self._dump(self.__dict__.keys() & TaskDB.model_fields.keys()))
+
+    def to_sparse_schema(self, fields: Iterable[str]) -> SparseTaskDB:
+        """Converts only the given fields without validation, they must be loaded, relationships included."""
+        return SparseTaskDB.model_construct(**self._dump(fields))
+
+    def _dump(self, fields: Iterable[str]) -> dict[str, Any]:
+        data = {}
+        for field in fields:
+            value = self.__dict__[field]
+            data[field] = [user.to_schema() for user in value] if field in TASK_RELATIONSHIPS else value
+        return data
+
+
+# `title_trgm_index` relies on the trigram operator class.
+event.listen(TaskModel.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+
+# The version is bumped by the database, so that every write changes it, batch updates and cascades included.
+# Updates that change nothing keep the version, so they do not invalidate the ETags held by the clients.
+BUMP_TASK_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_task_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$"""
+
+BUMP_TASK_VERSION_TRIGGER = (
+    'CREATE TRIGGER bump_task_version BEFORE UPDATE ON tasks '
+    'FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) EXECUTE FUNCTION bump_task_version()'
+)
+
+event.listen(TaskModel.__table__, 'after_create', DDL(BUMP_TASK_VERSION_FUNCTION))
+event.listen(TaskModel.__table__, 'after_create', DDL(BUMP_TASK_VERSION_TRIGGER))
@@ -0,0 +1,78 @@
+import uuid
+
+from sqlalchemy import DDL, BigInteger, Enum, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import BaseModel
+from src.models.task import TaskModel
+from src.utils.enums import Status, TaskRole
+
+
+class TaskCounterModel(BaseModel):
+    """Number of tasks in each status per author and per assignee.
+
+    The rows are maintained by the triggers on `tasks` in the transaction that changes the tasks,
+    so any write is counted, COPY and the cascades from `users` included.
+    """
+
+    __tablename__ = 'task_counters'
+
+    status: Mapped[Status] = mapped_column(Enum(Status, name='task_status'), primary_key=True)
+    role: Mapped[TaskRole] = mapped_column(Enum(TaskRole, name='task_role'), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+# Changes are summed per counter, so a statement touching many tasks updates every counter once.
+# Counters are upserted in the key order, so that concurrent transactions lock them in the same order.
+_APPLY_DELTAS = """
+        INSERT INTO task_counters AS counter (status, role, user_id, count)
+        SELECT status, role, user_id, sum(delta)
+        FROM (
+            SELECT status, 'AUTHOR'::task_role AS role, author_id AS user_id, delta FROM deltas
+            UNION ALL
+            SELECT status, 'ASSIGNEE'::task_role, assignee_id, delta FROM deltas WHERE assignee_id IS NOT NULL
+        ) AS changes
+        GROUP BY status, role, user_id
+        HAVING sum(delta) <> 0
+        ORDER BY status, role, user_id
+        ON CONFLICT (status, role, user_id) DO UPDATE SET count = counter.count + EXCLUDED.count;"""
+
+COUNT_TASKS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION count_tasks() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        WITH deltas AS (SELECT status, author_id, assignee_id, 1 AS delta FROM new_rows){_APPLY_DELTAS}
+    ELSIF TG_OP = 'DELETE' THEN
+        WITH deltas AS (SELECT status, author_id, assignee_id, -1 AS delta FROM old_rows){_APPLY_DELTAS}
+    ELSIF TG_OP = 'UPDATE' THEN
+        WITH deltas AS (
+            SELECT status, author_id, assignee_id, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, author_id, assignee_id, -1 FROM old_rows
+        ){_APPLY_DELTAS}
+    ELSE
+        DELETE FROM task_counters;
+    END IF;
+    RETURN NULL;
+END
+$$"""
+
+# Rebuilds all the counters, for loads that run with the triggers disabled.
+RECOUNT_TASKS = f"""
+        DELETE FROM task_counters;
+        WITH deltas AS (SELECT status, author_id, assignee_id, 1 AS delta FROM tasks){_APPLY_DELTAS}"""
+
+COUNT_TASKS_TRIGGERS = (
+    'CREATE TRIGGER count_inserted_tasks AFTER INSERT ON tasks '
+    'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()',
+    'CREATE TRIGGER count_updated_tasks AFTER UPDATE ON tasks '
+    'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()',
+    'CREATE TRIGGER count_deleted_tasks AFTER DELETE ON tasks '
+    'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()',
+    'CREATE TRIGGER count_truncated_tasks AFTER TRUNCATE ON tasks FOR EACH STATEMENT EXECUTE FUNCTION count_tasks()',
+)
+
+event.listen(TaskModel.__table__, 'after_create', DDL(COUNT_TASKS_FUNCTION))
+for _trigger in COUNT_TASKS_TRIGGERS:
+    event.listen(TaskModel.__table__, 'after_create', DDL(_trigger))
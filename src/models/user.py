@@ -15,7 +15,7 @@ if TYPE_CHECKING:
 class UserModel(BaseModel):
     __tablename__ = 'users'
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4, unique=True)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     full_name: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=text("TIMEZONE('utc', now())"), nullable=False)
@@ -30,4 +30,5 @@ class UserModel(BaseModel):
     )
 
     def to_schema(self) -> UserDB:
-        return UserDB(**self.__dict__)
+        """Converts the loaded attributes without validation, rows read from the database are trusted."""
+        return UserDB.model_construct(**self.__dict__)
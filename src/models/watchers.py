@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import BaseModel
@@ -8,6 +8,8 @@ from src.models import BaseModel
 
 class Watcher(BaseModel):
     __tablename__ = 'watchers'
+    # The primary key serves lookups by task, this index the lookups by user and the cascades from `users`.
+    __table_args__ = (Index('watchers_user_id_task_id_index', 'user_id', 'task_id'),)
 
     task_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey('tasks.id', ondelete='CASCADE', onupdate='CASCADE'),
@@ -1,7 +1,10 @@
 __all__ = [
+    'ExecutorRepository',
     'TaskRepository',
     'UserRepository',
+    'WatcherRepository',
 ]
 
+from src.repositories.membership import ExecutorRepository, WatcherRepository
 from src.repositories.task import TaskRepository
 from src.repositories.user import UserRepository
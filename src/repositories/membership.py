@@ -0,0 +1,126 @@
+from collections.abc import Collection
+from uuid import UUID
+
+import sqlalchemy.exc
+from sqlalchemy import any_, bindparam, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.types import Uuid
+
+from src.models import Executors, Watcher
+from src.utils.enums import Membership
+from src.utils.repository import M, SqlAlchemyRepository
+
+# Names of the unit of work repositories for each membership.
+MEMBERSHIP_REPOS = {
+    Membership.WATCHERS: 'watcher',
+    Membership.EXECUTORS: 'executor',
+}
+
+
+class MembershipError(Exception):
+    """Custom exception for memberships referring to tasks or users that do not exist."""
+
+
+class MembershipRepository(SqlAlchemyRepository[M]):
+    """Repository of an association between tasks and users.
+
+    Memberships are changed with one set-based statement per direction, the IDs are sent as a single
+    array parameter and the relationship collections of the models are never loaded.
+    """
+
+    async def add_users(self, task_id: UUID, user_ids: Collection[UUID]) -> int:
+        """Add the users to the task, the users already present are skipped.
+
+        :param task_id: ID of the task.
+        :param user_ids: IDs of the users to be added.
+        :return: Number of the added users.
+        :raises MembershipError: If the task or any of the users does not exist.
+        """
+        return await self._add(self._model.task_id, task_id, self._model.user_id, user_ids)
+
+    async def add_tasks(self, user_id: UUID, task_ids: Collection[UUID]) -> int:
+        """Add the user to the tasks, the tasks the user is already in are skipped.
+
+        :param user_id: ID of the user.
+        :param task_ids: IDs of the tasks the user is added to.
+        :return: Number of the tasks the user was added to.
+        :raises MembershipError: If the user or any of the tasks does not exist.
+        """
+        return await self._add(self._model.user_id, user_id, self._model.task_id, task_ids)
+
+    async def remove_users(self, task_id: UUID, user_ids: Collection[UUID]) -> int:
+        """Remove the users from the task.
+
+        :param task_id: ID of the task.
+        :param user_ids: IDs of the users to be removed.
+        :return: Number of the removed users.
+        """
+        return await self._remove(self._model.task_id, task_id, self._model.user_id, user_ids)
+
+    async def remove_tasks(self, user_id: UUID, task_ids: Collection[UUID]) -> int:
+        """Remove the user from the tasks.
+
+        :param user_id: ID of the user.
+        :param task_ids: IDs of the tasks the user is removed from.
+        :return: Number of the tasks the user was removed from.
+        """
+        return await self._remove(self._model.user_id, user_id, self._model.task_id, task_ids)
+
+    async def count_users(self, task_id: UUID) -> int:
+        """Count the users of the task."""
+        return await self._count(self._model.task_id, task_id)
+
+    async def count_tasks(self, user_id: UUID) -> int:
+        """Count the tasks of the user."""
+        return await self._count(self._model.user_id, user_id)
+
+    async def _add(
+            self,
+            owner: InstrumentedAttribute,
+            owner_id: UUID,
+            member: InstrumentedAttribute,
+            member_ids: Collection[UUID],
+    ) -> int:
+        if not member_ids:
+            return 0
+        # Sorted, so that concurrent transactions lock the new keys in the same order.
+        members = func.unnest(bindparam('member_ids', sorted(set(member_ids)), type_=ARRAY(Uuid)))
+        query = (
+            insert(self._model)
+            .from_select([owner.key, member.key], select(literal(owner_id, Uuid), members))
+            .on_conflict_do_nothing()
+        )
+        try:
+            result = await self._session.execute(query)
+        except sqlalchemy.exc.IntegrityError as e:
+            raise MembershipError(e) from e
+        return result.rowcount
+
+    async def _remove(
+            self,
+            owner: InstrumentedAttribute,
+            owner_id: UUID,
+            member: InstrumentedAttribute,
+            member_ids: Collection[UUID],
+    ) -> int:
+        if not member_ids:
+            return 0
+        query = delete(self._model).where(
+            owner == owner_id,
+            member == any_(bindparam('member_ids', list(set(member_ids)), type_=ARRAY(Uuid))),
+        )
+        result = await self._session.execute(query)
+        return result.rowcount
+
+    async def _count(self, owner: InstrumentedAttribute, owner_id: UUID) -> int:
+        result = await self._session.execute(select(func.count()).where(owner == owner_id))
+        return result.scalar_one()
+
+
+class WatcherRepository(MembershipRepository[Watcher]):
+    _model = Watcher
+
+
+class ExecutorRepository(MembershipRepository[Executors]):
+    _model = Executors
@@ -1,10 +1,17 @@
+from collections import defaultdict
+from collections.abc import AsyncIterator, Collection, Sequence
+
 import sqlalchemy.exc
 from pydantic import UUID4
-from sqlalchemy import Result, select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import ColumnElement, Result, Row, Select, column, select, text, tuple_, union_all, update, values
+from sqlalchemy.orm import load_only, selectinload
 
-from src.models import TaskModel
-from src.schemas.tasks import CreateTaskRequest, FilterTaskRequest, UpdateTaskRequest
+from src.config import settings
+from src.models import Executors, TaskCounterModel, TaskModel, Watcher
+from src.schemas.tasks import BatchUpdateTaskItem, CreateTaskRequest, FilterTaskRequest, UpdateTaskRequest
+from src.utils.constans import STREAM_BATCH_SIZE
+from src.utils.enums import Status, UserTaskRole
+from src.utils.pagination import Cursor
 from src.utils.repository import SqlAlchemyRepository
 
 
@@ -16,6 +23,10 @@ class NoTaskError(Exception):
     """Custom exception for task not found error."""
 
 
+class TaskConflictError(Exception):
+    """Custom exception for a task that does not match the conditions of an update."""
+
+
 class TaskRepository(SqlAlchemyRepository[TaskModel]):
     _model = TaskModel
 
@@ -31,16 +42,111 @@ class TaskRepository(SqlAlchemyRepository[TaskModel]):
         except SqlAlchemyRepository.IntegrityError as e:
             raise TaskError(e) from e
 
-    async def get_all(self, task_filter: FilterTaskRequest) -> list[TaskModel]:
-        """Get tasks with filtering.
+    async def get_by_id(
+            self,
+            task_id: UUID4,
+            fields: Collection[str] | None = None,
+            include: Collection[str] = (),
+    ) -> TaskModel | None:
+        """Get task by ID with the given columns and relationships.
+
+        :param task_id: ID of the task.
+        :param fields: Columns to be loaded, all of them if not given.
+        :param include: Relationships to be loaded.
+        :return: The TaskModel instance or None if there is no such task.
+        """
+        query = self._project(select(self._model).where(self._model.id == task_id), fields, include)
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_version(self, task_id: UUID4) -> int | None:
+        """Get the version of the task without loading the rest of its row.
+
+        :param task_id: ID of the task.
+        :return: Version of the task or None if there is no such task.
+        """
+        result = await self._session.execute(select(self._model.version).where(self._model.id == task_id))
+        return result.scalar_one_or_none()
+
+    async def get_all(
+            self,
+            task_filter: FilterTaskRequest,
+            limit: int,
+            after: Cursor | None = None,
+            fields: Collection[str] | None = None,
+            include: Collection[str] = (),
+    ) -> list[TaskModel]:
+        """Get a page of tasks with filtering.
+
+        Tasks are ordered by `(created_at, id)`, the page starts right after the `after` position.
+        One extra task is fetched so that the caller can tell whether there is a next page.
 
         :param task_filter: Filter attributes to be applied.
-        :return: List of TaskModel instances matching the filter.
+        :param limit: Page size.
+        :param after: Position of the last task on the previous page.
+        :param fields: Columns to be loaded, all of them if not given. The keyset columns and the version
+            are always loaded.
+        :param include: Relationships to be loaded.
+        :return: List of at most `limit + 1` TaskModel instances matching the filter.
         """
+        query = self._project(self._filtered_query(task_filter, after), fields, include)
+        await self._plan_per_pattern(task_filter)
+        result = await self._session.execute(query.limit(limit + 1))
+        return list(result.scalars().all())
+
+    async def get_by_user(
+            self,
+            user_id: UUID4,
+            role: UserTaskRole | None,
+            limit: int,
+            after: Cursor | None = None,
+            fields: Collection[str] | None = None,
+            include: Collection[str] = (),
+    ) -> list[TaskModel]:
+        """Get a page of the tasks the user has the given role in, ordered the same way as in `get_all`.
+
+        :param user_id: ID of the user.
+        :param role: Role of the user in the tasks, any role if not given.
+        :param limit: Page size.
+        :param after: Position of the last task on the previous page.
+        :param fields: Columns to be loaded, all of them if not given.
+        :param include: Relationships to be loaded.
+        :return: List of at most `limit + 1` TaskModel instances.
+        """
+        query = self._keyset(select(self._model).where(self._user_condition(user_id, role)), after)
+        result = await self._session.execute(self._project(query, fields, include).limit(limit + 1))
+        return list(result.scalars().all())
+
+    async def stream_all(
+            self,
+            task_filter: FilterTaskRequest,
+            after: Cursor | None = None,
+            fields: Collection[str] | None = None,
+            include: Collection[str] = (),
+    ) -> AsyncIterator[Sequence[TaskModel]]:
+        """Stream all tasks matching the filter through a server-side cursor.
+
+        Tasks are ordered the same way as in `get_all`, at most `STREAM_BATCH_SIZE` of them are held in memory.
+
+        :param task_filter: Filter attributes to be applied.
+        :param after: Position of the last task already received by the client.
+        :param fields: Columns to be loaded, all of them if not given.
+        :param include: Relationships to be loaded, once per batch.
+        :return: Async iterator over batches of TaskModel instances.
+        """
+        query = self._project(self._filtered_query(task_filter, after), fields, include)
+        await self._plan_per_pattern(task_filter)
+        result = await self._session.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for tasks in result.partitions():
+            yield tasks
+
+    def _filtered_query(self, task_filter: FilterTaskRequest, after: Cursor | None) -> Select:
+        """Build the ordered task query shared by paged and streamed reads."""
         query = select(self._model)
 
         if task_filter.title:
-            query = query.where(self._model.title.ilike(f'%{task_filter.title}%'))
+            # Served by the trigram index, wildcards in the user input are matched literally.
+            query = query.where(self._model.title.icontains(task_filter.title, autoescape=True))
 
         if task_filter.status:
             query = query.where(self._model.status == task_filter.status)
@@ -48,45 +154,139 @@ class TaskRepository(SqlAlchemyRepository[TaskModel]):
         if task_filter.author_id:
             query = query.where(self._model.author_id == task_filter.author_id)
 
-        query = query.options(
-            selectinload(self._model.watchers),
-            selectinload(self._model.executors),
-        )
+        return self._keyset(query, after)
+
+    async def _plan_per_pattern(self, task_filter: FilterTaskRequest) -> None:
+        """Plan a title search for its pattern when the statement is cached.
+
+        A generic plan of the cached prepared statement cannot estimate the pattern selectivity
+        and prefers walking the keyset index over the trigram one. Behind PgBouncer nothing is cached.
+        """
+        if task_filter.title and not settings.DB_PGBOUNCER:
+            await self._session.execute(text('SET LOCAL plan_cache_mode = force_custom_plan'))
+
+    def _keyset(self, query: Select, after: Cursor | None) -> Select:
+        """Order the query by `(created_at, id)` and start it right after the `after` position."""
+        if after:
+            query = query.where(tuple_(self._model.created_at, self._model.id) > after)
+        return query.order_by(self._model.created_at, self._model.id)
+
+    def _user_condition(self, user_id: UUID4, role: UserTaskRole | None) -> ColumnElement[bool]:
+        """Condition matching the tasks the user has the role in, any role if not given."""
+        if role is UserTaskRole.AUTHOR:
+            return self._model.author_id == user_id
+        if role is UserTaskRole.ASSIGNEE:
+            return self._model.assignee_id == user_id
+        if role is not None:
+            return self._model.id.in_(self._user_task_ids(user_id, role))
+        # An OR of the conditions would be checked against every task, the union collects the IDs by the indexes.
+        return self._model.id.in_(union_all(*(self._user_task_ids(user_id, role) for role in UserTaskRole)))
 
+    def _user_task_ids(self, user_id: UUID4, role: UserTaskRole) -> Select:
+        """IDs of the tasks the user has the role in, each role is looked up by an index leading with the user."""
+        if role is UserTaskRole.AUTHOR:
+            return select(self._model.id).where(self._model.author_id == user_id)
+        if role is UserTaskRole.ASSIGNEE:
+            return select(self._model.id).where(self._model.assignee_id == user_id)
+        membership = Watcher if role is UserTaskRole.WATCHER else Executors
+        return select(membership.task_id).where(membership.user_id == user_id)
+
+    def _project(self, query: Select, fields: Collection[str] | None, include: Collection[str]) -> Select:
+        """Restrict the loaded columns and add the requested relationships to the query."""
+        options = [selectinload(getattr(self._model, relationship)) for relationship in include]
+        if fields is not None:
+            # The keyset columns are needed for the cursor of the next page, the version for the ETag.
+            columns = {*fields, 'id', 'created_at', 'version'}
+            options.append(load_only(*(getattr(self._model, field) for field in sorted(columns)), raiseload=True))
+        return query.options(*options)
+
+    async def get_counters(self) -> Sequence[Row]:
+        """Get the non-zero task counters maintained by the triggers on the tasks table.
+
+        The cost depends on the number of the (status, role, user) groups, not on the number of tasks.
+
+        :return: Rows of `(status, role, user_id, count)` ordered by role, user and status.
+        """
+        counter = TaskCounterModel
+        query = (
+            select(counter.status, counter.role, counter.user_id, counter.count)
+            .where(counter.count != 0)
+            .order_by(counter.role, counter.user_id, counter.status)
+        )
         result = await self._session.execute(query)
-        return list(result.scalars().all())
+        return result.all()
+
+    async def update(
+            self,
+            task_id: UUID4,
+            update_data: UpdateTaskRequest,
+            expected_versions: Collection[int] | None = None,
+            expected_status: Status | None = None,
+    ) -> TaskModel:
+        """Update task by ID, optionally only if it still has the expected version and status.
 
-    async def update(self, task_id: UUID4, update_data: UpdateTaskRequest) -> TaskModel:
-        """Update task by ID.
+        The conditions are checked by the UPDATE statement itself, so a concurrent update of the same task
+        either happens before and fails the conditions or waits for this one, no row lock is taken beforehand.
 
         :param task_id: ID of the task to be updated.
         :param update_data: New data for the task.
+        :param expected_versions: Versions the task may have, any version if not given.
+        :param expected_status: Status the task must have, any status if not given.
         :return: The updated TaskModel instance.
+        :raises NoTaskError: If there is no such task.
+        :raises TaskConflictError: If the task does not have the expected version or status.
+        :raises TaskError: If the new data violates the constraints.
         """
         query = update(self._model).where(self._model.id == task_id)
 
-        if 'title' in update_data.model_fields_set:
-            query = query.values(title=update_data.title)
-
-        if 'description' in update_data.model_fields_set:
-            query = query.values(description=update_data.description)
-
-        if 'status' in update_data.model_fields_set:
-            query = query.values(status=update_data.status)
+        if expected_versions is not None:
+            query = query.where(self._model.version.in_(expected_versions))
 
-        if 'author_id' in update_data.model_fields_set:
-            query = query.values(author_id=update_data.author_id)
+        if expected_status is not None:
+            query = query.where(self._model.status == expected_status)
 
-        if 'assignee_id' in update_data.model_fields_set:
-            query = query.values(assignee_id=update_data.assignee_id)
-
-        query = query.returning(self._model)
+        query = query.values(**update_data.model_dump(exclude_unset=True)).returning(self._model)
 
         try:
             result: Result = await self._session.execute(query)
             task: TaskModel = result.scalar_one()
         except sqlalchemy.exc.NoResultFound:
+            conditional = expected_versions is not None or expected_status is not None
+            if conditional and await self.get_version(task_id) is not None:
+                raise TaskConflictError
             raise NoTaskError
         except sqlalchemy.exc.IntegrityError:
             raise TaskError
         return task
+
+    async def batch_update(self, items: Sequence[BatchUpdateTaskItem]) -> list[TaskModel]:
+        """Update many tasks with one `UPDATE ... FROM (VALUES ...)` statement per set of updated fields.
+
+        :param items: IDs of the tasks with their new data, each task must occur only once.
+        :return: The updated TaskModel instances, tasks that do not exist are skipped.
+        :raises TaskError: If the new data violates the constraints.
+        """
+        shapes: defaultdict[tuple[str, ...], list[BatchUpdateTaskItem]] = defaultdict(list)
+        for item in items:
+            shapes[tuple(sorted(item.model_fields_set - {'id'}))].append(item)
+
+        table = self._model.__table__
+        tasks: list[TaskModel] = []
+        for fields, shape_items in shapes.items():
+            data = values(
+                column('id', table.c.id.type),
+                *(column(field, table.c[field].type) for field in fields),
+                name='data',
+            ).data([(item.id, *(getattr(item, field) for field in fields)) for item in shape_items])
+            query = (
+                update(self._model)
+                .where(self._model.id == data.c.id)
+                .values({field: data.c[field] for field in fields})
+                .returning(self._model)
+            )
+            try:
+                result: Result = await self._session.execute(query)
+            except sqlalchemy.exc.IntegrityError:
+                raise TaskError
+            tasks.extend(result.scalars().all())
+        return tasks
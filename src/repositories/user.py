@@ -1,3 +1,10 @@
+from collections.abc import Collection
+from uuid import UUID
+
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Uuid
+
 from src.models import UserModel
 from src.schemas.user import CreateUserRequest
 from src.utils.repository import SqlAlchemyRepository
@@ -21,3 +28,19 @@ class UserRepository(SqlAlchemyRepository[UserModel]):
             return await self.add_one_and_get_obj(**user.model_dump())
         except SqlAlchemyRepository.IntegrityError as e:
             raise CreateUserError(e) from e
+
+    async def get_existing_ids(self, user_ids: Collection[UUID]) -> set[UUID]:
+        """Get IDs of the given users that exist in the database.
+
+        The IDs are sent as a single array parameter, so any number of them fits into one query.
+
+        :param user_ids: IDs to be checked.
+        :return: Set of the existing user IDs.
+        """
+        if not user_ids:
+            return set()
+        query = select(self._model.id).where(
+            self._model.id == any_(bindparam('user_ids', list(user_ids), type_=ARRAY(Uuid))),
+        )
+        result = await self._session.execute(query)
+        return set(result.scalars().all())
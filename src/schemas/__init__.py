@@ -1,31 +1,61 @@
+from src.schemas.membership import MembershipChangeRequest, MembershipChangeResponse, MembershipCounts
+from src.schemas.monitoring import CacheStats, CacheStatsResponse
+from src.schemas.pagination import PaginationRequest
 from src.schemas.response import BaseCreateResponse, BaseErrorResponse, BaseResponse
 from src.schemas.tasks import (
+    BatchUpdateTaskItem,
+    BatchUpdateTaskResponse,
+    BulkCreateTaskResponse,
+    BulkTaskError,
     CreateTaskRequest,
     FilterTaskRequest,
     MultiTaskResponse,
+    SparseTaskDB,
+    SparseTaskResponse,
     TaskDB,
+    TaskFieldsRequest,
     TaskID,
     TaskResponse,
+    TaskStats,
+    TaskStatsResponse,
     UpdateTaskRequest,
+    UserTaskStats,
 )
 from src.schemas.user import CreateUserRequest, CreateUserResponse, UserDB, UserID, UserResponse
 
 TaskDB.model_rebuild()
+SparseTaskDB.model_rebuild()
 
 __all__ = [
     'BaseCreateResponse',
     'BaseErrorResponse',
     'BaseResponse',
+    'BatchUpdateTaskItem',
+    'BatchUpdateTaskResponse',
+    'BulkCreateTaskResponse',
+    'BulkTaskError',
+    'CacheStats',
+    'CacheStatsResponse',
     'CreateTaskRequest',
     'CreateUserRequest',
     'CreateUserResponse',
     'FilterTaskRequest',
+    'MembershipChangeRequest',
+    'MembershipChangeResponse',
+    'MembershipCounts',
     'MultiTaskResponse',
+    'PaginationRequest',
+    'SparseTaskDB',
+    'SparseTaskResponse',
     'TaskDB',
+    'TaskFieldsRequest',
     'TaskID',
     'TaskResponse',
+    'TaskStats',
+    'TaskStatsResponse',
     'UpdateTaskRequest',
     'UserDB',
     'UserID',
     'UserResponse',
+    'UserTaskStats',
 ]
@@ -0,0 +1,33 @@
+from pydantic import UUID4, BaseModel, Field, model_validator
+
+from src.schemas.response import BaseResponse
+from src.utils.constans import MEMBERSHIP_CHANGE_MAX_SIZE, MEMBERSHIP_OVERLAP_ERROR
+
+
+class MembershipChangeRequest(BaseModel):
+    add: list[UUID4] = Field(
+        [],
+        max_length=MEMBERSHIP_CHANGE_MAX_SIZE,
+        description='IDs to be added, those already present are skipped',
+    )
+    remove: list[UUID4] = Field(
+        [],
+        max_length=MEMBERSHIP_CHANGE_MAX_SIZE,
+        description='IDs to be removed, those not present are skipped',
+    )
+
+    @model_validator(mode='after')
+    def ensure_disjoint(self) -> 'MembershipChangeRequest':
+        if not set(self.add).isdisjoint(self.remove):
+            raise ValueError(MEMBERSHIP_OVERLAP_ERROR)
+        return self
+
+
+class MembershipCounts(BaseModel):
+    added: int = Field(..., description='Number of the added IDs that were not present yet')
+    removed: int = Field(..., description='Number of the removed IDs that were present')
+    total: int = Field(..., description='Number of the IDs present after the change')
+
+
+class MembershipChangeResponse(BaseResponse):
+    payload: MembershipCounts
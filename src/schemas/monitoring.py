@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+from src.schemas.response import BaseResponse
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(..., description='Number of reads served from the cache')
+    misses: int = Field(..., description='Number of reads that went to the database')
+    evictions: int = Field(..., description='Number of entries evicted because the cache was full')
+    expirations: int = Field(..., description='Number of entries dropped because their TTL ran out')
+    size: int = Field(..., description='Current number of entries')
+    maxsize: int = Field(..., description='Maximum number of entries')
+
+
+class CacheStatsResponse(BaseResponse):
+    payload: dict[str, CacheStats]
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+from src.utils.constans import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class PaginationRequest(BaseModel):
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description='Maximum number of entries on the page')
+    after: str | None = Field(None, description='Cursor of the last entry on the previous page')
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from pydantic import UUID4, BaseModel, Field, PastDatetime, model_validator
 
@@ -41,21 +41,91 @@ class CreateTaskRequest(UpdateTaskRequest):
     author_id: UUID4 = Field(..., description='ID of the user who created the task')
 
 
+class BatchUpdateTaskItem(TaskID, UpdateTaskRequest):
+    pass
+
+
 class TaskDB(TaskID, CreateTaskRequest):
     created_at: PastDatetime | None = Field(None, description='Date the task was created')
+    version: int | None = Field(None, description='Version of the task, incremented on every change')
     watchers: list['UserDB'] | None = Field(None, description='List of users who watched the task')
     executors: list['UserDB'] | None = Field(None, description='List of users who execute the task')
 
 
+class SparseTaskDB(TaskID):
+    """Task with the requested fields only, the fields that were not requested are omitted from the response."""
+
+    title: str | None = Field(None, description='Title of the task')
+    description: str | None = Field(None, description='Description of the task')
+    status: Status | None = Field(None, description='Status of the task')
+    created_at: PastDatetime | None = Field(None, description='Date the task was created')
+    author_id: UUID4 | None = Field(None, description='ID of the user who created the task')
+    assignee_id: UUID4 | None = Field(None, description='ID of the user who assigned the task')
+    version: int | None = Field(None, description='Version of the task, incremented on every change')
+    watchers: list['UserDB'] | None = Field(None, description='Users who watch the task, only with `include=watchers`')
+    executors: list['UserDB'] | None = Field(
+        None,
+        description='Users who execute the task, only with `include=executors`',
+    )
+
+
 class FilterTaskRequest(BaseModel):
     title: str | None = Field(None, min_length=3, max_length=255, description='Title of the task')
     status: Status | None = Field(None, description='Status of the task')
     author_id: UUID4 | None = Field(None, description='ID of the user who created the task')
 
 
+class TaskFieldsRequest(BaseModel):
+    fields: str | None = Field(
+        None,
+        description='Comma-separated task fields to be returned, all of them by default. The ID is always returned',
+        examples=['title,status'],
+    )
+    include: str | None = Field(
+        None,
+        description='Comma-separated relationships to be loaded: `watchers`, `executors`. None by default',
+        examples=['watchers,executors'],
+    )
+
+
 class TaskResponse(BaseModel):
     payload: TaskDB = Field(..., description='Task data')
 
 
+class SparseTaskResponse(BaseModel):
+    payload: SparseTaskDB = Field(..., description='Task data with the requested fields')
+
+
 class MultiTaskResponse(BaseModel):
-    payload: list[TaskDB] = Field(..., description='List of tasks')
+    payload: list[SparseTaskDB] = Field(..., description='List of tasks with the requested fields')
+    next_cursor: str | None = Field(None, description='Cursor for the next page, if there is one')
+
+
+class UserTaskStats(BaseModel):
+    user_id: UUID4 = Field(..., description='ID of the user')
+    counts: dict[Status, int] = Field(..., description='Number of tasks per status, statuses without tasks are omitted')
+
+
+class TaskStats(BaseModel):
+    by_status: dict[Status, int] = Field(..., description='Number of tasks per status')
+    by_author: list[UserTaskStats] = Field(..., description='Number of tasks per status for each author')
+    by_assignee: list[UserTaskStats] = Field(..., description='Number of tasks per status for each assignee')
+
+
+class TaskStatsResponse(BaseModel):
+    payload: TaskStats = Field(..., description='Task statistics')
+
+
+class BulkTaskError(BaseModel):
+    index: int = Field(..., description='Position of the task in the request')
+    details: Any = Field(..., examples=['Wrong data provided.'])
+
+
+class BulkCreateTaskResponse(BaseModel):
+    payload: list[UUID4] = Field(..., description='IDs of the created tasks in the request order')
+    errors: list[BulkTaskError] = Field(..., description='Tasks that were not created')
+
+
+class BatchUpdateTaskResponse(BaseModel):
+    payload: list[TaskDB] = Field(..., description='Updated tasks in the request order')
+    not_found: list[UUID4] = Field(..., description='IDs of the tasks that do not exist')
@@ -0,0 +1,456 @@
+"""Audits the indexes of the schema for the ones that slow down the writes without serving the reads.
+
+Every index is updated by each insert and by each update that cannot be HOT, so an index that duplicates
+another one, is a prefix of a longer one or is never scanned only costs write throughput and disk.
+A foreign key without an index on its columns makes every delete and key update of the referenced row
+scan the whole referencing table.
+
+The schema is read from the metadata of the models, with `--live` from the database of the settings,
+which also reports the indexes not scanned since the statistics were reset. With `--migration`
+the findings are written to a new Alembic migration to be reviewed before it is applied.
+
+Usage: python -m src.tools.index_audit [--live] [--migration]
+"""
+
+import argparse
+import asyncio
+import datetime
+import enum
+import json
+import sys
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import Column, Index, MetaData, PrimaryKeyConstraint, UniqueConstraint, bindparam, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.types import String
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from src.models import BaseModel
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / 'alembic.ini'
+
+_LIVE_INDEXES = text("""
+    SELECT t.relname AS table_name,
+           i.relname AS name,
+           am.amname AS method,
+           ARRAY(
+               SELECT pg_get_indexdef(ix.indexrelid, k.n::int, true)
+                      || CASE WHEN opc.opcdefault THEN '' ELSE ' ' || opc.opcname END
+               FROM unnest(ix.indclass::oid[]) WITH ORDINALITY AS k(opclass, n)
+               JOIN pg_opclass AS opc ON opc.oid = k.opclass
+               ORDER BY k.n
+           ) AS key_columns,
+           ARRAY(
+               SELECT pg_get_indexdef(ix.indexrelid, n, true)
+               FROM generate_series(ix.indnkeyatts + 1, ix.indnatts) AS n
+           ) AS include,
+           pg_get_expr(ix.indpred, ix.indrelid) AS predicate,
+           ix.indisunique AS is_unique,
+           ix.indisprimary AS is_primary,
+           con.oid IS NOT NULL AS is_constraint,
+           pg_get_indexdef(ix.indexrelid) AS definition,
+           s.idx_scan AS scans,
+           pg_relation_size(ix.indexrelid) AS size,
+           ARRAY(
+               SELECT fk.conname::text FROM pg_constraint AS fk
+               WHERE fk.contype = 'f' AND fk.conindid = ix.indexrelid
+               ORDER BY fk.conname
+           ) AS referenced_by
+    FROM pg_index AS ix
+    JOIN pg_class AS i ON i.oid = ix.indexrelid
+    JOIN pg_class AS t ON t.oid = ix.indrelid
+    JOIN pg_am AS am ON am.oid = i.relam
+    LEFT JOIN pg_constraint AS con ON con.conindid = ix.indexrelid AND con.contype IN ('p', 'u')
+    LEFT JOIN pg_stat_user_indexes AS s ON s.indexrelid = ix.indexrelid
+    WHERE t.relnamespace = current_schema()::regnamespace AND t.relname = ANY(:tables)
+    ORDER BY t.relname, i.relname
+""").bindparams(bindparam('tables', type_=ARRAY(String)))
+
+_LIVE_FOREIGN_KEYS = text("""
+    SELECT t.relname AS table_name,
+           c.conname AS name,
+           ARRAY(
+               SELECT a.attname::text
+               FROM unnest(c.conkey) WITH ORDINALITY AS k(attnum, n)
+               JOIN pg_attribute AS a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+               ORDER BY k.n
+           ) AS key_columns,
+           r.relname AS referred_table
+    FROM pg_constraint AS c
+    JOIN pg_class AS t ON t.oid = c.conrelid
+    JOIN pg_class AS r ON r.oid = c.confrelid
+    WHERE c.contype = 'f' AND t.relnamespace = current_schema()::regnamespace AND t.relname = ANY(:tables)
+    ORDER BY t.relname, c.conname
+""").bindparams(bindparam('tables', type_=ARRAY(String)))
+
+_STATS_RESET = text('SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()')
+
+
+class FindingKind(enum.Enum):
+    DUPLICATE = 'duplicate'
+    REDUNDANT_PREFIX = 'redundant prefix'
+    UNUSED = 'unused'
+    MISSING_FK_INDEX = 'missing FK index'
+
+
+@dataclass(frozen=True, slots=True)
+class IndexInfo:
+    """Index of a table, including the ones backing the primary keys and the unique constraints."""
+
+    table: str
+    name: str
+    columns: tuple[str, ...]  # key columns or expressions, with the operator class if it is not the default one
+    method: str = 'btree'
+    include: tuple[str, ...] = ()
+    predicate: str | None = None
+    unique: bool = False
+    primary: bool = False
+    constraint: bool = False  # the index is dropped together with its primary key or unique constraint
+    definition: str = ''  # `CREATE INDEX` statement, empty for the constraints
+    scans: int | None = None  # known only for a live database
+    size: int | None = None
+    referenced_by: tuple[str, ...] = ()  # foreign keys checked through the index
+
+    @property
+    def simple(self) -> bool:
+        """True if the index can be created by `op.create_index` from its column names alone."""
+        return (
+            self.method == 'btree'
+            and not self.include
+            and self.predicate is None
+            and all(column.isidentifier() for column in self.columns)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ForeignKeyInfo:
+    table: str
+    name: str
+    columns: tuple[str, ...]
+    referred_table: str
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    kind: FindingKind
+    index: IndexInfo  # the index to be dropped, for a missing foreign key index the one to be created
+    reason: str
+
+
+def metadata_schema(metadata: MetaData) -> tuple[list[IndexInfo], list[ForeignKeyInfo]]:
+    """Collects the indexes and the foreign keys the models declare.
+
+    The unnamed constraints get the names PostgreSQL gives them, so that they can be dropped by name.
+    """
+    dialect = postgresql.dialect()
+    indexes, foreign_keys = [], []
+    for table in metadata.sorted_tables:
+        for constraint in table.constraints:
+            columns = tuple(column.name for column in constraint.columns)
+            if isinstance(constraint, PrimaryKeyConstraint):
+                name = constraint.name or f'{table.name}_pkey'
+                indexes.append(IndexInfo(table.name, name, columns, unique=True, primary=True, constraint=True))
+            elif isinstance(constraint, UniqueConstraint):
+                name = constraint.name or f'{table.name}_{"_".join(columns)}_key'
+                indexes.append(IndexInfo(table.name, name, columns, unique=True, constraint=True))
+        indexes.extend(_metadata_index(index, dialect) for index in table.indexes)
+        foreign_keys.extend(
+            ForeignKeyInfo(
+                table.name,
+                foreign_key.name or f'{table.name}_{"_".join(foreign_key.column_keys)}_fkey',
+                tuple(foreign_key.column_keys),
+                foreign_key.referred_table.name,
+            )
+            for foreign_key in table.foreign_key_constraints
+        )
+    return indexes, foreign_keys
+
+
+def _metadata_index(index: Index, dialect: postgresql.dialect) -> IndexInfo:
+    options = index.dialect_options['postgresql']
+    columns = []
+    for expression in index.expressions:
+        if isinstance(expression, Column):
+            ops = (options['ops'] or {}).get(expression.name)
+            columns.append(f'{expression.name} {ops}' if ops else expression.name)
+        else:
+            columns.append(str(expression.compile(dialect=dialect, compile_kwargs={'literal_binds': True})))
+    where = options['where']
+    return IndexInfo(
+        index.table.name,
+        index.name,
+        tuple(columns),
+        method=options['using'] or 'btree',
+        include=tuple(options['include'] or ()),
+        predicate=str(where.compile(dialect=dialect, compile_kwargs={'literal_binds': True})) if where else None,
+        unique=index.unique,
+        definition=str(CreateIndex(index).compile(dialect=dialect)),
+    )
+
+
+async def live_schema(
+        connection: AsyncConnection,
+        tables: Iterable[str],
+) -> tuple[list[IndexInfo], list[ForeignKeyInfo], datetime.datetime | None]:
+    """Collects the indexes and the foreign keys of the tables as they exist in the database.
+
+    :param connection: Connection to the database.
+    :param tables: Names of the tables in the current schema.
+    :return: The indexes with their usage, the foreign keys and the time the usage is counted from.
+    """
+    tables = sorted(tables)
+    index_rows = await connection.execute(_LIVE_INDEXES, {'tables': tables})
+    indexes = [
+        IndexInfo(
+            row.table_name,
+            row.name,
+            tuple(row.key_columns),
+            method=row.method,
+            include=tuple(row.include),
+            predicate=row.predicate,
+            unique=row.is_unique,
+            primary=row.is_primary,
+            constraint=row.is_constraint,
+            definition='' if row.is_constraint else row.definition,
+            scans=row.scans,
+            size=row.size,
+            referenced_by=tuple(row.referenced_by),
+        )
+        for row in index_rows
+    ]
+    foreign_key_rows = await connection.execute(_LIVE_FOREIGN_KEYS, {'tables': tables})
+    foreign_keys = [
+        ForeignKeyInfo(row.table_name, row.name, tuple(row.key_columns), row.referred_table)
+        for row in foreign_key_rows
+    ]
+    stats_reset = await connection.scalar(_STATS_RESET)
+    return indexes, foreign_keys, stats_reset
+
+
+def duplicate_indexes(indexes: Iterable[IndexInfo]) -> list[Finding]:
+    """Finds the indexes with the same definition as another one, the one enforcing the most is kept."""
+    groups = defaultdict(list)
+    for index in indexes:
+        groups[index.table, index.method, index.columns, index.include, index.predicate].append(index)
+    findings = []
+    for group in groups.values():
+        kept, *duplicates = sorted(
+            group,
+            key=lambda index: (not index.primary, not index.constraint, not index.unique, index.name),
+        )
+        findings.extend(Finding(FindingKind.DUPLICATE, index, f'same as {kept.name}') for index in duplicates)
+    return findings
+
+
+def redundant_prefix_indexes(indexes: Iterable[IndexInfo]) -> list[Finding]:
+    """Finds the B-tree indexes whose columns start another B-tree index, which serves the same lookups.
+
+    Unique indexes are kept, as they enforce the uniqueness of exactly their columns.
+    """
+    btrees = [index for index in indexes if index.method == 'btree']
+    findings = []
+    for index in btrees:
+        if index.unique:
+            continue
+        longer = next(
+            (
+                other for other in btrees
+                if other.table == index.table
+                and other.predicate == index.predicate
+                and len(other.columns) > len(index.columns)
+                and other.columns[:len(index.columns)] == index.columns
+                and set(index.include) <= set(other.columns + other.include)
+            ),
+            None,
+        )
+        if longer:
+            findings.append(Finding(FindingKind.REDUNDANT_PREFIX, index, f'prefix of {longer.name}'))
+    return findings
+
+
+def unused_indexes(indexes: Iterable[IndexInfo]) -> list[Finding]:
+    """Finds the indexes that were never scanned, unique ones are kept as they enforce the uniqueness."""
+    return [
+        Finding(FindingKind.UNUSED, index, f'no scans, {index.size or 0} bytes')
+        for index in indexes
+        if index.scans == 0 and not index.unique
+    ]
+
+
+def missing_foreign_key_indexes(indexes: Iterable[IndexInfo], foreign_keys: Iterable[ForeignKeyInfo]) -> list[Finding]:
+    """Finds the foreign keys whose columns do not lead any B-tree index, in any order."""
+    leading = {
+        (index.table, frozenset(index.columns[:size]))
+        for index in indexes
+        if index.method == 'btree' and index.predicate is None
+        for size in range(1, len(index.columns) + 1)
+    }
+    findings = []
+    for foreign_key in foreign_keys:
+        if (foreign_key.table, frozenset(foreign_key.columns)) in leading:
+            continue
+        name = f'{foreign_key.table}_{"_".join(foreign_key.columns)}_index'
+        findings.append(Finding(
+            FindingKind.MISSING_FK_INDEX,
+            IndexInfo(foreign_key.table, name, foreign_key.columns),
+            f'{foreign_key.name}, changes of {foreign_key.referred_table} scan {foreign_key.table}',
+        ))
+    return findings
+
+
+def audit(indexes: list[IndexInfo], foreign_keys: list[ForeignKeyInfo]) -> list[Finding]:
+    """Runs all the checks, an index to be dropped is reported once, by the first check that finds it."""
+    findings, seen = [], set()
+    for finding in (
+        *duplicate_indexes(indexes),
+        *redundant_prefix_indexes(indexes),
+        *unused_indexes(indexes),
+        *missing_foreign_key_indexes(indexes, foreign_keys),
+    ):
+        key = finding.index.table, finding.index.name
+        if key not in seen:
+            seen.add(key)
+            findings.append(finding)
+    return findings
+
+
+def render_migration(findings: Iterable[Finding], revision: str, down_revision: str | None) -> str:
+    """Renders the migration applying the findings.
+
+    The drops of the unused indexes and of the indexes backing foreign keys are commented out:
+    the usage is counted per server since the last statistics reset, and the foreign keys have to be
+    moved to the kept index first.
+    """
+    upgrades, downgrades = [], []
+    for finding in findings:
+        upgrade, downgrade = _operations(finding)
+        index = finding.index
+        note = f'# {finding.kind.value}: {index.name}, {finding.reason}'
+        if finding.kind is FindingKind.UNUSED:
+            note += ', check the usage on the replicas and since the last statistics reset'
+        elif index.referenced_by:
+            note += f', move {", ".join(index.referenced_by)} to another index first'
+        if finding.kind is FindingKind.UNUSED or index.referenced_by:
+            upgrade, downgrade = _comment(upgrade), _comment(downgrade)
+        upgrades.append(f'{note}\n{upgrade}')
+        downgrades.insert(0, downgrade)
+    upgrades_code = '\n'.join(upgrades) or 'pass'
+    downgrades_code = '\n'.join(downgrades) or 'pass'
+    return f'''"""index audit
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {datetime.datetime.now(datetime.UTC)}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = {_literal(revision)}
+down_revision: Union[str, None] = {_literal(down_revision)}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+{_indent(upgrades_code)}
+
+
+def downgrade() -> None:
+{_indent(downgrades_code)}
+'''
+
+
+def _operations(finding: Finding) -> tuple[str, str]:
+    """Alembic operations applying the finding and reverting it."""
+    index = finding.index
+    if finding.kind is FindingKind.MISSING_FK_INDEX:
+        return _create_index(index), _drop_index(index)
+    if index.constraint:
+        return (
+            f'op.drop_constraint({_literal(index.name)}, {_literal(index.table)}, type_="unique")',
+            f'op.create_unique_constraint({_literal(index.name)}, {_literal(index.table)}, {_literal(index.columns)})',
+        )
+    return _drop_index(index), _create_index(index)
+
+
+def _create_index(index: IndexInfo) -> str:
+    if not index.simple:
+        return f'op.execute({_literal(index.definition)})'
+    return (
+        f'op.create_index(\n'
+        f'    {_literal(index.name)},\n'
+        f'    {_literal(index.table)},\n'
+        f'    {_literal(index.columns)},\n'
+        f'    unique={index.unique},\n'
+        f')'
+    )
+
+
+def _drop_index(index: IndexInfo) -> str:
+    return f'op.drop_index({_literal(index.name)}, table_name={_literal(index.table)})'
+
+
+def _literal(value: str | tuple[str, ...] | None) -> str:
+    """Python literal of the value in the double quotes the migrations use."""
+    if value is None:
+        return 'None'
+    return json.dumps(list(value) if isinstance(value, tuple) else value)
+
+
+def _comment(code: str) -> str:
+    return '\n'.join(f'# {line}' for line in code.splitlines())
+
+
+def _indent(code: str) -> str:
+    return '\n'.join(f'    {line}' for line in code.splitlines())
+
+
+def write_migration(findings: list[Finding]) -> Path:
+    """Writes the migration of the findings next to the others, on top of the current head."""
+    scripts = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    revision = uuid.uuid4().hex[-12:]
+    path = Path(scripts.versions) / f'{datetime.datetime.now(datetime.UTC):%Y_%m_%d_%H%M}-{revision}_index_audit.py'
+    path.write_text(render_migration(findings, revision, scripts.get_current_head()))
+    return path
+
+
+async def main(*, live: bool, migration: bool) -> int:
+    indexes, foreign_keys = metadata_schema(BaseModel.metadata)
+    source = 'the models'
+    if live:
+        # Imported here, so that auditing the models needs no database settings.
+        from src.database.db import async_engine  # noqa: PLC0415
+
+        async with async_engine.connect() as connection:
+            indexes, foreign_keys, stats_reset = await live_schema(connection, BaseModel.metadata.tables)
+        await async_engine.dispose()
+        source = f'the database, usage since {stats_reset or "the server start"}'
+
+    findings = audit(indexes, foreign_keys)
+    print(f'{len(indexes)} indexes and {len(foreign_keys)} foreign keys of {source}')  # noqa: T201
+    for finding in findings:
+        index = finding.index
+        print(f'{finding.kind.value:<18} {f"{index.table}.{index.name}":<50} {finding.reason}')  # noqa: T201
+    if migration and findings:
+        print(f'Written {write_migration(findings)}')  # noqa: T201
+    return 1 if findings else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--live', action='store_true', help='read the schema and the index usage from the database')
+    parser.add_argument('--migration', action='store_true', help='write an Alembic migration applying the findings')
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(live=args.live, migration=args.migration)))
@@ -0,0 +1,314 @@
+"""Fills the database with a synthetic dataset large enough for the query plans to be those of production.
+
+The users, tasks, watchers and executors are generated from one random seed, so the same options give
+the same rows. A few users write most of the tasks: authors, assignees, watchers and executors are drawn
+from a Zipf distribution over the users with the exponent `--skew`, each role ranking the users differently.
+The rows are sent with binary COPY in chunks of `--chunk-size` tasks, so besides the user IDs
+only one chunk is held in memory.
+
+Everything is loaded in one transaction, an interrupted run leaves nothing behind. With `--defer`
+the foreign keys and the secondary indexes of the tables are dropped and the trigger counting the inserted
+tasks is disabled before the load. They are added back, and the counters rebuilt, once after it in the same
+transaction, which is several times faster than checking and maintaining them chunk by chunk.
+
+Usage: python -m src.tools.seed --users 100000 --tasks 10000000 [--truncate] [--defer]
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from itertools import accumulate
+from math import exp
+
+import asyncpg
+from asyncpg.pgproto.pgproto import UUID
+
+from src.models.task_counter import RECOUNT_TASKS
+from src.utils.enums import Status
+
+TABLES = ('users', 'tasks', 'watchers', 'executors')
+USER_COLUMNS = ('id', 'full_name', 'email', 'created_at')
+TASK_COLUMNS = ('id', 'title', 'description', 'status', 'created_at', 'author_id', 'assignee_id', 'version')
+MEMBER_COLUMNS = ('task_id', 'user_id')
+
+DEFAULT_STATUS_MIX = {Status.TODO: 30, Status.IN_PROGRESS: 20, Status.DONE: 50}
+
+# The dataset covers a fixed year, so that it does not depend on the day it is generated.
+EPOCH = datetime.datetime(2025, 1, 1)  # noqa: DTZ001
+PERIOD = datetime.timedelta(days=365)
+
+FIRST_NAMES = ('Anna', 'Boris', 'Clara', 'Daniel', 'Elena', 'Felix', 'Greta', 'Hugo', 'Irina', 'Jonas')
+LAST_NAMES = ('Smith', 'Ivanova', 'Garcia', 'Chen', 'Novak', 'Keller', 'Rossi', 'Sato', 'Dubois', 'Berg')
+VERBS = ('Fix', 'Add', 'Update', 'Remove', 'Review', 'Refactor', 'Test', 'Document', 'Deploy', 'Investigate')
+SUBJECTS = (
+    'login page', 'payment flow', 'search', 'API docs', 'user settings',
+    'mobile layout', 'reports', 'notifications', 'database backup', 'onboarding',
+)
+TITLES = [f'{verb} {subject}' for verb in VERBS for subject in SUBJECTS]
+EMAIL_DOMAIN = 'seed.example'
+
+_UUID_VERSION_BITS = 0x4000 << 64 | 0x8000 << 48  # version 4, RFC 4122 variant
+_UUID_RANDOM_BITS = (1 << 128) - 1 ^ (0xF000 << 64 | 0xC000 << 48)
+
+_SECONDARY_INDEXES = """
+    SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+    FROM pg_index AS i
+    WHERE i.indrelid = ANY($1::regclass[])
+      AND NOT EXISTS (SELECT FROM pg_constraint AS c WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid)
+    ORDER BY 1
+"""
+_FOREIGN_KEYS = """
+    SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE contype = 'f' AND conrelid = ANY($1::regclass[])
+    ORDER BY 1, 2
+"""
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    users: int = 10_000
+    tasks: int = 100_000
+    watchers: float = 1.0  # mean number per task
+    executors: float = 0.5
+    skew: float = 1.1
+    unassigned: float = 0.3  # share of the tasks without an assignee
+    statuses: Mapping[Status, float] = field(default_factory=lambda: dict(DEFAULT_STATUS_MIX))
+    seed: int = 0
+    chunk_size: int = 50_000
+
+
+@dataclass(slots=True)
+class _Ranking:
+    """Users in the order of their share of a role, the first one has the largest."""
+
+    users: list[uuid.UUID]
+    cum_weights: list[float]
+
+    def draw(self, rnd: random.Random, k: int) -> list[uuid.UUID]:
+        return rnd.choices(self.users, cum_weights=self.cum_weights, k=k)
+
+    def members(self, rnd: random.Random, task_ids: Sequence[uuid.UUID], mean: float) -> list[tuple]:
+        """Draws about `mean` users per task for the whole chunk at once, a user drawn twice is kept once."""
+        counts = [_poisson(rnd, mean) for _ in task_ids]
+        users = iter(self.draw(rnd, sum(counts)))
+        return [
+            (task_id, user_id)
+            for task_id, count in zip(task_ids, counts, strict=True) if count
+            for user_id in {next(users) for _ in range(count)}
+        ]
+
+
+def _uuid(rnd: random.Random) -> uuid.UUID:
+    """A random version 4 UUID, of the subclass of asyncpg that COPY encodes without calling Python code."""
+    return UUID(((rnd.getrandbits(128) & _UUID_RANDOM_BITS) | _UUID_VERSION_BITS).to_bytes(16))
+
+
+def _poisson(rnd: random.Random, mean: float) -> int:
+    """Knuth's method, fast for the small means used here."""
+    limit, k, product = exp(-mean), 0, rnd.random()
+    while product > limit:
+        k += 1
+        product *= rnd.random()
+    return k
+
+
+def _ranking(rnd: random.Random, user_ids: Sequence[uuid.UUID], skew: float) -> _Ranking:
+    return _Ranking(
+        users=rnd.sample(user_ids, len(user_ids)),
+        cum_weights=list(accumulate(1 / rank ** skew for rank in range(1, len(user_ids) + 1))),
+    )
+
+
+def generate_users(rnd: random.Random, options: SeedOptions) -> list[tuple]:
+    """Returns the rows of the users, they join during the first half of the period."""
+    rows = []
+    for number in range(options.users):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        rows.append((
+            _uuid(rnd),
+            f'{first} {last}',
+            f'{first.lower()}.{last.lower()}.{number}@{EMAIL_DOMAIN}',
+            EPOCH + PERIOD / 2 * rnd.random(),
+        ))
+    return rows
+
+
+def generate_tasks(
+        rnd: random.Random,
+        options: SeedOptions,
+        user_ids: Sequence[uuid.UUID],
+) -> Iterator[tuple[list[tuple], list[tuple], list[tuple]]]:
+    """Yields the rows of the tasks, the watchers and the executors chunk by chunk.
+
+    The tasks are created one after another over the period, as the service would create them.
+    """
+    authors, assignees, watchers, executors = (_ranking(rnd, user_ids, options.skew) for _ in range(4))
+    statuses, status_weights = [status.name for status in options.statuses], list(options.statuses.values())
+
+    for start in range(0, options.tasks, options.chunk_size):
+        size = min(options.chunk_size, options.tasks - start)
+        task_ids = [_uuid(rnd) for _ in range(size)]
+        chunk_titles = rnd.choices(TITLES, k=size)
+        chunk_statuses = rnd.choices(statuses, weights=status_weights, k=size)
+        chunk_authors, chunk_assignees = authors.draw(rnd, size), assignees.draw(rnd, size)
+        task_rows = []
+        for offset, (task_id, title, status, author, assignee) in enumerate(
+                zip(task_ids, chunk_titles, chunk_statuses, chunk_authors, chunk_assignees, strict=True),
+        ):
+            number = start + offset
+            task_rows.append((
+                task_id,
+                f'{title} #{number + 1}',
+                f'{title}, reported by a customer.' if rnd.random() < 0.5 else None,  # noqa: PLR2004
+                status,
+                EPOCH + PERIOD * ((number + rnd.random()) / options.tasks),
+                author,
+                None if rnd.random() < options.unassigned else assignee,
+                1,
+            ))
+        yield (
+            task_rows,
+            watchers.members(rnd, task_ids, options.watchers),
+            executors.members(rnd, task_ids, options.executors),
+        )
+
+
+async def seed(connection: asyncpg.Connection, options: SeedOptions) -> Counter[str]:
+    """Generates the dataset and copies it into the tables in the transaction of the connection.
+
+    :return: The number of rows by table.
+    """
+    rnd = random.Random(options.seed)  # noqa: S311
+    counts: Counter[str] = Counter()
+
+    users = generate_users(rnd, options)
+    await connection.copy_records_to_table('users', records=users, columns=USER_COLUMNS)
+    counts['users'] = len(users)
+
+    for task_rows, watcher_rows, executor_rows in generate_tasks(rnd, options, [row[0] for row in users]):
+        await connection.copy_records_to_table('tasks', records=task_rows, columns=TASK_COLUMNS)
+        await connection.copy_records_to_table('watchers', records=watcher_rows, columns=MEMBER_COLUMNS)
+        await connection.copy_records_to_table('executors', records=executor_rows, columns=MEMBER_COLUMNS)
+        counts.update(tasks=len(task_rows), watchers=len(watcher_rows), executors=len(executor_rows))
+        print(f'{counts["tasks"]} of {options.tasks} tasks', file=sys.stderr)  # noqa: T201
+    return counts
+
+
+async def drop_secondary_indexes(connection: asyncpg.Connection, tables: Sequence[str] = TABLES) -> list[str]:
+    """Drops the indexes of the tables that back no constraint.
+
+    :return: The statements creating them again.
+    """
+    indexes = await connection.fetch(_SECONDARY_INDEXES, list(tables))
+    for name, _ in indexes:
+        await connection.execute(f'DROP INDEX {name}')
+    return [definition for _, definition in indexes]
+
+
+async def drop_foreign_keys(connection: asyncpg.Connection, tables: Sequence[str] = TABLES) -> list[str]:
+    """Drops the foreign keys of the tables.
+
+    Adding one back checks all the rows with a single join instead of a lookup per inserted row.
+
+    :return: The statements adding them again.
+    """
+    foreign_keys = await connection.fetch(_FOREIGN_KEYS, list(tables))
+    for table, name, _ in foreign_keys:
+        await connection.execute(f'ALTER TABLE {table} DROP CONSTRAINT {name}')
+    return [f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}' for table, name, definition in foreign_keys]
+
+
+async def disable_counting(connection: asyncpg.Connection) -> list[str]:
+    """Stops the counting of the inserted tasks statement by statement.
+
+    :return: The statements counting all the tasks at once and enabling the counting again.
+    """
+    await connection.execute('ALTER TABLE tasks DISABLE TRIGGER count_inserted_tasks')
+    return [RECOUNT_TASKS, 'ALTER TABLE tasks ENABLE TRIGGER count_inserted_tasks']
+
+
+async def defer_checks(connection: asyncpg.Connection) -> list[str]:
+    """Drops the foreign keys and the secondary indexes and stops the counting of the tasks.
+
+    :return: The statements restoring them, to be run after the load.
+    """
+    return [
+        *await drop_foreign_keys(connection),
+        *await drop_secondary_indexes(connection),
+        *await disable_counting(connection),
+    ]
+
+
+def parse_statuses(value: str) -> dict[Status, float]:
+    """Parses `status=weight,...`, e.g. `todo=30,in_progress=20,done=50`."""
+    statuses = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        try:
+            statuses[Status(name.strip())] = float(weight)
+        except ValueError:
+            err_msg = f'Expected status=weight with one of {", ".join(status.value for status in Status)}: {item!r}'
+            raise argparse.ArgumentTypeError(err_msg) from None
+    return statuses
+
+
+async def main(options: SeedOptions, *, truncate: bool, defer: bool) -> None:
+    # Imported here, so that the generation needs no database settings.
+    from src.database.db import async_engine  # noqa: PLC0415
+
+    started = time.perf_counter()
+    async with async_engine.connect() as sa_connection:
+        connection = (await sa_connection.get_raw_connection()).driver_connection
+        # The pools limit the statements of the service, not the load, and the indexes of millions
+        # of rows are sorted in memory rather than in temporary files.
+        await connection.execute("SET statement_timeout = 0; SET maintenance_work_mem = '1GB'")
+        async with connection.transaction():
+            if truncate:
+                await connection.execute(f'TRUNCATE {", ".join(TABLES)}')
+            restore = await defer_checks(connection) if defer else []
+            counts = await seed(connection, options)
+            for statement in restore:
+                await connection.execute(statement)
+        await connection.execute(f'ANALYZE {", ".join(TABLES)}')
+    await async_engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    rows = sum(counts.values())
+    print(', '.join(f'{count} {table}' for table, count in counts.items()))  # noqa: T201
+    print(f'{rows} rows in {elapsed:.1f} s, {rows / elapsed:.0f} rows/s')  # noqa: T201
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=SeedOptions.users)
+    parser.add_argument('--tasks', type=int, default=SeedOptions.tasks)
+    parser.add_argument('--watchers', type=float, default=SeedOptions.watchers, help='mean number per task')
+    parser.add_argument('--executors', type=float, default=SeedOptions.executors, help='mean number per task')
+    parser.add_argument('--skew', type=float, default=SeedOptions.skew, help='Zipf exponent of the user activity')
+    parser.add_argument('--unassigned', type=float, default=SeedOptions.unassigned, help='share of the tasks')
+    parser.add_argument('--statuses', type=parse_statuses, default=DEFAULT_STATUS_MIX, help='todo=30,done=70')
+    parser.add_argument('--seed', type=int, default=SeedOptions.seed)
+    parser.add_argument('--chunk-size', type=int, default=SeedOptions.chunk_size)
+    parser.add_argument('--truncate', action='store_true', help='delete all users and tasks first')
+    parser.add_argument('--defer', action='store_true', help='index, check and count after the load')
+    args = parser.parse_args()
+    options = SeedOptions(
+        users=args.users,
+        tasks=args.tasks,
+        watchers=args.watchers,
+        executors=args.executors,
+        skew=args.skew,
+        unassigned=args.unassigned,
+        statuses=args.statuses,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+    asyncio.run(main(options, truncate=args.truncate, defer=args.defer))
@@ -0,0 +1,64 @@
+"""The module contains the queues that admit the requests to the database.
+
+A request waiting for a pool checkout holds its client, a worker slot and memory until the pool timeout,
+so under a burst every request gets slow. Requests are admitted up to a limit below the pool size instead,
+a few more wait in a short queue and the rest are refused at once, while the admitted ones stay fast.
+"""
+
+import asyncio
+from collections import deque
+
+
+class AdmissionQueue:
+    """Admits at most `limit` requests at a time, at most `depth` more wait in the order of arrival."""
+
+    def __init__(self, limit: int, depth: int) -> None:
+        self.limit = limit
+        self.depth = depth
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, max_wait: float) -> bool:
+        """Waits up to `max_wait` seconds for a free slot.
+
+        :param max_wait: longest time in the queue, in seconds.
+        :return: `False` when the queue is full or the request waited too long, so it is to be refused.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.depth:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(max_wait):
+                await waiter
+        except TimeoutError:
+            self._abandon(waiter)
+            return False
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        """Frees the slot of an admitted request, it passes straight to the first waiting one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was passed to the request at the moment it gave up.
+            self.release()
+        elif waiter in self._waiters:
+            self._waiters.remove(waiter)
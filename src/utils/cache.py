@@ -0,0 +1,109 @@
+"""The module contains an in-process cache."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Generic, TypeVar
+from uuid import UUID
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from src.schemas.tasks import SparseTaskDB
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire `ttl` seconds after they were stored.
+
+    The cache lives in a single process, so with several workers an entry may stay stale
+    in the other processes for up to `ttl` seconds after an invalidation.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    __slots__ = (
+        '_data',
+        '_invalidations',
+        '_timer',
+        'evictions',
+        'expirations',
+        'hits',
+        'maxsize',
+        'misses',
+        'ttl',
+    )
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._timer = timer
+        self._invalidations = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Returns the cached value or None if there is no fresh entry for the key."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def read_marker(self) -> int:
+        """Returns a marker to be taken before reading the value from the source and passed to `set`."""
+        return self._invalidations
+
+    def set(self, key: K, value: V, marker: int | None = None) -> None:
+        """Stores the value, evicting the least recently used entry if the cache is full.
+
+        If a `marker` is given and something was invalidated after it was taken, the value may be
+        older than the invalidated data and is not stored.
+        """
+        if self.maxsize <= 0 or (marker is not None and marker != self._invalidations):
+            return
+
+        self._data[key] = (self._timer() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Removes the entry for the key."""
+        self._invalidations += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        self._invalidations += 1
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters used to size the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+# Single tasks with all their columns, shared by the services that read or change tasks.
+task_cache: TTLCache[UUID, 'SparseTaskDB'] = TTLCache(maxsize=settings.TASK_CACHE_SIZE, ttl=settings.TASK_CACHE_TTL)
@@ -0,0 +1,48 @@
+"""The module contains the state behind the read-your-writes guarantee of replica reads.
+
+After a write the client receives the WAL position (LSN) of the primary in the `X-DB-LSN` header
+and sends it back with the following requests. A read-only transaction of such a request is served
+by the replica only if the replica has already replayed that position, otherwise by the primary.
+"""
+
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+_LSN_PATTERN = re.compile(r'([0-9A-Fa-f]{1,8})/([0-9A-Fa-f]{1,8})')
+
+
+def parse_lsn(value: str | None) -> int | None:
+    """Converts a textual `pg_lsn` such as `16/B374D848` to a number, returns None if the value is malformed."""
+    match = _LSN_PATTERN.fullmatch(value or '')
+    if match is None:
+        return None
+    return (int(match[1], 16) << 32) | int(match[2], 16)
+
+
+def format_lsn(lsn: int) -> str:
+    """Converts a number back to the textual `pg_lsn` form."""
+    return f'{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}'
+
+
+@dataclass(slots=True)
+class ConsistencyState:
+    """WAL positions the reads of the current request must observe."""
+
+    client_lsn: int | None = None  # sent by the client after its previous writes
+    written_lsn: int | None = None  # reached by the writes of the current request
+    primary_only: bool = False  # a write of the current request has an unknown position
+
+    @property
+    def required_lsn(self) -> int | None:
+        return max((lsn for lsn in (self.client_lsn, self.written_lsn) if lsn is not None), default=None)
+
+    def record_write(self, lsn: int) -> None:
+        self.written_lsn = max(lsn, self.written_lsn or 0)
+
+    def record_unknown_write(self) -> None:
+        """Sends the following reads of the request to the primary, as the replica cannot be checked for the write."""
+        self.primary_only = True
+
+
+consistency_state: ContextVar[ConsistencyState | None] = ContextVar('consistency_state', default=None)
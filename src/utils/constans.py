@@ -2,6 +2,27 @@
 INTEGRITY_ERROR = 'Integrity error'
 NOT_FOUND_ERROR = 'No result found for the given query.'
 TASK_UPDATE_VALIDATION_ERROR = 'At least one field must be provided for update'
+INVALID_CURSOR_ERROR = 'Invalid pagination cursor'
+DUPLICATE_TASK_IDS_ERROR = 'Each task may be updated only once per batch'
+UNKNOWN_TASK_FIELDS_ERROR = 'Unknown task fields requested: {}'
+TASK_PRECONDITION_FAILED_ERROR = 'The task does not have the expected version or status.'
+MEMBERSHIP_OVERLAP_ERROR = 'The same ID cannot be both added and removed'
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+DB_LSN_HEADER = 'X-DB-LSN'
+SERVER_TIMING_HEADER = 'Server-Timing'
+BULK_CREATE_MAX_SIZE = 50_000
+BULK_CREATE_CHUNK_SIZE = 1000
+BULK_COPY_MIN_ROWS = 100
+BATCH_UPDATE_MAX_SIZE = 1000
+MEMBERSHIP_CHANGE_MAX_SIZE = 10_000
+TASK_FIELDS = frozenset(
+    {'id', 'title', 'description', 'status', 'created_at', 'author_id', 'assignee_id', 'version'},
+)
+TASK_RELATIONSHIPS = frozenset({'watchers', 'executors'})
 
 
 class Tags:
@@ -10,3 +31,4 @@ class Tags:
     USER_V1 = 'User | v1'
     TASKS_V1 = 'Tasks | v1'
     HEALTHZ = 'healthz'
+    MONITORING = 'monitoring'
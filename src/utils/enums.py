@@ -5,3 +5,28 @@ class Status(enum.Enum):
     TODO = 'todo'
     IN_PROGRESS = 'in_progress'
     DONE = 'done'
+
+
+class TaskRole(enum.Enum):
+    AUTHOR = 'author'
+    ASSIGNEE = 'assignee'
+
+
+class Membership(enum.Enum):
+    WATCHERS = 'watchers'
+    EXECUTORS = 'executors'
+
+
+class UserTaskRole(enum.Enum):
+    AUTHOR = 'author'
+    ASSIGNEE = 'assignee'
+    WATCHER = 'watcher'
+    EXECUTOR = 'executor'
+
+
+class Pool(enum.Enum):
+    """Connection pools of the primary, one per workload."""
+
+    INTERACTIVE = 'interactive'
+    REPORTING = 'reporting'
+    BULK = 'bulk'
@@ -0,0 +1,70 @@
+"""The module contains helpers for entity tags (ETags) and conditional requests."""
+
+import hashlib
+import re
+from collections.abc import Iterable
+
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+_DIGEST_SIZE = 16
+# Versions fit into a BIGINT column.
+_VERSION_ETAG = re.compile(r'"([0-9]{1,18})"')
+
+
+def version_etag(version: int) -> str:
+    """Builds the strong ETag of an entry from its row version.
+
+    :param version: Version of the entry, incremented on every change.
+    :return: Quoted ETag.
+    """
+    return f'"{version}"'
+
+
+def digest_etag(parts: Iterable[str]) -> str:
+    """Builds the strong ETag of a collection from the parts identifying its content.
+
+    :param parts: Strings that change whenever the collection changes, e.g. the IDs and versions of the entries.
+    :return: Quoted ETag.
+    """
+    digest = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks whether the ETag is listed in the `If-None-Match` header.
+
+    The comparison is weak, as the header requires, so `W/"1"` matches `"1"`.
+
+    :param if_none_match: Value of the header, may be missing.
+    :param etag: Current ETag of the resource.
+    :return: True if the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def if_match_versions(if_match: str) -> frozenset[int] | None:
+    """Extracts the versions listed in the `If-Match` header.
+
+    The comparison is strong, as the header requires, so weak tags and tags of other kinds match no version.
+
+    :param if_match: Value of the header.
+    :return: The listed versions, None for `*` that matches any version.
+    """
+    if if_match.strip() == '*':
+        return None
+    return frozenset(
+        int(match.group(1)) for tag in if_match.split(',') if (match := _VERSION_ETAG.fullmatch(tag.strip()))
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Builds the bodiless response telling the client that its copy is still current."""
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
@@ -0,0 +1,111 @@
+"""The module contains the statistics of the database work of the current request.
+
+The statistics are collected by the events of the engines, so every statement, transaction and pool checkout
+of the request is counted, whichever session, repository or unit of work runs it. Outside of a request,
+e.g. in the tools and the benchmarks, nothing is collected.
+"""
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from src.utils.metrics import POOL_WAIT
+
+_QUERY_STARTED = 'instrumentation_query_started'
+_TRANSACTION_STARTED = 'instrumentation_transaction_started'
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    """Database work of a request, the durations are in seconds."""
+
+    queries: int = 0
+    query_time: float = 0.0
+    pool_wait: float = 0.0
+    transaction_time: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def server_timing(self) -> str:
+        """Value of the `Server-Timing` header, the durations are in milliseconds as the header requires."""
+        return (
+            f'db;dur={self.query_time * 1000:.2f};desc="{self.queries} queries", '
+            f'db-pool;dur={self.pool_wait * 1000:.2f}, '
+            f'db-tx;dur={self.transaction_time * 1000:.2f}'
+        )
+
+    def add_query(self, statement: str, duration: float) -> None:
+        self.queries += 1
+        self.query_time += duration
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run more than `threshold` times, usually a query per item of a loaded list."""
+        return [(statement, count) for statement, count in self.statements.items() if count > threshold]
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar('request_timings', default=None)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool measuring the time to check out a connection, opening a new one included.
+
+    The pool has no event before a checkout, so the wait is measured around it. It is added to the statistics
+    of the current request and observed by the metric labelled with `pool_logging_name` of the engine.
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait = perf_counter() - started
+            POOL_WAIT.observe(wait, self.logging_name or 'default')
+            timings = request_timings.get()
+            if timings is not None:
+                timings.pool_wait += wait
+
+
+def record_query(statement: str, started: float) -> None:
+    """Adds a statement run on the driver connection past the engine events, e.g. COPY, to the current request."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings.add_query(statement, perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Subscribes the statistics of the current request to the statements and transactions of the engine."""
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine.sync_engine, 'begin', _begin)
+    event.listen(engine.sync_engine, 'commit', _end)
+    event.listen(engine.sync_engine, 'rollback', _end)
+
+
+def _before_cursor_execute(connection: Connection, *_: Any) -> None:
+    if request_timings.get() is not None:
+        connection.info[_QUERY_STARTED] = perf_counter()
+
+
+def _after_cursor_execute(connection: Connection, _cursor: Any, statement: str, *_: Any) -> None:
+    started = connection.info.pop(_QUERY_STARTED, None)
+    timings = request_timings.get()
+    if started is not None and timings is not None:
+        timings.add_query(statement, perf_counter() - started)
+
+
+def _begin(connection: Connection) -> None:
+    if request_timings.get() is not None:
+        connection.info[_TRANSACTION_STARTED] = perf_counter()
+
+
+def _end(connection: Connection) -> None:
+    started = connection.info.pop(_TRANSACTION_STARTED, None)
+    timings = request_timings.get()
+    if started is not None and timings is not None:
+        timings.transaction_time += perf_counter() - started
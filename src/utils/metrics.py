@@ -0,0 +1,164 @@
+"""The module contains the in-process metrics of the service in the Prometheus text format.
+
+The metrics are plain counters updated on the event loop thread, an observation is a dictionary lookup
+and a binary search over the buckets, so recording them costs microseconds per request.
+The values are per process, the scraper sums them over the workers.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+# The charset is appended by the response.
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4'
+
+# From a cached read to a slow page, in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+_LABEL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], bound: str | None = None) -> str:
+    pairs = [f'{name}="{value.translate(_LABEL_ESCAPES)}"' for name, value in zip(names, values, strict=True)]
+    if bound is not None:
+        pairs.append(f'le="{bound}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric(ABC):
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def render(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Yields the sample lines of the metric."""
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f'{self.name}{_labels(self.label_names, labels)} {value}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+@dataclass(slots=True)
+class _Series:
+    counts: list[int]  # observations per bucket, the last one is +Inf
+    sum: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels: Iterable[str] = (),
+            buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series([0] * (len(self.buckets) + 1))
+        # The bucket bounds are inclusive, as `le` says.
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def _samples(self) -> Iterable[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), series.counts, strict=True):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(self.label_names, labels, str(bound))} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.label_names, labels)} {series.sum}'
+            yield f'{self.name}_count{_labels(self.label_names, labels)} {series.count}'
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time to the end of the response, by route template.',
+    ('method', 'route', 'status'),
+)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being processed.')
+REQUESTS_IN_FLIGHT.set(0)
+REQUESTS_REJECTED = Counter('http_requests_rejected_total', 'Requests refused by the admission control.', ('lane',))
+TRANSACTION_DURATION = Histogram(
+    'uow_transaction_duration_seconds',
+    'Duration of the UnitOfWork transactions that used the database, the count is the number of commits, '
+    'rollbacks and read-only transactions.',
+    ('outcome',),
+)
+POOL_WAIT = Histogram('db_pool_wait_seconds', 'Time to check out a connection from the pool.', ('pool',))
+POOL_SIZE = Gauge('db_pool_size', 'Connections the pool keeps open.', ('pool',))
+POOL_CONNECTIONS = Gauge('db_pool_connections', 'Connections currently open, overflow included.', ('pool',))
+POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Connections in use.', ('pool',))
+POOL_OVERFLOW = Gauge('db_pool_overflow', 'Connections open above the pool size.', ('pool',))
+
+METRICS = (
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    REQUESTS_REJECTED,
+    TRANSACTION_DURATION,
+    POOL_WAIT,
+    POOL_SIZE,
+    POOL_CONNECTIONS,
+    POOL_CHECKED_OUT,
+    POOL_OVERFLOW,
+)
+
+
+def update_pool_gauges(engines: Mapping[str, AsyncEngine]) -> None:
+    """Reads the current state of the connection pools of the engines."""
+    for name, engine in engines.items():
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        # The overflow counts from minus the pool size while the pool is not yet full.
+        POOL_SIZE.set(pool.size(), name)
+        POOL_CONNECTIONS.set(pool.size() + pool.overflow(), name)
+        POOL_CHECKED_OUT.set(pool.checkedout(), name)
+        POOL_OVERFLOW.set(max(pool.overflow(), 0), name)
+
+
+def render(metrics: Iterable[_Metric] = METRICS) -> str:
+    """Renders the metrics in the Prometheus text exposition format."""
+    return ''.join(f'{line}\n' for metric in metrics for line in metric.render())
@@ -0,0 +1,46 @@
+"""The module contains helpers for keyset (cursor) pagination."""
+
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+from src.utils.constans import INVALID_CURSOR_ERROR
+
+_SEPARATOR = '|'
+
+Cursor = tuple[datetime, UUID]
+
+
+class InvalidCursorError(ValueError):
+    """Custom exception for malformed pagination cursors."""
+
+
+def encode_cursor(created_at: datetime, obj_id: UUID) -> str:
+    """Packs the position of an entry into an opaque cursor.
+
+    :param created_at: Creation date of the last entry on the page.
+    :param obj_id: ID of the last entry on the page.
+    :return: URL-safe cursor string.
+    """
+    raw = f'{created_at.isoformat()}{_SEPARATOR}{obj_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Unpacks a cursor created by `encode_cursor`.
+
+    :param cursor: Cursor received from the client.
+    :return: Creation date and ID of the entry the cursor points to.
+    :raises InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, obj_id = raw.split(_SEPARATOR)
+        position = datetime.fromisoformat(created_at), UUID(obj_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(INVALID_CURSOR_ERROR)
+    # The creation dates are stored without a time zone and cannot be compared with an aware one.
+    if position[0].tzinfo is not None:
+        raise InvalidCursorError(INVALID_CURSOR_ERROR)
+    return position
@@ -1,17 +1,21 @@
 """The module contains base classes for working with databases."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable, Sequence
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator, Sequence
 from functools import wraps
+from time import perf_counter
 from typing import TYPE_CHECKING, Any, Generic, Never, TypeVar
 from uuid import UUID
 
-from sqlalchemy import delete, insert, select, update
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from sqlalchemy import Column, delete, insert, select, update
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models import BaseModel
-from src.utils.constans import INTEGRITY_ERROR, NOT_FOUND_ERROR
+from src.utils.constans import BULK_COPY_MIN_ROWS, INTEGRITY_ERROR, NOT_FOUND_ERROR
+from src.utils.instrumentation import record_query
 
 if TYPE_CHECKING:
     from sqlalchemy.engine import Result
@@ -98,7 +102,7 @@ class SqlAlchemyRepository(AbstractRepository, Generic[M]):
                 return await func(*args, **kwargs)
             except NoResultFound:
                 raise SqlAlchemyRepository.NotFoundError(NOT_FOUND_ERROR)
-            except IntegrityError as e:
+            except (IntegrityError, IntegrityConstraintViolationError) as e:
                 raise SqlAlchemyRepository.IntegrityError(INTEGRITY_ERROR) from e
 
         return wrapper
@@ -125,8 +129,71 @@ class SqlAlchemyRepository(AbstractRepository, Generic[M]):
 
     @__transform_exception
     async def bulk_add(self, values: Sequence[dict[str, Any]]) -> None:
-        query = insert(self._model).values(values)
-        await self._session.execute(query)
+        """Inserts the entries with a strategy chosen by their number.
+
+        Small batches are sent as one prepared INSERT executed for every row,
+        large ones are streamed with the binary COPY protocol.
+        Neither puts all the rows into the parameters of a single statement, so there is no limit on the batch size.
+        Entries are inserted in groups with the same keys, so a column missing from an entry gets its default
+        even when other entries set it.
+        """
+        shapes: defaultdict[frozenset[str], list[dict[str, Any]]] = defaultdict(list)
+        for row in values:
+            shapes[frozenset(row)].append(row)
+
+        for rows in shapes.values():
+            if len(rows) < BULK_COPY_MIN_ROWS:
+                await self._session.execute(insert(self._model), rows)
+            else:
+                await self._copy_records(rows)
+
+    async def _copy_records(self, values: Sequence[dict[str, Any]]) -> None:
+        """Inserts the entries through `COPY ... FROM STDIN (FORMAT binary)` on the connection of the session.
+
+        COPY bypasses SQLAlchemy, so Python-side column defaults and type conversions are applied here,
+        and it is added to the statistics of the request explicitly. All the entries have the same keys,
+        columns missing from them and without Python-side defaults get their server defaults.
+        """
+        await self._session.flush()
+        connection = await self._session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        if not driver_connection.is_in_transaction():
+            # BEGIN is sent lazily with the first statement, usually the statement timeout of the pool,
+            # COPY on the driver would run outside of the transaction.
+            await connection.execute(select(1))
+
+        keys = values[0].keys()
+        columns = [column for column in self._model.__table__.columns if column.key in keys or column.default]
+        dialect = connection.dialect
+        processors = [column.type.bind_processor(dialect) for column in columns]
+
+        def records() -> Iterator[tuple[Any, ...]]:
+            for row in values:
+                record = []
+                for column, processor in zip(columns, processors, strict=True):
+                    value = row[column.key] if column.key in row else self._python_default(column)
+                    record.append(processor(value) if processor and value is not None else value)
+                yield tuple(record)
+
+        column_names = [column.name for column in columns]
+        started = perf_counter()
+        await driver_connection.copy_records_to_table(
+            self._model.__table__.name,
+            schema_name=self._model.__table__.schema,
+            columns=column_names,
+            records=records(),
+        )
+        record_query(f'COPY {self._model.__table__.fullname} ({", ".join(column_names)}) FROM STDIN', started)
+
+    @staticmethod
+    def _python_default(column: Column) -> Any:
+        """Returns the value of the Python-side default of the column or None if it has no such default."""
+        default = column.default
+        if default is None:
+            return None
+        if default.is_callable:
+            return default.arg(None)
+        return default.arg
 
     @__transform_exception
     async def get_by_filter_one_or_none(self, **kwargs: Any) -> M | None:
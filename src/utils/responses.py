@@ -0,0 +1,18 @@
+"""The module contains response classes."""
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+class TrustedJSONResponse(Response):
+    """JSON response rendered from a pydantic model by its own serializer, without validating it first.
+
+    FastAPI validates a model returned by an endpoint against the response model before serializing it.
+    Models built from database rows with `model_construct` are valid already, returning them in this response
+    skips that pass. Fields that were not set are omitted, as with `response_model_exclude_unset`.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content: BaseModel) -> bytes:  # noqa: PLR6301
+        return content.__pydantic_serializer__.to_json(content, exclude_unset=True)
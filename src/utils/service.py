@@ -1,42 +1,57 @@
 """The module contains base service."""
 import functools
+import inspect
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable, Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from typing import Any, Never, TypeVar, overload
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
 from starlette.status import HTTP_404_NOT_FOUND
 
+from src.utils.enums import Pool
 from src.utils.repository import AbstractRepository
 from src.utils.unit_of_work import AbstractUnitOfWork, UnitOfWork
 
-T = TypeVar('T', bound=Callable[..., Awaitable[Any]])
+T = TypeVar('T', bound=Callable[..., Awaitable[Any] | AsyncIterator[Any]])
+
+# Key of the `openapi_extra` of a route naming the pool its transactions use.
+POOL_EXTRA = 'x-db-pool'
 
 
 @overload
 def transaction_mode(_func: T) -> T: ...
 @overload
-def transaction_mode(*, auto_flush: bool) -> Callable[[T], T]: ...
-
-
-def transaction_mode(_func: T | None = None, *, auto_flush: bool = False) -> T | Callable[[T], T]:
+def transaction_mode(
+        *,
+        auto_flush: bool = False,
+        read_only: bool = False,
+        pool: Pool = Pool.INTERACTIVE,
+) -> Callable[[T], T]: ...
+
+
+def transaction_mode(
+        _func: T | None = None,
+        *,
+        auto_flush: bool = False,
+        read_only: bool = False,
+        pool: Pool = Pool.INTERACTIVE,
+) -> T | Callable[[T], T]:
     """Wraps the function in transaction mode.
     Checks if the UnitOfWork context manager is open.
     If not, then opens the context manager and opens a transaction.
+    Async generator functions keep the transaction open until the generator is exhausted or closed.
+    Functions marked as `read_only` may be served by the replica when they open the transaction themselves.
+    The `pool` of the workload is used only when the function opens the transaction, nested calls share
+    the connection of the outer one. It is kept in the `transaction_pool` attribute of the wrapped function.
     """
 
     def decorator(func: T) -> T:
-        @functools.wraps(func)
-        async def wrapper(self: AbstractService, *args: Any, **kwargs: Any) -> Any:
-            if self.uow.is_open:
-                res = await func(self, *args, **kwargs)
-                if auto_flush:
-                    await self.uow.flush()
-                return res
-            async with self.uow:
-                return await func(self, *args, **kwargs)
-
+        if inspect.isasyncgenfunction(func):
+            wrapper = _wrap_async_generator(func, auto_flush=auto_flush, read_only=read_only, pool=pool)
+        else:
+            wrapper = _wrap_coroutine(func, auto_flush=auto_flush, read_only=read_only, pool=pool)
+        wrapper.transaction_pool = pool
         return wrapper
 
     if _func is None:  # Using with parameters: @transaction_mode(auto_flush=True)
@@ -44,6 +59,52 @@ def transaction_mode(_func: T | None = None, *, auto_flush: bool = False) -> T |
     return decorator(_func)  # Using without parameters: @transaction_mode
 
 
+def pool_extra(method: Callable[..., Any]) -> dict[str, str]:
+    """Returns the `openapi_extra` of a route whose transaction is opened by the service method.
+
+    The route declares the pool of the method, so that the admission control queues its requests against it.
+    """
+    return {POOL_EXTRA: method.transaction_pool.value}
+
+
+def _check_nested_call(uow: UnitOfWork, func: Callable[..., Any], *, read_only: bool) -> None:
+    if uow.read_only and not read_only:
+        err_msg = f"'{func.__qualname__}' cannot be called inside a read-only transaction"
+        raise RuntimeError(err_msg)
+
+
+def _wrap_coroutine(func: T, *, auto_flush: bool, read_only: bool, pool: Pool) -> T:
+    @functools.wraps(func)
+    async def wrapper(self: AbstractService, *args: Any, **kwargs: Any) -> Any:
+        if self.uow.is_open:
+            _check_nested_call(self.uow, func, read_only=read_only)
+            res = await func(self, *args, **kwargs)
+            if auto_flush:
+                await self.uow.flush()
+            return res
+        async with self.uow(read_only=read_only, pool=pool):
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _wrap_async_generator(func: T, *, auto_flush: bool, read_only: bool, pool: Pool) -> T:
+    @functools.wraps(func)
+    async def wrapper(self: AbstractService, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        if self.uow.is_open:
+            _check_nested_call(self.uow, func, read_only=read_only)
+            async for item in func(self, *args, **kwargs):
+                yield item
+            if auto_flush:
+                await self.uow.flush()
+            return
+        async with self.uow(read_only=read_only, pool=pool):
+            async for item in func(self, *args, **kwargs):
+                yield item
+
+    return wrapper
+
+
 class AbstractService(ABC):
     """An abstract class that implements CRUD operations at the service level."""
 
@@ -1,17 +1,37 @@
 """The module contains base classes for supporting transactions."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import suppress
+from time import perf_counter
 from types import TracebackType
-from typing import Any, Never
+from typing import Any, ClassVar, Never, Self
 
-from src.database.db import async_session_maker
-from src.repositories import UserRepository
-from src.repositories.task import TaskRepository
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from src.database.db import (
+    async_engine,
+    read_only_session_makers,
+    replica_session_maker,
+    session_makers,
+)
+from src.repositories import ExecutorRepository, TaskRepository, UserRepository, WatcherRepository
+from src.utils.consistency import consistency_state
+from src.utils.enums import Pool
+from src.utils.metrics import TRANSACTION_DURATION
+from src.utils.repository import SqlAlchemyRepository
 
 
 class AbstractUnitOfWork(ABC):
     is_open: bool
+    task: TaskRepository
     user: UserRepository
+    watcher: WatcherRepository
+    executor: ExecutorRepository
 
     @abstractmethod
     def __init__(self) -> Never:
@@ -38,24 +58,73 @@ class AbstractUnitOfWork(ABC):
     async def rollback(self) -> Never:
         raise NotImplementedError
 
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], Any]) -> Never:
+        raise NotImplementedError
+
 
 class UnitOfWork(AbstractUnitOfWork):
-    """The class responsible for the atomicity of transactions."""
+    """The class responsible for the atomicity of transactions.
+
+    The session and the repositories are created on the first access to a repository,
+    so a transaction that does not touch the database does not take a connection from the pool.
+    """
 
     __slots__ = (
+        '_after_commit',
+        '_on_replica',
+        '_pool',
+        '_read_only',
         '_session',
+        '_started',
+        'executor',
         'is_open',
         'task',
         'user',
+        'watcher',
     )
 
+    _repositories: ClassVar[dict[str, type[SqlAlchemyRepository]]] = {
+        'task': TaskRepository,
+        'user': UserRepository,
+        'watcher': WatcherRepository,
+        'executor': ExecutorRepository,
+    }
+
     def __init__(self) -> None:
         self.is_open = False
+        self._session: AsyncSession | None = None
+        self._read_only = False
+        self._on_replica = False
+        self._pool = Pool.INTERACTIVE
+        self._after_commit: list[Callable[[], Any]] = []
+        self._started = 0.0
+
+    def __call__(self, *, read_only: bool = False, pool: Pool = Pool.INTERACTIVE) -> Self:
+        """Sets the options of the next transaction: `async with uow(read_only=True): ...`.
+
+        Read-only transactions are served by the replica if it is configured and has replayed
+        the writes the current request must observe. They start with `BEGIN READ ONLY` and
+        are rolled back instead of being committed. Transactions on the primary take a connection
+        from the pool of their workload.
+        """
+        self._read_only = read_only
+        self._pool = pool
+        return self
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def on_replica(self) -> bool:
+        """Whether the transaction reads from the replica, whose data may lag behind the primary."""
+        return self._on_replica
 
     async def __aenter__(self) -> None:
-        self._session = async_session_maker()
-        self.user: UserRepository = UserRepository(self._session)
-        self.task: TaskRepository = TaskRepository(self._session)
+        self._after_commit = []
+        self._started = perf_counter()
+        self._session = await self._check_replica()
         self.is_open = True
 
     async def __aexit__(
@@ -64,26 +133,132 @@ class UnitOfWork(AbstractUnitOfWork):
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
-        if not exc_type:
-            await self._session.commit()
-        else:
-            await self.rollback()
-        await self._session.close()
+        try:
+            if not exc_type:
+                if self._session is not None and not self._read_only:
+                    wrote = self._session.in_transaction()
+                    await self._session.commit()
+                    self._run_after_commit()
+                    if wrote:
+                        await self._record_write()
+                else:
+                    self._run_after_commit()
+            else:
+                await self.rollback()
+                self._after_commit.clear()
+            self._observe_duration(failed=exc_type is not None)
+        finally:
+            await self._close()
+
+    def _observe_duration(self, *, failed: bool) -> None:
+        """Records the duration of the transaction, unless it never reached the database."""
+        if self._session is None:
+            return
+        outcome = 'rollback' if failed else 'read_only' if self._read_only else 'commit'
+        TRANSACTION_DURATION.observe(perf_counter() - self._started, outcome)
+
+    async def _close(self) -> None:
+        if self._session is not None:
+            # Read-only transactions end here: closing the session rolls them back.
+            await self._session.close()
+            self._session = None
+        for name in self._repositories:
+            with suppress(AttributeError):
+                delattr(self, name)
+        self._read_only = False
+        self._on_replica = False
+        self._pool = Pool.INTERACTIVE
         self.is_open = False
 
+    def _get_session(self) -> AsyncSession:
+        """Returns the session of the transaction, creating it on the first call."""
+        if self._session is None:
+            if not self._read_only:
+                self._session = session_makers[self._pool]()
+            elif replica_session_maker is not None:
+                self._session = replica_session_maker()
+                self._on_replica = True
+            else:
+                self._session = read_only_session_makers[self._pool]()
+        return self._session
+
+    async def _check_replica(self) -> AsyncSession | None:
+        """Opens the session right away if the replica has to be checked for the writes of the request.
+
+        :return: The session to be used or None if it can be created lazily.
+        """
+        state = consistency_state.get()
+        if not self._read_only or replica_session_maker is None or state is None:
+            return None
+        if state.primary_only:
+            return read_only_session_makers[self._pool]()
+        if state.required_lsn is None:
+            return None
+
+        session = replica_session_maker()
+
+        # The check runs in the transaction the reads will use, so they see at least the replayed state.
+        query = text('SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)')
+        try:
+            if await session.scalar(query, {'lsn': state.required_lsn}):
+                self._on_replica = True
+                return session
+        except DBAPIError as e:
+            logger.warning(f'Replica check failed, reading from the primary: {e}')
+        await session.close()
+        return read_only_session_makers[self._pool]()
+
+    @staticmethod
+    async def _record_write() -> None:
+        """Remembers the WAL position of the primary after the commit, so that later reads wait for the replica.
+
+        The write is already committed, so a failure only sends the later reads of the request to the primary.
+        """
+        state = consistency_state.get()
+        if state is None or replica_session_maker is None:
+            return
+        try:
+            async with async_engine.connect() as connection:
+                autocommit = await connection.execution_options(isolation_level='AUTOCOMMIT')
+                lsn = await autocommit.scalar(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"))
+        except (DBAPIError, PoolTimeoutError, TimeoutError) as e:
+            logger.warning(f'WAL position of a write is unknown, reading from the primary: {e}')
+            state.record_unknown_write()
+            return
+        state.record_write(int(lsn))
+
     async def flush(self) -> None:
-        await self._session.flush()
+        if self._session is not None:
+            await self._session.flush()
 
     async def rollback(self) -> None:
-        await self._session.rollback()
+        if self._session is not None:
+            await self._session.rollback()
+
+    def after_commit(self, callback: Callable[[], Any]) -> None:
+        """Registers a callback that is called only after the transaction has been successfully committed."""
+        self._after_commit.append(callback)
+
+    def _run_after_commit(self) -> None:
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """Returns a nested transaction, so that a failed part of the work can be rolled back alone."""
+        return self._get_session().begin_nested()
 
     async def session_add(self, obj: Any) -> None:
-        self._session.add(obj)
+        self._get_session().add(obj)
 
     async def session_refresh(self, obj: Any) -> None:
-        await self._session.refresh(obj)
+        await self._get_session().refresh(obj)
 
-    def __getattr__(self, name: str) -> None:
+    def __getattr__(self, name: str) -> SqlAlchemyRepository:
+        if name in self._repositories and self.is_open:
+            repository = self._repositories[name](self._get_session())
+            setattr(self, name, repository)
+            return repository
         err_msg = f"'{self.__class__.__name__}' object has no attribute '{name}'"
         if name in self.__slots__ and not self.is_open:
             err_msg = f"Attempting to access '{name}' with a closed UnitOfWork"
@@ -13,6 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engin
 from src.config import settings
 from src.main import app
 from src.models import BaseModel
+from src.utils.cache import task_cache
+from src.utils.instrumentation import InstrumentedPool, instrument_engine
 from src.utils.unit_of_work import UnitOfWork
 from tests.fixtures import FakeUnitOfWork
 
@@ -66,9 +68,11 @@ async def db_engine(create_test_db: None) -> AsyncGenerator[AsyncEngine, None]:
         settings.DB_URL,
         echo=False,
         future=True,
+        poolclass=InstrumentedPool,
         pool_size=50,
         max_overflow=100,
     ).execution_options(compiled_cache=None)
+    instrument_engine(engine)
 
     yield engine
 
@@ -115,6 +119,12 @@ async def transaction_session(db_engine: AsyncEngine) -> AsyncGenerator[AsyncSes
     await connection.close()
 
 
+@pytest.fixture(autouse=True)
+def _clear_task_cache() -> None:
+    """Drops cached tasks, so that they do not leak between TestCases sharing the same IDs."""
+    task_cache.clear()
+
+
 @pytest_asyncio.fixture
 def fake_uow(transaction_session: AsyncSession) -> FakeUnitOfWork:
     """Returns the test UnitOfWork for a particular test."""
@@ -1,3 +1,14 @@
 """Contains constants used in tests."""
 
+import base64
+
 BASE_ENDPOINT_URL = 'api/v1'
+
+# Size of the data seeded for the query plan tests, large enough for the planner to prefer the indexes.
+MANY_USERS = 1000
+MANY_TASKS = 10_000
+# Tasks generated by the seeder for the filter plan tests, the fewest for which the planner picks the indexes itself.
+SEEDED_TASKS = 20_000
+
+# The creation dates are stored without a time zone, a cursor with one can only be forged.
+AWARE_CURSOR = base64.urlsafe_b64encode(b'2024-01-01T00:00:00+03:00|9a1c1b6e-1f4e-4b8a-9a55-3c2f3c0b8d11').decode()
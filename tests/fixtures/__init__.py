@@ -14,7 +14,7 @@ from types import TracebackType
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.services import TaskService, UserService
-from src.repositories import TaskRepository, UserRepository
+from src.repositories import ExecutorRepository, TaskRepository, UserRepository, WatcherRepository
 from src.utils.service import BaseService
 from src.utils.unit_of_work import UnitOfWork
 from tests.fixtures import db_mocks, testing_cases
@@ -32,6 +32,8 @@ class FakeUnitOfWork(UnitOfWork):
     async def __aenter__(self) -> None:
         self.task = TaskRepository(self._session)
         self.user = UserRepository(self._session)
+        self.watcher = WatcherRepository(self._session)
+        self.executor = ExecutorRepository(self._session)
 
     async def __aexit__(
         self,
@@ -40,6 +42,10 @@ class FakeUnitOfWork(UnitOfWork):
         exc_tb: TracebackType | None,
     ) -> None:
         await self._session.flush()
+        if not exc_type:
+            self._run_after_commit()
+        else:
+            self._after_commit.clear()
 
 
 class FakeBaseService(BaseService):
@@ -1,9 +1,11 @@
 """The package contains basic data for tests for the postgres database."""
 
-from tests.fixtures.db_mocks.tasks import TASKS
+from tests.fixtures.db_mocks.tasks import EXECUTORS, TASKS, WATCHERS
 from tests.fixtures.db_mocks.users import USERS
 
 __all__ = (
+    'EXECUTORS',
     'TASKS',
     'USERS',
+    'WATCHERS',
 )
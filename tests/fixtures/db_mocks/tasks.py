@@ -21,3 +21,12 @@ TASKS = (
         'assignee_id': USERS[2]['id'],
     },
 )
+
+WATCHERS = (
+    {'task_id': TASKS[0]['id'], 'user_id': USERS[1]['id']},
+    {'task_id': TASKS[0]['id'], 'user_id': USERS[2]['id']},
+)
+
+EXECUTORS = (
+    {'task_id': TASKS[0]['id'], 'user_id': USERS[1]['id']},
+)
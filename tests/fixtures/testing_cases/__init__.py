@@ -14,6 +14,7 @@ from tests.fixtures.testing_cases.task_router import (
     TEST_TASK_ROUTE_CREATE_PARAMS,
     TEST_TASK_ROUTE_DELETE_PARAMS,
     TEST_TASK_ROUTE_GET_TASK_PARAMS,
+    TEST_TASK_ROUTE_GET_TASKS_PAGINATION_PARAMS,
     TEST_TASK_ROUTE_GET_TASKS_PARAMS,
     TEST_TASK_ROUTE_UPDATE_PARAMS,
 )
@@ -33,6 +34,7 @@ __all__ = (
     'TEST_SQLALCHEMY_REPOSITORY_UPDATE_ONE_BY_ID_PARAMS',
     'TEST_TASK_ROUTE_CREATE_PARAMS',
     'TEST_TASK_ROUTE_DELETE_PARAMS',
+    'TEST_TASK_ROUTE_GET_TASKS_PAGINATION_PARAMS',
     'TEST_TASK_ROUTE_GET_TASKS_PARAMS',
     'TEST_TASK_ROUTE_GET_TASK_PARAMS',
     'TEST_TASK_ROUTE_UPDATE_PARAMS',
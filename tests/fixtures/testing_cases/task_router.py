@@ -1,4 +1,5 @@
 import uuid
+from operator import itemgetter
 
 from starlette.status import (
     HTTP_200_OK,
@@ -9,7 +10,8 @@ from starlette.status import (
     HTTP_422_UNPROCESSABLE_ENTITY,
 )
 
-from tests.constants import BASE_ENDPOINT_URL
+from src.utils.constans import MAX_PAGE_SIZE
+from tests.constants import AWARE_CURSOR, BASE_ENDPOINT_URL
 from tests.fixtures.db_mocks import TASKS
 from tests.utils import RequestTestCase, json_serializable
 
@@ -81,15 +83,73 @@ TEST_TASK_ROUTE_GET_TASK_PARAMS: list[RequestTestCase] = [
     ),
 ]
 
+# Tasks created in one transaction share `created_at`, so the page is ordered by ID.
+TASKS_BY_ID = sorted(TASKS, key=itemgetter('id'))
+
 TEST_TASK_ROUTE_GET_TASKS_PARAMS: list[RequestTestCase] = [
     RequestTestCase(
         url=f'{BASE_ENDPOINT_URL}/tasks/',
         headers={},
         data={},
         expected_status=HTTP_200_OK,
-        expected_data=json_serializable(TASKS),
+        expected_data=json_serializable(TASKS_BY_ID),
         description='Positive case',
     ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?limit=1',
+        headers={},
+        data={},
+        expected_status=HTTP_200_OK,
+        expected_data=json_serializable(TASKS_BY_ID[:1]),
+        description='Limited page',
+    ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?title=IRS',
+        headers={},
+        data={},
+        expected_status=HTTP_200_OK,
+        expected_data=json_serializable(TASKS[:1]),
+        description='Case-insensitive title substring',
+    ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?title=___',
+        headers={},
+        data={},
+        expected_status=HTTP_200_OK,
+        expected_data=[],
+        description='Wildcards in the title are matched literally',
+    ),
+]
+
+TEST_TASK_ROUTE_GET_TASKS_PAGINATION_PARAMS: list[RequestTestCase] = [
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?after=not-a-cursor',
+        headers={},
+        data={},
+        expected_status=HTTP_400_BAD_REQUEST,
+        description='Invalid cursor',
+    ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?after={AWARE_CURSOR}',
+        headers={},
+        data={},
+        expected_status=HTTP_400_BAD_REQUEST,
+        description='Cursor with a time zone',
+    ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?limit=0',
+        headers={},
+        data={},
+        expected_status=HTTP_422_UNPROCESSABLE_ENTITY,
+        description='Too small page',
+    ),
+    RequestTestCase(
+        url=f'{BASE_ENDPOINT_URL}/tasks/?limit={MAX_PAGE_SIZE + 1}',
+        headers={},
+        data={},
+        expected_status=HTTP_422_UNPROCESSABLE_ENTITY,
+        description='Too large page',
+    ),
 ]
 
 TEST_TASK_ROUTE_UPDATE_PARAMS: list[RequestTestCase] = [
@@ -0,0 +1,49 @@
+"""Contains tests for the metrics endpoint."""
+
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from src.utils.metrics import PROMETHEUS_MEDIA_TYPE, render
+from tests.constants import BASE_ENDPOINT_URL
+from tests.fixtures import db_mocks
+
+
+class TestMetricsRouter:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_tasks')
+    async def test_metrics(async_client: AsyncClient) -> None:
+        await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}')
+        await async_client.get(f'{BASE_ENDPOINT_URL}/no-such-route')
+
+        response = await async_client.get('api/metrics/')
+
+        assert response.headers['content-type'] == f'{PROMETHEUS_MEDIA_TYPE}; charset=utf-8'
+        lines = response.text.splitlines()
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/tasks/{task_id}",status="200"}' in {
+            line.rsplit(' ', 1)[0] for line in lines
+        }
+        unmatched = 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'
+        assert any(line.startswith(unmatched) for line in lines)
+        assert 'http_requests_in_flight 1' in lines
+        assert {'interactive', 'reporting', 'bulk'} <= {
+            line.split('"')[1] for line in lines if line.startswith('db_pool_size{')
+        }
+
+    @staticmethod
+    async def test_metrics_are_read_on_event_loop_thread(
+            async_client: AsyncClient,
+            monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        threads = []
+
+        def _render() -> str:
+            threads.append(threading.get_ident())
+            return render()
+
+        monkeypatch.setattr('src.api.render', _render)
+        await async_client.get('api/metrics/')
+
+        assert threads == [threading.get_ident()]
@@ -1,11 +1,45 @@
 """Contains tests for user routes."""
 
+import json
+import uuid
+from unittest.mock import AsyncMock
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
 
-from tests.fixtures import testing_cases
+from src.main import app
+from src.models import TaskModel
+from src.repositories.user import UserRepository
+from src.utils.constans import NDJSON_MEDIA_TYPE
+from src.utils.enums import Status
+from tests.constants import AWARE_CURSOR, BASE_ENDPOINT_URL
+from tests.fixtures import db_mocks, testing_cases
 from tests.utils import RequestTestCase, prepare_payload
 
+# Valid, too short, with an unknown author and valid again.
+BULK_TASKS = [
+    {
+        'title': 'Bulk first',
+        'status': 'todo',
+        'author_id': str(db_mocks.USERS[0]['id']),
+        'assignee_id': str(db_mocks.USERS[1]['id']),
+    },
+    {'title': 'x', 'status': 'todo', 'author_id': str(db_mocks.USERS[0]['id'])},
+    {'title': 'Unknown author', 'status': 'todo', 'author_id': str(uuid.uuid4())},
+    {'title': 'Bulk second', 'status': 'done', 'author_id': str(db_mocks.USERS[0]['id'])},
+]
+
 
 class TestTaskRouter:
 
@@ -23,9 +57,59 @@ class TestTaskRouter:
             if 'id' in case.expected_data:
                 case.expected_data.pop('id')
 
-            actual = prepare_payload(response, exclude=['id', 'created_at', 'watchers', 'executors'])
+            actual = prepare_payload(response, exclude=['id', 'created_at', 'version', 'watchers', 'executors'])
             assert actual == case.expected_data
 
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize(
+        ('items', 'error_indexes', 'titles'),
+        [
+            (BULK_TASKS, [1, 2], ['Bulk first', 'Bulk second']),
+            ([BULK_TASKS[0], BULK_TASKS[3]], [], ['Bulk first', 'Bulk second']),
+        ],
+        ids=['invalid tasks', 'valid tasks'],
+    )
+    async def test_create_bulk(
+            items: list[dict],
+            error_indexes: list[int],
+            titles: list[str],
+            async_client: AsyncClient,
+    ) -> None:
+        response = await async_client.post(f'{BASE_ENDPOINT_URL}/tasks/bulk', json=items)
+        assert response.status_code == HTTP_201_CREATED
+
+        body = response.json()
+        assert [error['index'] for error in body['errors']] == error_indexes
+        if error_indexes:
+            assert body['errors'][1]['details'] == 'User not found.'
+
+        created_titles = []
+        for task_id in body['payload']:
+            task = await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/{task_id}')
+            created_titles.append(task.json()['payload']['title'])
+        assert created_titles == titles
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize(('chunk_size', 'failed_index'), [(2, 2), (1, 2)], ids=['chunk of two', 'single rows'])
+    async def test_create_bulk_isolates_failed_chunk(
+            chunk_size: int,
+            failed_index: int,
+            async_client: AsyncClient,
+            monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # The unknown author slips past the check, as if it was deleted concurrently, and fails its chunk.
+        monkeypatch.setattr(UserRepository, 'get_existing_ids', AsyncMock(side_effect=lambda user_ids: user_ids))
+        monkeypatch.setattr('src.api.v1.services.task.BULK_CREATE_CHUNK_SIZE', chunk_size)
+
+        response = await async_client.post(f'{BASE_ENDPOINT_URL}/tasks/bulk', json=BULK_TASKS)
+        assert response.status_code == HTTP_201_CREATED
+
+        body = response.json()
+        assert len(body['payload']) == len(BULK_TASKS) - len(body['errors'])
+        assert body['errors'][1] == {'index': failed_index, 'details': 'Wrong data provided.'}
+
     @staticmethod
     @pytest.mark.usefixtures('setup_users', 'setup_tasks')
     @pytest.mark.parametrize('case', testing_cases.TEST_TASK_ROUTE_GET_TASK_PARAMS)
@@ -40,9 +124,95 @@ class TestTaskRouter:
             if 'id' in case.expected_data:
                 case.expected_data.pop('id')
 
-            actual = prepare_payload(response, exclude=['id', 'created_at', 'watchers', 'executors'])
+            actual = prepare_payload(response, exclude=['id', 'created_at', 'version', 'watchers', 'executors'])
             assert actual == case.expected_data
 
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_task_served_from_cache(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        stats_before = (await async_client.get('api/cache/stats/')).json()['payload']['tasks']
+
+        first = await async_client.get(url)
+        second = await async_client.get(url)
+
+        assert first.json() == second.json()
+        stats = (await async_client.get('api/cache/stats/')).json()['payload']['tasks']
+        assert stats['misses'] - stats_before['misses'] == 1
+        assert stats['hits'] - stats_before['hits'] == 1
+        assert stats['size'] == 1
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_task_cache_invalidated_by_writes(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        await async_client.get(url)
+
+        await async_client.patch(url, json={'title': 'updated'})
+        response = await async_client.get(url)
+        assert response.json()['payload']['title'] == 'updated'
+
+        await async_client.delete(url)
+        response = await async_client.get(url)
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    @pytest.mark.parametrize(
+        ('params', 'expected_keys'),
+        [
+            ({}, {'id', 'title', 'description', 'status', 'created_at', 'author_id', 'assignee_id', 'version'}),
+            ({'fields': 'title, status'}, {'id', 'title', 'status'}),
+            ({'fields': 'title', 'include': 'watchers,executors'}, {'id', 'title', 'watchers', 'executors'}),
+        ],
+        ids=['all fields', 'sparse fields', 'relationships'],
+    )
+    async def test_get_task_projection(params: dict, expected_keys: set[str], async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        await async_client.get(url)  # the cached task must be projected as well
+
+        response = await async_client.get(url, params=params)
+        assert response.status_code == HTTP_200_OK
+        assert set(response.json()['payload']) == expected_keys
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    async def test_get_tasks_projection(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            f'{BASE_ENDPOINT_URL}/tasks/',
+            params={'fields': 'title', 'include': 'watchers,executors'},
+        )
+        assert response.status_code == HTTP_200_OK
+
+        payload = {task['title']: task for task in response.json()['payload']}
+        first, second = (payload[task['title']] for task in db_mocks.TASKS)
+        assert set(first) == {'id', 'title', 'watchers', 'executors'}
+        assert sorted(user['id'] for user in first['watchers']) == sorted(
+            str(watcher['user_id']) for watcher in db_mocks.WATCHERS
+        )
+        assert [user['id'] for user in first['executors']] == [str(db_mocks.EXECUTORS[0]['user_id'])]
+        assert second['watchers'] == second['executors'] == []
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    async def test_get_tasks_stream_projection(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            f'{BASE_ENDPOINT_URL}/tasks/',
+            params={'fields': 'status', 'include': 'watchers'},
+            headers={'Accept': NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == HTTP_200_OK
+        streamed = [json.loads(line) for line in response.text.splitlines()]
+        assert all(set(task) == {'id', 'status', 'watchers'} for task in streamed)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize('params', [{'fields': 'title,secret'}, {'include': 'author'}])
+    @pytest.mark.parametrize('path', ['', str(db_mocks.TASKS[0]['id'])])
+    async def test_get_tasks_unknown_fields(path: str, params: dict, async_client: AsyncClient) -> None:
+        response = await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/{path}', params=params)
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
     @staticmethod
     @pytest.mark.usefixtures('setup_users', 'setup_tasks')
     @pytest.mark.parametrize('case', testing_cases.TEST_TASK_ROUTE_GET_TASKS_PARAMS)
@@ -64,6 +234,8 @@ class TestTaskRouter:
                     data.pop('id')
                 if 'created_at' in data:
                     data.pop('created_at')
+                if 'version' in data:
+                    data.pop('version')
                 if 'watchers' in data:
                     data.pop('watchers')
                 if 'executors' in data:
@@ -71,6 +243,124 @@ class TestTaskRouter:
 
             assert actual == case.expected_data
 
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize('case', testing_cases.TEST_TASK_ROUTE_GET_TASKS_PAGINATION_PARAMS)
+    async def test_get_tasks_pagination_errors(
+            case: RequestTestCase,
+            async_client: AsyncClient,
+    ) -> None:
+        with case.expected_error:
+            response = await async_client.get(case.url, headers=case.headers)
+            assert response.status_code == case.expected_status
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_tasks_walks_all_pages(
+            async_client: AsyncClient,
+            tasks: tuple[dict],
+    ) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/'
+        seen_ids: list[str] = []
+        params: dict = {'limit': 1}
+
+        for _ in range(len(tasks) + 1):
+            response = await async_client.get(url, params=params)
+            assert response.status_code == HTTP_200_OK
+            body = response.json()
+            assert len(body['payload']) <= 1
+            seen_ids.extend(task['id'] for task in body['payload'])
+            if body['next_cursor'] is None:
+                break
+            params['after'] = body['next_cursor']
+
+        assert seen_ids == sorted(str(task['id']) for task in tasks)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_tasks_stream(
+            async_client: AsyncClient,
+            tasks: tuple[dict],
+    ) -> None:
+        response = await async_client.get(
+            f'{BASE_ENDPOINT_URL}/tasks/',
+            params={'limit': 1},
+            headers={'Accept': NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.headers['content-type'].startswith(NDJSON_MEDIA_TYPE)
+
+        streamed = [json.loads(line) for line in response.text.splitlines()]
+        assert [task['id'] for task in streamed] == sorted(str(task['id']) for task in tasks)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', AWARE_CURSOR], ids=['malformed', 'time_zone'])
+    async def test_get_tasks_stream_invalid_cursor(cursor: str, async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            f'{BASE_ENDPOINT_URL}/tasks/',
+            params={'after': cursor},
+            headers={'Accept': NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+    @staticmethod
+    async def _group_by_stats(session: AsyncSession) -> dict:
+        """Counts the tasks with `GROUP BY`, in the shape of the stats endpoint."""
+        await session.flush()
+        stats: dict = {'by_status': {status.value: 0 for status in Status}, 'by_author': {}, 'by_assignee': {}}
+        by_status = select(TaskModel.status, func.count()).group_by(TaskModel.status)
+        for status, count in await session.execute(by_status):
+            stats['by_status'][status.value] = count
+        for key, column in (('by_author', TaskModel.author_id), ('by_assignee', TaskModel.assignee_id)):
+            query = (
+                select(column, TaskModel.status, func.count())
+                .where(column.is_not(None))
+                .group_by(column, TaskModel.status)
+            )
+            for user_id, status, count in await session.execute(query):
+                stats[key].setdefault(str(user_id), {})[status.value] = count
+        return stats
+
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_stats_match_group_by(
+            self,
+            async_client: AsyncClient,
+            transaction_session: AsyncSession,
+            monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks'
+        first_id, second_id = (str(task['id']) for task in db_mocks.TASKS)
+        user_ids = [str(user['id']) for user in db_mocks.USERS]
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', 2)
+        bulk_items = [
+            {'title': f'Bulk {n}', 'status': 'done', 'author_id': user_ids[n % 3], 'assignee_id': user_ids[0]}
+            for n in range(4)
+        ]
+        writes = [
+            lambda: async_client.post(f'{url}/', json={'title': 'Single', 'status': 'todo', 'author_id': user_ids[2]}),
+            lambda: async_client.post(f'{url}/bulk', json=bulk_items[:1]),
+            lambda: async_client.post(f'{url}/bulk', json=bulk_items),
+            lambda: async_client.patch(f'{url}/{first_id}', json={'status': 'done', 'assignee_id': user_ids[2]}),
+            lambda: async_client.patch(f'{url}/{second_id}', json={'title': 'Renamed'}),
+            lambda: async_client.patch(f'{url}/batch', json=[{'id': first_id, 'author_id': user_ids[1]}]),
+            lambda: async_client.delete(f'{url}/{second_id}'),
+            lambda: async_client.delete(f'{BASE_ENDPOINT_URL}/user/{user_ids[0]}'),
+        ]
+
+        for write in writes:
+            assert (await write()).is_success
+            response = await async_client.get(f'{url}/stats')
+            assert response.status_code == HTTP_200_OK
+
+            payload = response.json()['payload']
+            actual = {
+                'by_status': payload['by_status'],
+                'by_author': {stats['user_id']: stats['counts'] for stats in payload['by_author']},
+                'by_assignee': {stats['user_id']: stats['counts'] for stats in payload['by_assignee']},
+            }
+            assert actual == await self._group_by_stats(transaction_session)
+
     @staticmethod
     @pytest.mark.usefixtures('setup_users', 'setup_tasks')
     @pytest.mark.parametrize('case', testing_cases.TEST_TASK_ROUTE_UPDATE_PARAMS)
@@ -85,9 +375,53 @@ class TestTaskRouter:
             if 'id' in case.expected_data:
                 case.expected_data.pop('id')
 
-            actual = prepare_payload(response, exclude=['id', 'created_at', 'watchers', 'executors'])
+            actual = prepare_payload(response, exclude=['id', 'created_at', 'version', 'watchers', 'executors'])
             assert actual == case.expected_data
 
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_update_batch(async_client: AsyncClient) -> None:
+        first_id, second_id = (str(task['id']) for task in db_mocks.TASKS)
+        missing_id = str(uuid.uuid4())
+        await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/{first_id}')
+
+        response = await async_client.patch(
+            f'{BASE_ENDPOINT_URL}/tasks/batch',
+            json=[
+                {'id': second_id, 'status': 'done', 'description': None},
+                {'id': missing_id, 'title': 'Missing'},
+                {'id': first_id, 'title': 'Renamed'},
+            ],
+        )
+        assert response.status_code == HTTP_200_OK
+
+        body = response.json()
+        assert [(task['id'], task['title'], task['status'], task['description']) for task in body['payload']] == [
+            (second_id, db_mocks.TASKS[1]['title'], 'done', None),
+            (first_id, 'Renamed', db_mocks.TASKS[0]['status'].value, db_mocks.TASKS[0]['description']),
+        ]
+        assert body['not_found'] == [missing_id]
+
+        cached = await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/{first_id}')
+        assert cached.json()['payload']['title'] == 'Renamed'
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize(
+        'items',
+        [
+            [
+                {'id': str(db_mocks.TASKS[0]['id']), 'title': 'One'},
+                {'id': str(db_mocks.TASKS[0]['id']), 'title': 'Two'},
+            ],
+            [{'id': str(db_mocks.TASKS[0]['id']), 'author_id': str(uuid.uuid4())}],
+        ],
+        ids=['duplicate ids', 'unknown author'],
+    )
+    async def test_update_batch_bad_request(items: list[dict], async_client: AsyncClient) -> None:
+        response = await async_client.patch(f'{BASE_ENDPOINT_URL}/tasks/batch', json=items)
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
     @staticmethod
     @pytest.mark.usefixtures('setup_users', 'setup_tasks')
     @pytest.mark.parametrize('case', testing_cases.TEST_TASK_ROUTE_DELETE_PARAMS)
@@ -98,3 +432,142 @@ class TestTaskRouter:
         with case.expected_error:
             response = await async_client.delete(case.url, headers=case.headers)
             assert response.status_code == case.expected_status
+
+
+class TestTaskRouterConditional:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_task_etag(async_client: AsyncClient, transaction_session: AsyncSession) -> None:
+        task_id = db_mocks.TASKS[0]['id']
+        url = f'{BASE_ENDPOINT_URL}/tasks/{task_id}'
+        response = await async_client.get(url)
+        assert response.headers['ETag'] == '"1"'
+        assert response.json()['payload']['version'] == 1
+
+        response = await async_client.get(url, headers={'If-None-Match': 'W/"1"'})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response.headers['ETag'] == '"1"'
+        assert not response.content
+
+        await async_client.patch(url, json={'title': db_mocks.TASKS[0]['title']})  # changes nothing
+        response = await async_client.get(url, params={'fields': 'title'}, headers={'If-None-Match': '"1"'})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+
+        # Written around the service, so the cached task is stale and must be reloaded.
+        await transaction_session.execute(update(TaskModel).where(TaskModel.id == task_id).values(title='changed'))
+        response = await async_client.get(url, headers={'If-None-Match': '"1"'})
+        assert response.status_code == HTTP_200_OK
+        assert response.headers['ETag'] == '"2"'
+        assert response.json()['payload']['title'] == 'changed'
+
+        response = await async_client.get(url, params={'include': 'watchers'})
+        assert 'ETag' not in response.headers
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_tasks_etag(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/'
+        etag = (await async_client.get(url)).headers['ETag']
+
+        response = await async_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+        await async_client.patch(f'{url}batch', json=[{'id': str(db_mocks.TASKS[1]['id']), 'title': 'changed'}])
+        response = await async_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == HTTP_200_OK
+        assert response.headers['ETag'] != etag
+
+        response = await async_client.get(url, params={'include': 'executors'}, headers={'If-None-Match': etag})
+        assert response.status_code == HTTP_200_OK
+        assert 'ETag' not in response.headers
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_update_if_match(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        response = await async_client.patch(url, json={'title': 'first'}, headers={'If-Match': '"1"'})
+        assert response.status_code == HTTP_200_OK
+        assert response.headers['ETag'] == '"2"' == f'"{response.json()["payload"]["version"]}"'
+
+        for stale in ('"1"', 'W/"2"'):
+            response = await async_client.patch(url, json={'title': 'lost'}, headers={'If-Match': stale})
+            assert response.status_code == HTTP_412_PRECONDITION_FAILED
+
+        response = await async_client.patch(url, json={'title': 'second'}, headers={'If-Match': '"1", "2"'})
+        assert response.headers['ETag'] == '"3"'
+        response = await async_client.patch(url, json={'title': 'third'}, headers={'If-Match': '*'})
+        assert response.headers['ETag'] == '"4"'
+        assert (await async_client.get(url)).json()['payload']['title'] == 'third'
+
+        response = await async_client.patch(
+            f'{BASE_ENDPOINT_URL}/tasks/{uuid.uuid4()}',
+            json={'title': 'missing'},
+            headers={'If-Match': '"1"'},
+        )
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_update_expected_status(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        params = {'expected_status': Status.TODO.value}
+
+        response = await async_client.patch(url, json={'status': Status.IN_PROGRESS.value}, params=params)
+        assert response.status_code == HTTP_200_OK
+        assert response.json()['payload']['status'] == Status.IN_PROGRESS.value
+
+        # The second worker taking the same task loses.
+        response = await async_client.patch(url, json={'status': Status.IN_PROGRESS.value}, params=params)
+        assert response.status_code == HTTP_412_PRECONDITION_FAILED
+
+
+class TestTaskRouterMembership:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    async def test_change_members(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/tasks/{db_mocks.TASKS[0]["id"]}'
+        first, second, third = (str(user['id']) for user in db_mocks.USERS)
+
+        response = await async_client.patch(f'{url}/watchers', json={'add': [first, second], 'remove': [third]})
+        assert response.status_code == HTTP_200_OK
+        assert response.json()['payload'] == {'added': 1, 'removed': 1, 'total': 2}
+
+        watchers = (await async_client.get(url, params={'include': 'watchers'})).json()['payload']['watchers']
+        assert sorted(user['id'] for user in watchers) == sorted([first, second])
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    @pytest.mark.parametrize(
+        ('task_id', 'change', 'expected_status'),
+        [
+            (db_mocks.TASKS[0]['id'], {'add': [str(uuid.uuid4())]}, HTTP_404_NOT_FOUND),
+            (uuid.uuid4(), {'add': [str(db_mocks.USERS[0]['id'])]}, HTTP_404_NOT_FOUND),
+            (db_mocks.TASKS[0]['id'], {'add': [str(db_mocks.USERS[0]['id'])] * 2}, HTTP_200_OK),
+            (
+                db_mocks.TASKS[0]['id'],
+                {'add': [str(db_mocks.USERS[0]['id'])], 'remove': [str(db_mocks.USERS[0]['id'])]},
+                HTTP_422_UNPROCESSABLE_ENTITY,
+            ),
+        ],
+        ids=['unknown user', 'unknown task', 'repeated user', 'added and removed'],
+    )
+    async def test_change_members_errors(
+            task_id: uuid.UUID,
+            change: dict,
+            expected_status: int,
+            async_client: AsyncClient,
+    ) -> None:
+        response = await async_client.patch(f'{BASE_ENDPOINT_URL}/tasks/{task_id}/executors', json=change)
+        assert response.status_code == expected_status
+
+
+class TestTaskRouterSchema:
+
+    @staticmethod
+    def test_create_bulk_documents_items() -> None:
+        body = app.openapi()['paths']['/api/v1/tasks/bulk']['post']['requestBody']
+        schema = body['content']['application/json']['schema']
+        assert schema['items']['$ref'] == '#/components/schemas/CreateTaskRequest'
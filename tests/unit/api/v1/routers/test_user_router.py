@@ -2,8 +2,10 @@
 
 import pytest
 from httpx import AsyncClient
+from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
-from tests.fixtures import testing_cases
+from tests.constants import AWARE_CURSOR, BASE_ENDPOINT_URL
+from tests.fixtures import db_mocks, testing_cases
 from tests.utils import RequestTestCase, prepare_payload
 
 
@@ -31,3 +33,60 @@ class TestUserRouter:
         with case.expected_error:
             response = await async_client.delete(case.url, headers=case.headers)
             assert response.status_code == case.expected_status
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    async def test_change_tasks(async_client: AsyncClient) -> None:
+        # The second user executes the first task already.
+        url = f'{BASE_ENDPOINT_URL}/user/{db_mocks.USERS[1]["id"]}/executors'
+        task_ids = [str(task['id']) for task in db_mocks.TASKS]
+
+        response = await async_client.patch(url, json={'add': task_ids})
+        assert response.status_code == HTTP_200_OK
+        assert response.json()['payload'] == {'added': 1, 'removed': 0, 'total': 2}
+
+        response = await async_client.patch(url, json={'remove': task_ids})
+        assert response.json()['payload'] == {'added': 0, 'removed': 2, 'total': 0}
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    @pytest.mark.parametrize(
+        ('params', 'expected_tasks'),
+        [
+            ({'role': 'assignee'}, {1}),
+            ({'role': 'watcher'}, {0}),
+            ({'role': 'executor'}, set()),
+            ({'role': 'author'}, set()),
+            ({}, {0, 1}),
+        ],
+        ids=['assignee', 'watcher', 'executor', 'author', 'any'],
+    )
+    async def test_get_tasks(params: dict, expected_tasks: set[int], async_client: AsyncClient) -> None:
+        # The third user is assigned to the second task and watches the first one.
+        url = f'{BASE_ENDPOINT_URL}/user/{db_mocks.USERS[2]["id"]}/tasks'
+        response = await async_client.get(url, params=params)
+        assert response.status_code == HTTP_200_OK
+        assert {task['id'] for task in response.json()['payload']} == {
+            str(db_mocks.TASKS[index]['id']) for index in expected_tasks
+        }
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    async def test_get_tasks_walks_pages(async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/user/{db_mocks.USERS[0]["id"]}/tasks'
+        seen, params = [], {'role': 'author', 'limit': 1}
+        while True:
+            body = (await async_client.get(url, params=params)).json()
+            seen.extend(task['id'] for task in body['payload'])
+            if body['next_cursor'] is None:
+                break
+            params['after'] = body['next_cursor']
+        assert sorted(seen) == sorted(str(task['id']) for task in db_mocks.TASKS)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users', 'setup_tasks')
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', AWARE_CURSOR], ids=['malformed', 'time_zone'])
+    async def test_get_tasks_invalid_cursor(cursor: str, async_client: AsyncClient) -> None:
+        url = f'{BASE_ENDPOINT_URL}/user/{db_mocks.USERS[0]["id"]}/tasks'
+        response = await async_client.get(url, params={'after': cursor})
+        assert response.status_code == HTTP_400_BAD_REQUEST
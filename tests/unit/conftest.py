@@ -1,14 +1,19 @@
+import functools
+import uuid
 from collections.abc import Sequence
 from copy import deepcopy
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import Result, select
+from sqlalchemy import Result, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models import TaskModel, UserModel
+from src.models import Executors, TaskModel, UserModel, Watcher
+from src.tools.seed import SeedOptions, seed
 from src.utils.custom_types import AsyncFunc
+from src.utils.enums import Status
 from tests import fixtures
+from tests.constants import MANY_TASKS, MANY_USERS, SEEDED_TASKS
 from tests.utils import bulk_save_models
 
 
@@ -24,6 +29,70 @@ async def setup_tasks(setup_users: None, transaction_session: AsyncSession, task
     await bulk_save_models(transaction_session, TaskModel, tasks)
 
 
+@pytest_asyncio.fixture
+async def setup_task_members(setup_tasks: None, transaction_session: AsyncSession) -> None:
+    """Creates watchers and executors of the tasks that will only exist within the session."""
+    await bulk_save_models(transaction_session, Watcher, fixtures.db_mocks.WATCHERS)
+    await bulk_save_models(transaction_session, Executors, fixtures.db_mocks.EXECUTORS)
+
+
+def _seeded_uuid(prefix: str, number: str) -> str:
+    return f"('{prefix}-0000-4000-8000-' || lpad(({number})::text, 12, '0'))::uuid"
+
+
+@pytest_asyncio.fixture
+async def setup_many_tasks(transaction_session: AsyncSession) -> list[uuid.UUID]:
+    """Creates many tasks of many users, each with a watcher and an executor, and refreshes the statistics.
+
+    The plans chosen for the queries then are those of a large table.
+    Returns the IDs of the users, every user has tasks in every role.
+    """
+    user, task = (functools.partial(_seeded_uuid, prefix) for prefix in ('00000000', '10000000'))
+    params = {'users': MANY_USERS, 'tasks': MANY_TASKS}
+    await transaction_session.execute(text(f"""
+        INSERT INTO users (id, full_name, email)
+        SELECT {user('n')}, 'User ' || n, 'user-' || n || '@example.com' FROM generate_series(0, :users - 1) AS n
+    """), params)
+    await transaction_session.execute(text(f"""
+        INSERT INTO tasks (id, title, status, author_id, assignee_id, created_at)
+        SELECT {task('n')}, 'Task ' || n, (ARRAY['TODO', 'IN_PROGRESS', 'DONE'])[n % 3 + 1]::task_status,
+               {user('n % :users')}, CASE WHEN n % 2 = 0 THEN {user('n / 2 % :users')} END,
+               TIMESTAMP '2020-01-01' + n * INTERVAL '1 minute'
+        FROM generate_series(0, :tasks - 1) AS n
+    """), params)
+    for table, step in (('watchers', 7), ('executors', 11)):
+        await transaction_session.execute(text(f"""
+            INSERT INTO {table} (task_id, user_id)
+            SELECT {task('n')}, {user(f'n * {step} % :users')} FROM generate_series(0, :tasks - 1) AS n
+        """), params)
+    await transaction_session.execute(text('ANALYZE users, tasks, watchers, executors'))
+    return [uuid.UUID(f'00000000-0000-4000-8000-{n:012d}') for n in range(MANY_USERS)]
+
+
+@pytest_asyncio.fixture
+async def setup_seeded_tasks(transaction_session: AsyncSession) -> list[uuid.UUID]:
+    """Creates the synthetic dataset of the seeder within the session and refreshes the statistics.
+
+    Few tasks are in progress, so that the planner has a selective status to pick its index for.
+    Returns the IDs of the authors, the one with the most tasks first.
+    """
+    connection = await transaction_session.connection()
+    # BEGIN is sent lazily with the first statement, COPY on the driver would run outside of the transaction.
+    await connection.execute(select(1))
+    options = SeedOptions(
+        users=MANY_USERS,
+        tasks=SEEDED_TASKS,
+        statuses={Status.TODO: 30, Status.IN_PROGRESS: 5, Status.DONE: 65},
+        chunk_size=10_000,
+    )
+    await seed((await connection.get_raw_connection()).driver_connection, options)
+    await transaction_session.execute(text('ANALYZE users, tasks, watchers, executors'))
+    authors = await transaction_session.execute(
+        select(TaskModel.author_id).group_by(TaskModel.author_id).order_by(func.count().desc(), TaskModel.author_id),
+    )
+    return list(authors.scalars().all())
+
+
 @pytest_asyncio.fixture
 def get_users(transaction_session: AsyncSession) -> AsyncFunc:
     """Returns users existing within the session."""
@@ -0,0 +1,141 @@
+"""Contains tests for database connection settings."""
+
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import QueuePool, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from src.config import settings
+from src.database.db import build_connect_args, create_engine, engines, limit_statement_time
+from src.utils.enums import Pool
+from src.utils.service import BaseService, transaction_mode
+from src.utils.unit_of_work import UnitOfWork
+
+STATEMENT_TIMEOUT = 100
+
+# Seconds the bulk job holds its connections, and the delay of an interactive read still considered unaffected.
+BULK_JOB_DURATION = 1
+LATENCY_TOLERANCE = 0.2
+
+
+class TestBuildConnectArgs:
+
+    @staticmethod
+    def test_pgbouncer_mode_disables_statement_caches() -> None:
+        connect_args = build_connect_args(pgbouncer=True, statement_cache_size=500)
+
+        assert connect_args['statement_cache_size'] == 0
+        assert connect_args['prepared_statement_cache_size'] == 0
+        first_name = connect_args['prepared_statement_name_func']()
+        assert first_name != connect_args['prepared_statement_name_func']()
+
+    @staticmethod
+    def test_direct_mode_caches_prepared_statements() -> None:
+        connect_args = build_connect_args(pgbouncer=False, statement_cache_size=500)
+
+        assert connect_args == {'prepared_statement_cache_size': 500}
+
+
+class TestStatementTimeout:
+
+    @staticmethod
+    @pytest.fixture(params=[True, False], ids=['pgbouncer', 'direct'])
+    async def limited_engine(request: pytest.FixtureRequest) -> AsyncGenerator[AsyncEngine, None]:
+        engine = create_async_engine(
+            url=settings.DB_URL,
+            connect_args=build_connect_args(pgbouncer=request.param, statement_cache_size=500),
+        )
+        limit_statement_time(engine, STATEMENT_TIMEOUT)
+        yield engine
+        await engine.dispose()
+
+    @staticmethod
+    async def test_long_statement_is_cancelled(limited_engine: AsyncEngine) -> None:
+        async with limited_engine.connect() as connection:
+            with pytest.raises(DBAPIError, match='statement timeout'):
+                await connection.execute(text('SELECT pg_sleep(1)'))
+
+    @staticmethod
+    async def test_long_read_only_statement_is_cancelled(limited_engine: AsyncEngine) -> None:
+        session_maker = async_sessionmaker(limited_engine.execution_options(postgresql_readonly=True))
+        async with session_maker() as session:
+            with pytest.raises(DBAPIError, match='statement timeout'):
+                await session.execute(text('SELECT pg_sleep(1)'))
+
+    @staticmethod
+    async def test_timeout_ends_with_transaction(limited_engine: AsyncEngine) -> None:
+        async with limited_engine.connect() as connection:
+            assert await connection.scalar(text('SHOW statement_timeout')) == f'{STATEMENT_TIMEOUT}ms'
+            await connection.commit()
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+            assert await driver_connection.fetchval('SHOW statement_timeout') == '0'
+
+
+@pytest.fixture
+async def shared_pool(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[QueuePool, None]:
+    """Serves every workload from one pool of the size of the bulk pool, as before the bulkheads."""
+    bulk_pool = engines[Pool.BULK].sync_engine.pool
+    engine = create_engine(settings.DB_URL, 'shared', bulk_pool.size(), bulk_pool._max_overflow)  # noqa: SLF001
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    read_only_session_maker = async_sessionmaker(
+        engine.execution_options(postgresql_readonly=True),
+        expire_on_commit=False,
+    )
+    monkeypatch.setattr('src.utils.unit_of_work.session_makers', dict.fromkeys(Pool, session_maker))
+    monkeypatch.setattr('src.utils.unit_of_work.read_only_session_makers', dict.fromkeys(Pool, read_only_session_maker))
+    yield engine.sync_engine.pool
+    await engine.dispose()
+
+
+class TestBulkheads:
+    class _Service(BaseService):
+        _repo = 'task'
+
+        @transaction_mode(pool=Pool.BULK)
+        async def hold_bulk_connection(self, held: asyncio.Barrier, release: asyncio.Event) -> None:
+            await self.uow.task.get_version(uuid.uuid4())
+            await held.wait()
+            await release.wait()
+
+        @transaction_mode(read_only=True)
+        async def read(self) -> None:
+            await self.uow.task.get_version(uuid.uuid4())
+
+    async def _read_latency(self) -> float:
+        started = time.perf_counter()
+        await self._Service(UnitOfWork()).read()
+        return time.perf_counter() - started
+
+    async def _read_latency_while_bulk_job_holds(self, pool: QueuePool) -> float:
+        """Measures an interactive read while bulk transactions hold all the connections of the pool.
+
+        The bulk job ends `BULK_JOB_DURATION` seconds after the read starts.
+        """
+        capacity = pool.size() + pool._max_overflow  # noqa: SLF001
+        held, release = asyncio.Barrier(capacity + 1), asyncio.Event()
+        async with asyncio.TaskGroup() as bulk_job:
+            for _ in range(capacity):
+                bulk_job.create_task(self._Service(UnitOfWork()).hold_bulk_connection(held, release))
+            async with asyncio.timeout(5):
+                await held.wait()
+            assert pool.checkedout() == capacity
+            asyncio.get_running_loop().call_later(BULK_JOB_DURATION, release.set)
+            return await self._read_latency()
+
+    async def test_saturated_bulk_pool_does_not_delay_interactive_reads(self) -> None:
+        await self._read_latency()  # opens the connection of the interactive pool
+        baseline = await self._read_latency()
+
+        latency = await self._read_latency_while_bulk_job_holds(engines[Pool.BULK].sync_engine.pool)
+
+        assert latency < baseline + LATENCY_TOLERANCE
+
+    async def test_saturated_shared_pool_delays_interactive_reads(self, shared_pool: QueuePool) -> None:
+        latency = await self._read_latency_while_bulk_job_holds(shared_pool)
+
+        assert latency >= BULK_JOB_DURATION
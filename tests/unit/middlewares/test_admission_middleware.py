@@ -0,0 +1,159 @@
+"""Contains tests for the middleware shedding the load."""
+
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from src.api.v1.services import TaskService
+from src.main import app
+from src.middlewares import AdmissionMiddleware
+from src.middlewares.admission import (
+    BULK_LANE,
+    OVERLOADED,
+    READ_LANE,
+    REPORTING_LANE,
+    WRITE_LANE,
+    default_lanes,
+    oversubscribed_pools,
+    route_pools,
+)
+from src.utils.admission import AdmissionQueue
+from src.utils.enums import Pool
+
+
+@pytest.fixture
+def release() -> asyncio.Event:
+    return asyncio.Event()
+
+
+@pytest.fixture
+def middleware(release: asyncio.Event) -> AdmissionMiddleware:
+    async def _slow(_: Request) -> JSONResponse:
+        await release.wait()
+        return JSONResponse({})
+
+    def _fast(_: Request) -> JSONResponse:
+        return JSONResponse({})
+
+    app = Starlette(routes=[
+        Route('/slow', _slow, methods=['GET', 'POST']),
+        Route('/healthz', _fast),
+    ])
+    return AdmissionMiddleware(
+        app,
+        {READ_LANE: AdmissionQueue(limit=1, depth=1), WRITE_LANE: AdmissionQueue(limit=1, depth=1)},
+        queue_timeout=5,
+        retry_after=3,
+        exempt_paths=('/healthz',),
+    )
+
+
+@pytest.fixture
+def client(middleware: AdmissionMiddleware) -> AsyncClient:
+    return AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test')
+
+
+async def _fill(client: AsyncClient, middleware: AdmissionMiddleware) -> list[asyncio.Task]:
+    """Starts one admitted and one queued read."""
+    requests = [asyncio.create_task(client.get('/slow')) for _ in range(2)]
+    while middleware.lanes[READ_LANE].waiting < 1:  # noqa: ASYNC110
+        await asyncio.sleep(0)
+    return requests
+
+
+class TestAdmissionMiddleware:
+
+    @staticmethod
+    async def test_refuses_when_queue_is_full(
+            client: AsyncClient,
+            middleware: AdmissionMiddleware,
+            release: asyncio.Event,
+    ) -> None:
+        requests = await _fill(client, middleware)
+
+        refused = await client.get('/slow')
+        health = await client.get('/healthz')
+        write = asyncio.create_task(client.post('/slow'))
+        release.set()
+
+        assert refused.status_code == HTTP_503_SERVICE_UNAVAILABLE
+        assert refused.headers['Retry-After'] == '3'
+        assert refused.json() == {'status': HTTP_503_SERVICE_UNAVAILABLE, 'error': True, 'details': OVERLOADED}
+        assert health.status_code == HTTP_200_OK
+        assert [response.status_code for response in await asyncio.gather(*requests, write)] == [HTTP_200_OK] * 3
+        assert middleware.lanes[READ_LANE].active == 0
+
+    @staticmethod
+    async def test_refuses_after_queue_timeout(
+            client: AsyncClient,
+            middleware: AdmissionMiddleware,
+            release: asyncio.Event,
+    ) -> None:
+        middleware.queue_timeout = 0.01
+        admitted = asyncio.create_task(client.get('/slow'))
+        await asyncio.sleep(0.01)
+
+        refused = await client.get('/slow')
+        release.set()
+
+        assert refused.status_code == HTTP_503_SERVICE_UNAVAILABLE
+        assert (await admitted).status_code == HTTP_200_OK
+        assert middleware.lanes[READ_LANE].waiting == 0
+
+
+class TestAdmissionLanes:
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('method', 'path', 'lane'),
+        [
+            ('GET', '/api/v1/tasks/3b1f0c2e-7d4a-4f1e-9c8b-2a6d5e4f3c21', READ_LANE),
+            ('PATCH', '/api/v1/tasks/3b1f0c2e-7d4a-4f1e-9c8b-2a6d5e4f3c21', WRITE_LANE),
+            ('POST', '/api/v1/tasks/', WRITE_LANE),
+            ('GET', '/api/v1/tasks/', REPORTING_LANE),
+            ('GET', '/api/v1/tasks/stats', REPORTING_LANE),
+            ('GET', '/api/v1/user/3b1f0c2e-7d4a-4f1e-9c8b-2a6d5e4f3c21/tasks', REPORTING_LANE),
+            ('POST', '/api/v1/tasks/bulk', BULK_LANE),
+        ],
+    )
+    def test_lane_of_route(method: str, path: str, lane: str) -> None:
+        middleware = AdmissionMiddleware(app, route_pools=route_pools(app.routes))
+        assert middleware._lane({'method': method, 'path': path}) == lane  # noqa: SLF001
+
+    @staticmethod
+    def test_routes_declare_pools_of_services() -> None:
+        assert route_pools(app.routes) == {
+            ('GET', '/api/v1/tasks/'): TaskService.get_all.transaction_pool,
+            ('GET', '/api/v1/tasks/stats'): TaskService.get_stats.transaction_pool,
+            ('GET', '/api/v1/user/{user_id}/tasks'): TaskService.get_user_tasks.transaction_pool,
+            ('POST', '/api/v1/tasks/bulk'): TaskService.bulk_create.transaction_pool,
+        }
+        # The stream of the tasks opens its transaction in another method than the pages.
+        assert TaskService._stream_all.transaction_pool is TaskService.get_all.transaction_pool  # noqa: SLF001
+
+    @staticmethod
+    @pytest.mark.parametrize('replica', [False, True])
+    def test_default_limits_fit_pools(replica: bool) -> None:  # noqa: FBT001
+        assert oversubscribed_pools(default_lanes(), replica=replica) == {}
+
+    @staticmethod
+    def test_reports_oversubscribed_pool() -> None:
+        lanes = {**default_lanes(), REPORTING_LANE: AdmissionQueue(limit=1000, depth=0)}
+        assert set(oversubscribed_pools(lanes, replica=False)) == {Pool.REPORTING.value}
+        assert set(oversubscribed_pools(lanes, replica=True)) == {'replica'}
+
+    @staticmethod
+    def test_writes_take_second_connection_with_replica() -> None:
+        lanes = {
+            **default_lanes(),
+            READ_LANE: AdmissionQueue(limit=1, depth=0),
+            WRITE_LANE: AdmissionQueue(limit=55, depth=0),
+        }
+        assert oversubscribed_pools(lanes, replica=False) == {}
+        assert set(oversubscribed_pools(lanes, replica=True)) == {Pool.INTERACTIVE.value}
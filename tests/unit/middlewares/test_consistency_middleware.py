@@ -0,0 +1,49 @@
+"""Contains tests for the middleware carrying the replica consistency token."""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.middlewares import ConsistencyMiddleware
+from src.utils.consistency import consistency_state, parse_lsn
+from src.utils.constans import DB_LSN_HEADER
+
+
+def _read(_: Request) -> JSONResponse:
+    return JSONResponse({'required': consistency_state.get().required_lsn})
+
+
+def _write(_: Request) -> JSONResponse:
+    consistency_state.get().record_write(parse_lsn('0/2000'))
+    return JSONResponse({})
+
+
+@pytest.fixture
+def client() -> AsyncClient:
+    app = Starlette(routes=[Route('/read', _read), Route('/write', _write, methods=['POST'])])
+    app.add_middleware(ConsistencyMiddleware)
+    return AsyncClient(transport=ASGITransport(app=app), base_url='http://test')
+
+
+class TestConsistencyMiddleware:
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('headers', 'required'),
+        [({}, None), ({DB_LSN_HEADER: '0/1000'}, 0x1000), ({DB_LSN_HEADER: 'garbage'}, None)],
+    )
+    async def test_reads_client_lsn(client: AsyncClient, headers: dict, required: int | None) -> None:
+        response = await client.get('/read', headers=headers)
+        assert response.json() == {'required': required}
+        assert DB_LSN_HEADER not in response.headers
+
+    @staticmethod
+    async def test_returns_lsn_of_writes(client: AsyncClient) -> None:
+        response = await client.post('/write', headers={DB_LSN_HEADER: '0/1000'})
+        assert response.headers[DB_LSN_HEADER] == '0/2000'
+
+        response = await client.post('/write', headers={DB_LSN_HEADER: '1/0'})
+        assert response.headers[DB_LSN_HEADER] == '1/0'
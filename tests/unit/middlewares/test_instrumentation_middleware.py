@@ -0,0 +1,77 @@
+"""Contains tests for the middleware reporting the database work of a request."""
+
+import re
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.middlewares import InstrumentationMiddleware
+from src.utils.constans import SERVER_TIMING_HEADER
+from tests.constants import BASE_ENDPOINT_URL
+
+SERVER_TIMING = re.compile(r'db;dur=([0-9.]+);desc="(\d+) queries", db-pool;dur=([0-9.]+), db-tx;dur=([0-9.]+)')
+
+
+@pytest.fixture
+def client(db_engine: AsyncEngine) -> AsyncClient:
+    async def _queries(request: Request) -> JSONResponse:
+        async with db_engine.connect() as connection:
+            for _ in range(int(request.query_params['count'])):
+                await connection.execute(text('SELECT 1'))
+        return JSONResponse({})
+
+    app = Starlette(routes=[Route('/queries', _queries)])
+    app.add_middleware(InstrumentationMiddleware, repeat_threshold=3)
+    return AsyncClient(transport=ASGITransport(app=app), base_url='http://test')
+
+
+@pytest.fixture
+def warnings() -> list[str]:
+    messages = []
+    handler_id = logger.add(messages.append, level='WARNING', format='{message}')
+    yield messages
+    logger.remove(handler_id)
+
+
+class TestInstrumentationMiddleware:
+
+    @staticmethod
+    async def test_server_timing(client: AsyncClient) -> None:
+        response = await client.get('/queries', params={'count': 2})
+
+        query_time, queries, pool_wait, transaction_time = SERVER_TIMING.fullmatch(
+            response.headers[SERVER_TIMING_HEADER],
+        ).groups()
+        assert queries == '2'
+        assert 0 < float(query_time) <= float(transaction_time)
+        assert float(pool_wait) > 0
+
+    @staticmethod
+    async def test_no_queries(client: AsyncClient) -> None:
+        response = await client.get('/queries', params={'count': 0})
+        assert SERVER_TIMING_HEADER not in response.headers
+
+    @staticmethod
+    @pytest.mark.parametrize(('count', 'warned'), [(3, False), (4, True)])
+    async def test_warns_about_repeated_statements(
+            client: AsyncClient,
+            warnings: list[str],
+            count: int,
+            warned: bool,  # noqa: FBT001
+    ) -> None:
+        await client.get('/queries', params={'count': count})
+        assert [message.strip() for message in warnings] == (
+            [f'GET /queries ran the same statement {count} times: SELECT 1'] if warned else []
+        )
+
+    @staticmethod
+    async def test_app_reports_queries(async_client: AsyncClient) -> None:
+        response = await async_client.get(f'{BASE_ENDPOINT_URL}/tasks/')
+        assert int(SERVER_TIMING.fullmatch(response.headers[SERVER_TIMING_HEADER]).group(2)) >= 1
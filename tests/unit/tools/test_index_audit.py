@@ -0,0 +1,131 @@
+"""Contains tests for the index audit command."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import BaseModel
+from src.tools.index_audit import (
+    FindingKind,
+    ForeignKeyInfo,
+    IndexInfo,
+    audit,
+    live_schema,
+    metadata_schema,
+    render_migration,
+)
+
+PKEY = IndexInfo('tasks', 'tasks_pkey', ('id',), unique=True, primary=True, constraint=True)
+FOREIGN_KEY = ForeignKeyInfo('tasks', 'tasks_author_id_fkey', ('author_id',), 'users')
+
+
+class TestIndexAudit:
+
+    @staticmethod
+    def test_models_have_no_findings() -> None:
+        assert audit(*metadata_schema(BaseModel.metadata)) == []
+
+    @staticmethod
+    async def test_live_schema_matches_models(transaction_session: AsyncSession) -> None:
+        def shape(index: IndexInfo) -> tuple:
+            return (
+                index.table, index.name, index.columns, index.method, index.include, index.predicate,
+                index.unique, index.primary, index.constraint,
+            )
+
+        indexes, foreign_keys = metadata_schema(BaseModel.metadata)
+        connection = await transaction_session.connection()
+        live_indexes, live_foreign_keys, _ = await live_schema(connection, BaseModel.metadata.tables)
+
+        assert {shape(index) for index in live_indexes} == {shape(index) for index in indexes}
+        assert set(live_foreign_keys) == set(foreign_keys)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('indexes', 'expected'),
+        [
+            ([IndexInfo('tasks', 'tasks_id_key', ('id',), unique=True, constraint=True)], ['tasks_id_key']),
+            (
+                [IndexInfo('tasks', 'id_index', ('id',)), IndexInfo('tasks', 'id_unique', ('id',), unique=True)],
+                ['id_index', 'id_unique'],
+            ),
+            ([IndexInfo('tasks', 'a', ('a',)), IndexInfo('tasks', 'a_', ('a',), method='gin')], []),
+            ([IndexInfo('tasks', 'a', ('a',)), IndexInfo('tasks', 'a_', ('a',), predicate='(b IS NULL)')], []),
+        ],
+    )
+    def test_duplicate_indexes(indexes: list[IndexInfo], expected: list[str]) -> None:
+        findings = audit([*indexes, PKEY], [])
+        assert {finding.kind for finding in findings} <= {FindingKind.DUPLICATE}
+        assert sorted(finding.index.name for finding in findings) == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('indexes', 'expected'),
+        [
+            ([IndexInfo('tasks', 'a', ('a',)), IndexInfo('tasks', 'a_b', ('a', 'b'))], ['a']),
+            ([IndexInfo('tasks', 'a', ('a',), unique=True), IndexInfo('tasks', 'a_b', ('a', 'b'))], []),
+            ([IndexInfo('tasks', 'a', ('a',)), IndexInfo('tasks', 'b_a', ('b', 'a'))], []),
+            ([IndexInfo('tasks', 'a', ('a',), include=('c',)), IndexInfo('tasks', 'a_b', ('a', 'b'))], []),
+            ([IndexInfo('tasks', 'a', ('a',), predicate='(b IS NULL)'), IndexInfo('tasks', 'a_b', ('a', 'b'))], []),
+        ],
+    )
+    def test_redundant_prefix_indexes(indexes: list[IndexInfo], expected: list[str]) -> None:
+        findings = audit([*indexes, PKEY], [])
+        assert {finding.kind for finding in findings} <= {FindingKind.REDUNDANT_PREFIX}
+        assert [finding.index.name for finding in findings] == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('indexes', 'missing'),
+        [
+            ([], True),
+            ([IndexInfo('tasks', 'author_id_created_at_id_index', ('author_id', 'created_at', 'id'))], False),
+            ([IndexInfo('tasks', 'created_at_author_id_index', ('created_at', 'author_id'))], True),
+            ([IndexInfo('tasks', 'author_id_gin_index', ('author_id',), method='gin')], True),
+            ([IndexInfo('tasks', 'author_id_partial_index', ('author_id',), predicate='(id IS NULL)')], True),
+        ],
+    )
+    def test_missing_foreign_key_indexes(indexes: list[IndexInfo], missing: bool) -> None:  # noqa: FBT001
+        findings = audit([*indexes, PKEY], [FOREIGN_KEY])
+        expected = [(FindingKind.MISSING_FK_INDEX, 'tasks_author_id_index', ('author_id',))] if missing else []
+        assert [(finding.kind, finding.index.name, finding.index.columns) for finding in findings] == expected
+
+    @staticmethod
+    def test_unused_indexes() -> None:
+        indexes = [
+            IndexInfo('tasks', 'a', ('a',), scans=0),
+            IndexInfo('tasks', 'a_copy', ('a',), scans=0),
+            IndexInfo('tasks', 'b', ('b',), scans=1),
+            IndexInfo('tasks', 'c', ('c',), unique=True, scans=0),
+            IndexInfo('tasks', 'd', ('d',)),
+        ]
+        findings = audit([*indexes, PKEY], [])
+        # An index is reported once, the copy as a duplicate only.
+        assert [(finding.kind, finding.index.name) for finding in findings] == [
+            (FindingKind.DUPLICATE, 'a_copy'),
+            (FindingKind.UNUSED, 'a'),
+        ]
+
+    @staticmethod
+    def test_render_migration() -> None:
+        partial = IndexInfo(
+            'tasks', 'done_index', ('author_id',), predicate="(status = 'DONE'::task_status)", scans=0,
+            definition="CREATE INDEX done_index ON public.tasks USING btree (author_id) WHERE (status = 'DONE')",
+        )
+        indexes = [
+            PKEY,
+            IndexInfo('tasks', 'tasks_id_key', ('id',), unique=True, constraint=True),
+            IndexInfo('tasks', 'id_unique', ('id',), unique=True, referenced_by=('watchers_task_id_fkey',)),
+            partial,
+        ]
+
+        migration = render_migration(audit(indexes, [FOREIGN_KEY]), 'b', 'a')
+
+        compile(migration, 'migration', 'exec')
+        assert 'down_revision: Union[str, None] = "a"' in migration
+        assert '    op.drop_constraint("tasks_id_key", "tasks", type_="unique")' in migration
+        assert '    op.create_unique_constraint("tasks_id_key", "tasks", ["id"])' in migration
+        assert '    # op.drop_index("id_unique", table_name="tasks")' in migration
+        assert '    # op.drop_index("done_index", table_name="tasks")' in migration
+        assert f'    # op.execute("{partial.definition}")' in migration
+        assert '        "tasks_author_id_index",\n' in migration
+        assert '    op.drop_index("tasks_author_id_index", table_name="tasks")' in migration
@@ -0,0 +1,86 @@
+"""Contains tests for the seed command."""
+
+import random
+from collections import Counter
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.tools.seed import SeedOptions, defer_checks, generate_tasks, generate_users, parse_statuses, seed
+from src.utils.enums import Status
+
+OPTIONS = SeedOptions(users=50, tasks=1000, chunk_size=300)
+# With the default skew the 10 most active of 100 users write about two thirds of the tasks.
+TOP_AUTHORS_SHARE = 0.5
+
+FOREIGN_KEYS = "SELECT count(*) FROM pg_constraint WHERE contype = 'f'"
+MISCOUNTED = """
+    SELECT count(*) FROM (
+        SELECT status, 'AUTHOR'::task_role, author_id, count(*) FROM tasks GROUP BY 1, 3
+        UNION ALL
+        SELECT status, 'ASSIGNEE'::task_role, assignee_id, count(*)
+        FROM tasks WHERE assignee_id IS NOT NULL GROUP BY 1, 3
+        EXCEPT
+        SELECT status, role, user_id, count FROM task_counters
+    ) AS differences
+"""
+
+
+def _generate(options: SeedOptions) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    rnd = random.Random(options.seed)  # noqa: S311
+    users = generate_users(rnd, options)
+    tasks, watchers, executors = [], [], []
+    for task_rows, watcher_rows, executor_rows in generate_tasks(rnd, options, [row[0] for row in users]):
+        tasks += task_rows
+        watchers += watcher_rows
+        executors += executor_rows
+    return users, tasks, watchers, executors
+
+
+class TestSeed:
+
+    @staticmethod
+    def test_same_seed_generates_same_rows() -> None:
+        assert _generate(OPTIONS) == _generate(OPTIONS)
+
+    @staticmethod
+    def test_other_seed_generates_other_rows() -> None:
+        assert _generate(OPTIONS)[1] != _generate(SeedOptions(users=50, tasks=1000, chunk_size=300, seed=1))[1]
+
+    @staticmethod
+    def test_authors_are_skewed() -> None:
+        _, tasks, _, _ = _generate(SeedOptions(users=100, tasks=5000))
+        authors = Counter(row[5] for row in tasks)
+
+        top_share = sum(count for _, count in authors.most_common(10)) / len(tasks)
+        assert top_share > TOP_AUTHORS_SHARE
+
+    @staticmethod
+    def test_members_are_unique_per_task() -> None:
+        _, _, watchers, executors = _generate(OPTIONS)
+        assert len(set(watchers)) == len(watchers)
+        assert len(set(executors)) == len(executors)
+
+    @staticmethod
+    def test_parse_statuses() -> None:
+        assert parse_statuses('todo=1,done=3') == {Status.TODO: 1, Status.DONE: 3}
+
+    @staticmethod
+    @pytest.mark.parametrize('defer', [False, True])
+    async def test_seed(transaction_session: AsyncSession, defer: bool) -> None:  # noqa: FBT001
+        connection = await transaction_session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        foreign_keys = await connection.scalar(text(FOREIGN_KEYS))
+
+        restore = await defer_checks(driver_connection) if defer else []
+        counts = await seed(driver_connection, OPTIONS)
+        for statement in restore:
+            await driver_connection.execute(statement)
+
+        assert counts['users'] == OPTIONS.users
+        assert counts['tasks'] == OPTIONS.tasks
+        for table, count in counts.items():
+            assert await connection.scalar(text(f'SELECT count(*) FROM {table}')) == count
+        assert await connection.scalar(text(FOREIGN_KEYS)) == foreign_keys
+        assert await connection.scalar(text(MISCOUNTED)) == 0
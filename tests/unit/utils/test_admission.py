@@ -0,0 +1,59 @@
+"""Contains tests for the admission queues."""
+
+import asyncio
+
+from src.utils.admission import AdmissionQueue
+
+
+class TestAdmissionQueue:
+
+    @staticmethod
+    async def test_admits_in_order() -> None:
+        queue = AdmissionQueue(limit=1, depth=2)
+        admitted = []
+
+        async def _request(name: str) -> None:
+            await queue.acquire(max_wait=1)
+            admitted.append(name)
+
+        assert await queue.acquire(max_wait=1)
+        waiting = [asyncio.create_task(_request(name)) for name in ('first', 'second')]
+        await asyncio.sleep(0)
+
+        assert not await queue.acquire(max_wait=1)
+        queue.release()
+        await waiting[0]
+        queue.release()
+        await waiting[1]
+        queue.release()
+
+        assert admitted == ['first', 'second']
+        assert (queue.active, queue.waiting) == (0, 0)
+
+    @staticmethod
+    async def test_timeout_and_cancellation_free_the_queue() -> None:
+        queue = AdmissionQueue(limit=1, depth=1)
+        await queue.acquire(max_wait=1)
+
+        assert not await queue.acquire(max_wait=0.01)
+        waiter = asyncio.create_task(queue.acquire(max_wait=1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queue.release()
+
+        assert (queue.active, queue.waiting) == (0, 0)
+        assert await queue.acquire(max_wait=1)
+
+    @staticmethod
+    async def test_slot_passed_while_timing_out_is_returned() -> None:
+        queue = AdmissionQueue(limit=1, depth=1)
+        await queue.acquire(max_wait=1)
+        waiter = asyncio.create_task(queue.acquire(max_wait=1))
+        await asyncio.sleep(0)
+
+        queue.release()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert (queue.active, queue.waiting) == (0, 0)
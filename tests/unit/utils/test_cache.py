@@ -0,0 +1,78 @@
+"""Contains tests for the in-process cache."""
+
+from src.utils.cache import TTLCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+
+    @staticmethod
+    def test_get_counts_hits_and_misses() -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 0, 'size': 1, 'maxsize': 2}
+
+    @staticmethod
+    def test_evicts_least_recently_used() -> None:
+        cache: TTLCache[str, str] = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 'a')
+        cache.set('b', 'b')
+        cache.get('a')
+        cache.set('c', 'c')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 'a'
+        assert cache.get('c') == 'c'
+        assert cache.evictions == 1
+
+    @staticmethod
+    def test_entries_expire() -> None:
+        clock = _Clock()
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, timer=clock)
+        cache.set('a', 1)
+
+        clock.now = 9.9
+        assert cache.get('a') == 1
+        clock.now = 10
+        assert cache.get('a') is None
+        assert cache.expirations == 1
+        assert cache.stats()['size'] == 0
+
+    @staticmethod
+    def test_invalidate() -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+        cache.invalidate('a')
+        cache.invalidate('missing')
+
+        assert cache.get('a') is None
+
+    @staticmethod
+    def test_set_skipped_after_invalidation_since_marker() -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+        marker = cache.read_marker()
+        cache.invalidate('a')
+        cache.set('a', 1, marker=marker)
+
+        assert cache.get('a') is None
+
+        cache.set('a', 1, marker=cache.read_marker())
+        assert cache.get('a') == 1
+
+    @staticmethod
+    def test_zero_size_disables_cache() -> None:
+        cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=10)
+        cache.set('a', 1)
+
+        assert cache.get('a') is None
+        assert cache.evictions == 0
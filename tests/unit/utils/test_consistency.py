@@ -0,0 +1,147 @@
+"""Contains tests for the replica consistency state."""
+
+import uuid
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from typing import Never
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from src.api.v1.services import TaskService
+from src.schemas.tasks import TaskFieldsRequest, UpdateTaskRequest
+from src.utils.cache import task_cache
+from src.utils.consistency import ConsistencyState, consistency_state, format_lsn, parse_lsn
+from src.utils.etag import version_etag
+from src.utils.unit_of_work import UnitOfWork
+
+
+@pytest_asyncio.fixture
+async def task_id(db_engine: AsyncEngine) -> AsyncGenerator[uuid.UUID, None]:
+    """Commits a task, the services under test open their own transactions."""
+    user_id, task_id = uuid.uuid4(), uuid.uuid4()
+    async with db_engine.begin() as connection:
+        await connection.execute(
+            text("INSERT INTO users (id, full_name, email) VALUES (:id, 'Replica user', :email)"),
+            {'id': user_id, 'email': f'{user_id}@replica.example'},
+        )
+        await connection.execute(
+            text("INSERT INTO tasks (id, title, status, author_id) VALUES (:id, 'Old title', 'TODO', :author_id)"),
+            {'id': task_id, 'author_id': user_id},
+        )
+    yield task_id
+    async with db_engine.begin() as connection:
+        await connection.execute(text('DELETE FROM users WHERE id = :id'), {'id': user_id})
+
+
+@pytest_asyncio.fixture
+async def lagging_replica(
+        db_engine: AsyncEngine,
+        task_id: uuid.UUID,
+        monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[AsyncConnection, None]:
+    """Pretends that a snapshot of the test database taken now is a replica that replays nothing more."""
+    async with db_engine.connect() as connection:
+        await connection.execution_options(isolation_level='REPEATABLE READ')
+        await connection.begin()
+        await connection.execute(text('SELECT 1'))
+        monkeypatch.setattr('src.utils.unit_of_work.replica_session_maker', lambda: AsyncSession(bind=connection))
+        yield connection
+        await connection.rollback()
+
+
+class _ExhaustedPrimary:
+    """Stands for the interactive engine whose pool has no connection left."""
+
+    @staticmethod
+    def connect() -> Never:
+        err_msg = 'QueuePool limit reached'
+        raise PoolTimeoutError(err_msg)
+
+
+@contextmanager
+def _client(state: ConsistencyState) -> Iterator[ConsistencyState]:
+    """Runs the block as a request of a client with the state, as the consistency middleware does."""
+    token = consistency_state.set(state)
+    try:
+        yield state
+    finally:
+        consistency_state.reset(token)
+
+
+class TestLsn:
+
+    @staticmethod
+    @pytest.mark.parametrize('value', ['0/0', '0/C1007DE8', '16/B374D848', 'FFFFFFFF/FFFFFFFF'])
+    def test_round_trip(value: str) -> None:
+        assert format_lsn(parse_lsn(value)) == value
+
+    @staticmethod
+    def test_order() -> None:
+        assert parse_lsn('0/FFFFFFFF') < parse_lsn('1/0') < parse_lsn('1/1')
+
+    @staticmethod
+    @pytest.mark.parametrize('value', [None, '', '0', '0/', 'G/0', '0/0/0', '1/123456789', ' 0/0'])
+    def test_malformed(value: str | None) -> None:
+        assert parse_lsn(value) is None
+
+
+class TestConsistencyState:
+
+    @staticmethod
+    def test_required_lsn() -> None:
+        state = ConsistencyState()
+        assert state.required_lsn is None
+
+        state.client_lsn = 10
+        assert state.required_lsn == 10  # noqa: PLR2004
+
+        state.record_write(20)
+        state.record_write(15)
+        assert state.written_lsn == 20  # noqa: PLR2004
+        assert state.required_lsn == 20  # noqa: PLR2004
+
+    @staticmethod
+    def test_unknown_write() -> None:
+        state = ConsistencyState()
+        state.record_unknown_write()
+        assert state.primary_only
+        assert state.required_lsn is None
+
+
+class TestReadYourWrites:
+
+    @staticmethod
+    @pytest.mark.usefixtures('lagging_replica')
+    async def test_stale_replica_read_is_not_cached(task_id: uuid.UUID) -> None:
+        with _client(ConsistencyState()) as writer:
+            await TaskService(UnitOfWork()).update(task_id, UpdateTaskRequest(title='New title'))
+        assert writer.written_lsn is not None
+
+        # Another client without a token reads the row from the replica, which has not replayed the write.
+        with _client(ConsistencyState()):
+            task, _ = await TaskService(UnitOfWork()).get_by_id(task_id, TaskFieldsRequest())
+        assert task.title == 'Old title'
+
+        with _client(ConsistencyState(client_lsn=writer.written_lsn)):
+            task, etag = await TaskService(UnitOfWork()).get_by_id(task_id, TaskFieldsRequest())
+        assert task.title == 'New title'
+        assert etag == version_etag(task.version)
+
+    @staticmethod
+    @pytest.mark.usefixtures('lagging_replica')
+    async def test_unknown_write_position_reads_primary(task_id: uuid.UUID, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr('src.utils.unit_of_work.async_engine', _ExhaustedPrimary())
+        task_cache.set(task_id, object())
+
+        with _client(ConsistencyState()) as writer:
+            await TaskService(UnitOfWork()).update(task_id, UpdateTaskRequest(title='New title'))
+            assert task_cache.get(task_id) is None
+            assert writer.written_lsn is None
+            assert writer.primary_only
+
+            task, _ = await TaskService(UnitOfWork()).get_by_id(task_id, TaskFieldsRequest())
+        assert task.title == 'New title'
@@ -0,0 +1,44 @@
+"""Contains tests for the ETag helpers."""
+
+import pytest
+
+from src.utils.etag import digest_etag, etag_matches, if_match_versions
+
+
+class TestETag:
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('if_none_match', 'expected'),
+        [
+            (None, False),
+            ('"1"', True),
+            ('W/"1"', True),
+            ('"2", "1"', True),
+            ('*', True),
+            ('"2"', False),
+            ('1', False),
+        ],
+    )
+    def test_etag_matches(if_none_match: str | None, expected: bool) -> None:  # noqa: FBT001
+        assert etag_matches(if_none_match, '"1"') is expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('if_match', 'expected'),
+        [
+            ('"3"', {3}),
+            ('"3", "5"', {3, 5}),
+            ('*', None),
+            ('W/"3"', set()),
+            ('"abc", "3"', {3}),
+            ('"99999999999999999999"', set()),
+        ],
+    )
+    def test_if_match_versions(if_match: str, expected: set[int] | None) -> None:
+        assert if_match_versions(if_match) == expected
+
+    @staticmethod
+    def test_digest_etag_separates_parts() -> None:
+        assert digest_etag(['ab', 'c']) != digest_etag(['a', 'bc'])
+        assert digest_etag(['ab', 'c']) == digest_etag(['ab', 'c'])
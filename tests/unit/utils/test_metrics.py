@@ -0,0 +1,55 @@
+"""Contains tests for the in-process metrics."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.metrics import (
+    POOL_CHECKED_OUT,
+    POOL_SIZE,
+    POOL_WAIT,
+    Gauge,
+    Histogram,
+    render,
+    update_pool_gauges,
+)
+
+
+class TestMetrics:
+
+    @staticmethod
+    def test_histogram() -> None:
+        histogram = Histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, '/tasks')
+
+        assert render([histogram]).splitlines() == [
+            '# HELP latency_seconds Latency.',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{route="/tasks",le="0.1"} 2',
+            'latency_seconds_bucket{route="/tasks",le="1.0"} 3',
+            'latency_seconds_bucket{route="/tasks",le="+Inf"} 4',
+            'latency_seconds_sum{route="/tasks"} 3.65',
+            'latency_seconds_count{route="/tasks"} 4',
+        ]
+
+    @staticmethod
+    def test_gauge_escapes_labels() -> None:
+        gauge = Gauge('in_flight', 'Requests.', ('path',))
+        gauge.inc('a"b\\c\n')
+        gauge.inc('a"b\\c\n')
+        gauge.dec('a"b\\c\n')
+        gauge.set(5, 'other')
+
+        assert render([gauge]).splitlines()[2:] == ['in_flight{path="a\\"b\\\\c\\n"} 1', 'in_flight{path="other"} 5']
+
+    @staticmethod
+    async def test_pool_gauges(db_engine: AsyncEngine) -> None:
+        waits = POOL_WAIT._series['default',].count if ('default',) in POOL_WAIT._series else 0  # noqa: SLF001
+        async with db_engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+            update_pool_gauges({'test': db_engine})
+            checked_out = POOL_CHECKED_OUT._values['test',]  # noqa: SLF001
+
+        assert checked_out >= 1
+        assert POOL_SIZE._values['test',] == db_engine.sync_engine.pool.size()  # noqa: SLF001
+        assert POOL_WAIT._series['default',].count == waits + 1  # noqa: SLF001
@@ -0,0 +1,75 @@
+"""Contains tests for the plans of the task queries on a large table.
+
+The data is seeded once per test, so that each test checks all the shapes of a query.
+"""
+
+import itertools
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.repositories import TaskRepository
+from src.schemas.tasks import FilterTaskRequest
+from src.tools.seed import EPOCH, PERIOD
+from src.utils.enums import Status, UserTaskRole
+from tests.utils import explain, plan_nodes, record_statements
+
+# Any index leading with the user column serves a role.
+_ROLE_INDEXES = {
+    UserTaskRole.AUTHOR: {'author_id_created_at_id_index', 'author_id_status_created_at_id_index'},
+    UserTaskRole.ASSIGNEE: {'assignee_id_created_at_id_index'},
+    UserTaskRole.WATCHER: {'watchers_user_id_task_id_index'},
+    UserTaskRole.EXECUTOR: {'executors_user_id_task_id_index'},
+}
+
+# The index each filter walks, with or without the title, which is then filtered after it. Both indexes leading with
+# the author serve an author, the planner switches between them with the size of the table.
+_FILTER_INDEXES = {
+    frozenset(): {'created_at_id_index'},
+    frozenset({'status'}): {'status_created_at_id_index'},
+    frozenset({'author_id'}): {'author_id_created_at_id_index', 'author_id_status_created_at_id_index'},
+    frozenset({'author_id', 'status'}): {'author_id_status_created_at_id_index'},
+}
+
+
+class TestTaskRepositoryPlans:
+
+    @staticmethod
+    async def test_get_by_user_uses_indexes(
+            setup_many_tasks: list[uuid.UUID],
+            db_engine: AsyncEngine,
+            transaction_session: AsyncSession,
+    ) -> None:
+        repo = TaskRepository(transaction_session)
+        for role in (*UserTaskRole, None):
+            with record_statements(db_engine) as statements:
+                assert await repo.get_by_user(setup_many_tasks[1], role, 20)
+
+            nodes = list(plan_nodes(await explain(transaction_session, *statements[0])))
+            assert [node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'] == [], role
+            indexes = {node.get('Index Name') for node in nodes}
+            assert all(indexes & _ROLE_INDEXES[used] for used in ([role] if role else UserTaskRole)), role
+
+    @staticmethod
+    async def test_get_all_uses_indexes(
+            setup_seeded_tasks: list[uuid.UUID],
+            db_engine: AsyncEngine,
+            transaction_session: AsyncSession,
+    ) -> None:
+        repo = TaskRepository(transaction_session)
+        author = setup_seeded_tasks[len(setup_seeded_tasks) // 10]
+        values = {'title': '#1234', 'status': Status.IN_PROGRESS, 'author_id': author}
+        middle = (EPOCH + PERIOD / 2, uuid.UUID(int=0))
+        # A bare title search is left out, scanning a table of this size is cheaper than the trigram index.
+        shapes = [(shape, title) for shape in _FILTER_INDEXES for title in (False, True) if shape or not title]
+        for (shape, title), after in itertools.product(shapes, (None, middle)):
+            task_filter = FilterTaskRequest(**{name: values[name] for name in shape | ({'title'} if title else set())})
+            with record_statements(db_engine) as statements:
+                await repo.get_all(task_filter, 20, after)
+
+            query = next(statement for statement in statements if statement[0].startswith('SELECT'))
+            nodes = list(plan_nodes(await explain(transaction_session, *query)))
+            assert 'tasks' not in {node.get('Relation Name') for node in nodes if node['Node Type'] == 'Seq Scan'}
+            indexes = {node.get('Index Name') for node in nodes} - {None}
+            assert len(indexes) == 1, (shape, title, after)
+            assert indexes <= _FILTER_INDEXES[shape], (shape, title, after)
@@ -1,14 +1,23 @@
 
+import uuid
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from src.models import UserModel
+from src.config import settings
+from src.models import TaskModel, UserModel
+from src.repositories import TaskRepository, UserRepository, WatcherRepository
+from src.repositories.membership import MembershipError
+from src.schemas.tasks import FilterTaskRequest
 from src.schemas.user import UserDB
 from src.utils.custom_types import AsyncFunc
+from src.utils.enums import Status
+from src.utils.instrumentation import RequestTimings, request_timings
 from src.utils.repository import SqlAlchemyRepository
-from tests.fixtures import testing_cases
+from tests.fixtures import db_mocks, testing_cases
 from tests.utils import BaseTestCase, compare_dicts_and_db_models
 
 if TYPE_CHECKING:
@@ -63,6 +72,103 @@ class TestSqlAlchemyRepository:
         users_in_db: Sequence[UserModel] = await get_users()
         assert compare_dicts_and_db_models(users_in_db, [first_user], UserDB)
 
+    @pytest.mark.parametrize('copy_min_rows', [1, 10_000], ids=['copy', 'executemany'])
+    async def test_bulk_add(
+        self,
+        copy_min_rows: int,
+        transaction_session: AsyncSession,
+        users: tuple[dict],
+        get_users: AsyncFunc,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', copy_min_rows)
+        sql_rep = self.__get_sql_rep(transaction_session)
+        await sql_rep.bulk_add(values=users)
+
+        users_in_db: Sequence[UserModel] = await get_users()
+        assert compare_dicts_and_db_models(users_in_db, users, UserDB)
+
+    @pytest.mark.usefixtures('setup_users')
+    @pytest.mark.parametrize('copy_min_rows', [1, 10_000], ids=['copy', 'executemany'])
+    async def test_bulk_add_integrity_error(
+        self,
+        copy_min_rows: int,
+        transaction_session: AsyncSession,
+        users: tuple[dict],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', copy_min_rows)
+        sql_rep = self.__get_sql_rep(transaction_session)
+        with pytest.raises(SqlAlchemyRepository.IntegrityError):
+            await sql_rep.bulk_add(values=users)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users')
+    @pytest.mark.parametrize('copy_min_rows', [1, 10_000], ids=['copy', 'executemany'])
+    async def test_bulk_add_applies_defaults_and_types(
+        copy_min_rows: int,
+        transaction_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', copy_min_rows)
+        author_id = db_mocks.USERS[0]['id']
+        values = [
+            {'title': 'First', 'status': Status.TODO, 'author_id': author_id},
+            {'title': 'Second', 'status': Status.DONE, 'author_id': author_id, 'description': 'Done'},
+        ]
+        await TaskRepository(transaction_session).bulk_add(values=values)
+
+        tasks = (await transaction_session.execute(select(TaskModel).order_by(TaskModel.title))).scalars().all()
+        assert [(task.title, task.status, task.description) for task in tasks] == [
+            ('First', Status.TODO, None),
+            ('Second', Status.DONE, 'Done'),
+        ]
+        assert all(task.id and task.created_at for task in tasks)
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_users')
+    @pytest.mark.parametrize('copy_min_rows', [1, 10_000], ids=['copy', 'executemany'])
+    async def test_bulk_add_mixed_keys_get_server_defaults(
+        copy_min_rows: int,
+        transaction_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', copy_min_rows)
+        author_id = db_mocks.USERS[0]['id']
+        created_at = datetime(2020, 1, 1)  # noqa: DTZ001
+        values = [
+            {'title': 'First', 'status': Status.TODO, 'author_id': author_id, 'created_at': created_at, 'version': 5},
+            {'title': 'Second', 'status': Status.TODO, 'author_id': author_id},
+        ]
+        await TaskRepository(transaction_session).bulk_add(values=values)
+
+        tasks = (await transaction_session.execute(select(TaskModel).order_by(TaskModel.title))).scalars().all()
+        assert [(task.title, task.version) for task in tasks] == [('First', 5), ('Second', 1)]
+        assert tasks[0].created_at == created_at
+        assert tasks[1].created_at > created_at
+
+    @staticmethod
+    async def test_bulk_add_copy_runs_in_transaction(
+        db_engine: AsyncEngine,
+        users: tuple[dict],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr('src.utils.repository.BULK_COPY_MIN_ROWS', 1)
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        try:
+            async with AsyncSession(db_engine) as session:
+                await UserRepository(session).bulk_add(values=users)
+                await session.rollback()
+        finally:
+            request_timings.reset(token)
+
+        async with AsyncSession(db_engine) as session:
+            user_ids = [user['id'] for user in users]
+            assert await session.scalar(select(func.count()).where(UserModel.id.in_(user_ids))) == 0
+        assert any(statement.startswith('COPY users (') for statement in timings.statements)
+        assert timings.queries == sum(timings.statements.values())
+
     @pytest.mark.usefixtures('setup_users')
     @pytest.mark.parametrize('case', testing_cases.TEST_SQLALCHEMY_REPOSITORY_GET_BY_QUERY_ONE_OR_NONE_PARAMS)
     async def test_get_by_filter_one_or_none(
@@ -126,3 +232,98 @@ class TestSqlAlchemyRepository:
         await transaction_session.flush()
         users_in_db: Sequence[UserModel] = await get_users()
         assert users_in_db == []
+
+
+class TestTaskRepositoryProjection:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    @pytest.mark.parametrize(
+        ('fields', 'include', 'expected_statements'),
+        [
+            (None, (), 1),
+            ({'title'}, (), 1),
+            ({'title'}, ('watchers', 'executors'), 3),
+        ],
+        ids=['all columns', 'sparse columns', 'relationships'],
+    )
+    async def test_get_all_loads_requested_only(
+        fields: set[str] | None,
+        include: tuple[str, ...],
+        expected_statements: int,
+        db_engine: AsyncEngine,
+        transaction_session: AsyncSession,
+    ) -> None:
+        statements = []
+
+        def count(*_: object) -> None:
+            statements.append(1)
+
+        event.listen(db_engine.sync_engine, 'before_cursor_execute', count)
+        try:
+            tasks = await TaskRepository(transaction_session).get_all(FilterTaskRequest(), 10, None, fields, include)
+        finally:
+            event.remove(db_engine.sync_engine, 'before_cursor_execute', count)
+
+        assert len(statements) == expected_statements
+        loaded = set(tasks[0].__dict__) - {'_sa_instance_state'}
+        if fields is None:
+            assert loaded == set(TaskModel.__table__.columns.keys())
+        else:
+            assert loaded == {*fields, 'id', 'created_at', 'version', *include}
+
+
+class TestTaskRepositoryTitleSearch:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_tasks')
+    @pytest.mark.parametrize(
+        ('pgbouncer', 'plan_cache_mode'),
+        [(True, 'auto'), (False, 'force_custom_plan')],
+        ids=['pgbouncer', 'direct'],
+    )
+    async def test_custom_plan_only_for_cached_statements(
+        pgbouncer: bool,  # noqa: FBT001
+        plan_cache_mode: str,
+        transaction_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, 'DB_PGBOUNCER', pgbouncer)
+        task_filter = FilterTaskRequest(title=db_mocks.TASKS[0]['title'])
+
+        tasks = await TaskRepository(transaction_session).get_all(task_filter, 10)
+
+        assert db_mocks.TASKS[0]['id'] in {task.id for task in tasks}
+        assert await transaction_session.scalar(text('SHOW plan_cache_mode')) == plan_cache_mode
+
+
+class TestMembershipRepository:
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_task_members')
+    async def test_changes_with_one_statement_each(db_engine: AsyncEngine, transaction_session: AsyncSession) -> None:
+        repo = WatcherRepository(transaction_session)
+        task_id = db_mocks.TASKS[0]['id']
+        first, second, third = (user['id'] for user in db_mocks.USERS)
+        statements = []
+
+        def count(*_: object) -> None:
+            statements.append(1)
+
+        event.listen(db_engine.sync_engine, 'before_cursor_execute', count)
+        try:
+            # The second and the third users watch the task already.
+            assert await repo.add_users(task_id, [first, second, second]) == 1
+            assert await repo.remove_users(task_id, [third, uuid.uuid4()]) == 1
+        finally:
+            event.remove(db_engine.sync_engine, 'before_cursor_execute', count)
+
+        assert len(statements) == 2  # noqa: PLR2004
+        assert await repo.count_users(task_id) == 2  # noqa: PLR2004
+        assert await repo.count_tasks(first) == 1
+
+    @staticmethod
+    @pytest.mark.usefixtures('setup_tasks')
+    async def test_add_unknown_user(transaction_session: AsyncSession) -> None:
+        with pytest.raises(MembershipError):
+            await WatcherRepository(transaction_session).add_users(db_mocks.TASKS[0]['id'], [uuid.uuid4()])
@@ -0,0 +1,30 @@
+"""Contains tests for the response classes."""
+
+import json
+import uuid
+
+from src.models import TaskModel
+from src.schemas.tasks import SparseTaskResponse
+from src.utils.enums import Status
+from src.utils.responses import TrustedJSONResponse
+
+
+class TestTrustedJSONResponse:
+
+    @staticmethod
+    def test_renders_set_fields_only() -> None:
+        task = TaskModel(id=uuid.uuid4(), title='Task', description=None, status=Status.TODO)
+
+        response = TrustedJSONResponse(SparseTaskResponse(payload=task.to_sparse_schema(['id', 'description'])))
+
+        assert response.media_type == 'application/json'
+        assert json.loads(response.body) == {'payload': {'id': str(task.id), 'description': None}}
+
+    @staticmethod
+    def test_does_not_validate() -> None:
+        # Not a UUID4, the rows from the database are not checked again.
+        task = TaskModel(id=uuid.UUID(int=1), title='Task', status=Status.TODO)
+
+        response = TrustedJSONResponse(SparseTaskResponse(payload=task.to_sparse_schema(['id', 'title'])))
+
+        assert json.loads(response.body)['payload']['id'] == str(task.id)
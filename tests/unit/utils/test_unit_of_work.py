@@ -0,0 +1,165 @@
+"""Contains tests for the UnitOfWork sessions and their routing between the primary and the replica."""
+
+from contextlib import suppress
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.database.db import engines
+from src.utils.consistency import ConsistencyState, consistency_state
+from src.utils.enums import Pool
+from src.utils.metrics import TRANSACTION_DURATION
+from src.utils.service import BaseService, transaction_mode
+from src.utils.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def replica_maker(db_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """Pretends that the test database is also a replica, it is not in recovery, so it never reports a replayed LSN."""
+    session_maker = async_sessionmaker(bind=db_engine, class_=AsyncSession)
+    sessions = []
+
+    def make_session() -> AsyncSession:
+        sessions.append(session_maker())
+        return sessions[-1]
+
+    maker = Mock(side_effect=make_session, sessions=sessions)
+    monkeypatch.setattr('src.utils.unit_of_work.replica_session_maker', maker)
+    return maker
+
+
+@pytest.fixture
+def state() -> ConsistencyState:
+    _state = ConsistencyState()
+    token = consistency_state.set(_state)
+    yield _state
+    consistency_state.reset(token)
+
+
+class TestUnitOfWorkRouting:
+
+    @staticmethod
+    @pytest.mark.usefixtures('state')
+    async def test_read_only_uses_replica(replica_maker: Mock) -> None:
+        uow = UnitOfWork()
+        async with uow(read_only=True):
+            assert uow.read_only
+            assert uow.task._session is replica_maker.sessions[0]  # noqa: SLF001
+            assert uow.on_replica
+        assert not uow.read_only
+        assert not uow.on_replica
+
+    @staticmethod
+    async def test_read_write_uses_primary(replica_maker: Mock) -> None:
+        async with UnitOfWork():
+            pass
+        replica_maker.assert_not_called()
+
+    @staticmethod
+    async def test_read_only_waits_for_replay(replica_maker: Mock, state: ConsistencyState) -> None:
+        state.client_lsn = 1
+        uow = UnitOfWork()
+        async with uow(read_only=True):
+            assert replica_maker.call_count == 1
+            assert uow.task._session is not replica_maker.sessions[0]  # noqa: SLF001
+            assert not uow.on_replica
+
+
+class TestUnitOfWorkSession:
+
+    @staticmethod
+    async def test_session_is_lazy() -> None:
+        uow = UnitOfWork()
+        async with uow:
+            assert uow._session is None  # noqa: SLF001
+            assert uow.user is uow.user
+            assert uow.task._session is uow._session is not None  # noqa: SLF001
+        assert uow._session is None  # noqa: SLF001
+        with pytest.raises(AttributeError, match='closed UnitOfWork'):
+            _ = uow.task
+
+    @staticmethod
+    async def test_repositories_are_not_reused() -> None:
+        uow = UnitOfWork()
+        async with uow:
+            repository = uow.task
+        async with uow:
+            assert uow.task is not repository
+
+    @staticmethod
+    @pytest.mark.parametrize(('options', 'expected'), [({}, 'off'), ({'read_only': True}, 'on')])
+    async def test_transaction_read_only(options: dict[str, bool], expected: str) -> None:
+        uow = UnitOfWork()
+        async with uow(**options):
+            assert await uow.task._session.scalar(text('SHOW transaction_read_only')) == expected  # noqa: SLF001
+
+    @staticmethod
+    @pytest.mark.parametrize('read_only', [False, True])
+    @pytest.mark.parametrize('pool', list(Pool))
+    async def test_uses_pool_of_workload(pool: Pool, read_only: bool) -> None:  # noqa: FBT001
+        uow = UnitOfWork()
+        async with uow(read_only=read_only, pool=pool):
+            session = uow.task._session  # noqa: SLF001
+            assert session.bind.sync_engine.pool is engines[pool].sync_engine.pool
+        async with uow:
+            assert uow.task._session.bind is engines[Pool.INTERACTIVE]  # noqa: SLF001
+
+    @staticmethod
+    async def test_read_only_rejects_writes() -> None:
+        uow = UnitOfWork()
+        with pytest.raises(DBAPIError, match='read-only transaction'):
+            async with uow(read_only=True):
+                await uow.task.delete_all()
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ('options', 'error', 'outcome'),
+        [({}, None, 'commit'), ({'read_only': True}, None, 'read_only'), ({}, LookupError, 'rollback')],
+    )
+    async def test_observes_transaction_duration(
+            options: dict[str, bool],
+            error: type[Exception] | None,
+            outcome: str,
+    ) -> None:
+        def observed() -> int:
+            series = TRANSACTION_DURATION._series.get((outcome,))  # noqa: SLF001
+            return series.count if series else 0
+
+        before = observed()
+        uow = UnitOfWork()
+        with suppress(LookupError):
+            async with uow(**options):
+                await uow.task._session.execute(text('SELECT 1'))  # noqa: SLF001
+                if error:
+                    raise error
+        async with uow:
+            pass
+        assert observed() == before + 1
+
+
+class TestReadOnlyTransactionMode:
+    class _Service(BaseService):
+        _repo = 'user'
+
+        @transaction_mode(read_only=True)
+        async def read_then_write(self) -> None:
+            await self.delete_all()
+
+        @transaction_mode(pool=Pool.BULK)
+        async def bulk_then_nested(self) -> tuple[AsyncEngine, AsyncEngine]:
+            return self.uow.user._session.bind, await self.nested()  # noqa: SLF001
+
+        @transaction_mode(pool=Pool.REPORTING)
+        async def nested(self) -> AsyncEngine:
+            return self.uow.user._session.bind  # noqa: SLF001
+
+    @pytest.mark.usefixtures('replica_maker')
+    async def test_write_inside_read_only_transaction(self) -> None:
+        with pytest.raises(RuntimeError, match='read-only transaction'):
+            await self._Service(UnitOfWork()).read_then_write()
+
+    async def test_nested_call_shares_the_pool(self) -> None:
+        assert await self._Service(UnitOfWork()).bulk_then_nested() == (engines[Pool.BULK], engines[Pool.BULK])
@@ -1,14 +1,14 @@
 """Contains helper functions for tests."""
 import enum
 import uuid
-from collections.abc import Callable, Iterable, Sequence
-from contextlib import AbstractContextManager, nullcontext
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from typing import Any, TypeVar
 
 from pydantic import BaseModel
 from requests import Response
-from sqlalchemy import insert
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from starlette.status import HTTP_200_OK
 
@@ -105,3 +105,32 @@ def json_serializable(obj: Any) -> Any:
     if isinstance(obj, uuid.UUID):
         return str(obj)
     return obj
+
+
+@contextmanager
+def record_statements(engine: AsyncEngine) -> Iterator[list[tuple[str, Any]]]:
+    """Records the SQL statements executed by the engine within the block, with their parameters."""
+    statements = []
+
+    def record(_conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', record)
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> dict[str, Any]:
+    """Returns the root node of the plan chosen for a recorded statement."""
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+    return result.scalar_one()[0]['Plan']
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Walks all nodes of the plan."""
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)